@@ -0,0 +1,43 @@
+# api/gunicorn.conf.py
+import os
+
+# gunicorn settings for the API, `gunicorn -c gunicorn.conf.py src.api:app`
+#
+# GUNICORN_WORKER_CLASS picks how a worker serves concurrent requests:
+#   gthread (default)  GUNICORN_THREADS requests per process. Snowflake, MongoDB and
+#                      DuckDB calls release the GIL, so a slow query holds one thread,
+#                      not the process
+#   gevent             GUNICORN_WORKER_CONNECTIONS greenlets per process. The stdlib is
+#                      monkey patched below, before the app is preloaded, so the locks
+#                      and sockets created at import are cooperative. KMeans fits, EDA
+#                      statistics and reports run in gevent's thread pool (src/concurrency.py)
+#   sync               one request per process
+# The app is preloaded in the master: workers share the datasets (src/resources.py)
+# and threads of a worker share its caches. Once up, one worker's cache warmer plans
+# the warming and the others replay it into their own caches (src/warmer.py).
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+preload_app = True
+
+if worker_class == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+
+
+def post_worker_init(worker):
+    if worker_class == "gevent":
+        # joblib counts physical cores once with a subprocess, which gevent can only
+        # watch from the main thread: count them here, not in the thread pool
+        import joblib
+
+        joblib.cpu_count(only_physical_cores=True)
+
+    from src.warmer import start_warmer
+
+    start_warmer(worker.wsgi)
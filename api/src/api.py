@@ -1,27 +1,40 @@
 # api/src/api.py
 import os
+import hashlib
 import traceback
 from datetime import datetime
 import io
+from urllib.parse import urlencode
 
 import pandas as pd
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_caching import Cache
-from pymongo import MongoClient
 from bson import ObjectId
-import gridfs
 from src.forecast import build_forecast
-from src.clustering import run_clustering
-from src.eda import run_basic_eda, _make_json_safe
+from src.clustering import precompute_clusters, precompute_trajectory_clusters, clusters_for_k, cluster_scores
+from src.eda import run_basic_eda, run_detailed_eda, _make_json_safe, previews, PREVIEW_ROWS
+from src.reports import submit_job, get_job, report_path, DONE
+from src.eda_stream import run_streaming_eda
+from src.eda_pushdown import run_pushdown_eda
+from src.eda_query import get_table_columns, build_source, build_select, split_table_name
+from src.patterns import fetch_sql_waves, fetch_table_waves, PATTERNS_ENGINE, SMOOTHING_WEEKS, PROMINENCE_STEPS
+from src.metrics import init_metrics, render_metrics
+from src.warmer import init_request_stats, warmer_status
+from src.resources import mortality, mongo, weekly, waves, preload, readiness, process_age
+from src.concurrency import single_flight, offload
+from src.downsample import downsample, MIN_POINTS
 
 
 # functions from utils
 from shared.utils import (
-    load_kaggle_mortality_data,
-    preprocess_mortality_data,
-    fetch_data_from_snowflake
+    fetch_data_from_snowflake,
+    fetch_arrow_batches_from_snowflake,
+    fetch_data_version,
+    warehouse_backend
 )
+from shared.timing import phase
+from shared.query_log import top_queries, recent_slow_queries, SLOW_QUERY_MS
 from shared.config.config import (EXCESS_MORTALITY_PAGE, VACCINATION_PAGE, INFECTION_DEATHS_PAGE, INFECTION_CASES_PAGE,
                                   EDA_PAGE, MORTALITY_FORECAST_PAGE, CLUSTERING_PAGE)
 
@@ -36,25 +49,110 @@ cache = Cache(app, config={
     "CACHE_TYPE": "SimpleCache",   # for now: in-memory
     "CACHE_DEFAULT_TIMEOUT": 300   # 5 minutes
 })
+# comment lists apart: a comment post clears them, not the fits, catalogs and series above
+comments_cache = Cache(app, config={
+    "CACHE_TYPE": "SimpleCache",
+    "CACHE_DEFAULT_TIMEOUT": 300
+})
+
+# per-request phase timings: Server-Timing headers and /metrics
+init_metrics(app)
+# dashboard views served, the cache warmer requests the most popular (src/warmer.py)
+init_request_stats(app)
+
+# threads summarizing Arrow batches for /eda?mode=stream
+EDA_STREAM_WORKERS = int(os.getenv("EDA_STREAM_WORKERS", 4))
+# rows profiled by /eda?mode=sample and the detailed report
+EDA_SAMPLE_ROWS = 5000
+# responses of the time-series endpoints are kept per query string and data version
+# for this long, what the cache warmer fills; 0 disables it
+SERIES_CACHE_TTL = int(os.getenv("SERIES_CACHE_TTL", 3600))
+
+# preload the mortality data from kaggle, in the gunicorn master with --preload
+# mongodb and heavy libraries are set up lazily per worker (src/resources.py)
+preload()
+
+
+@single_flight
+@cache.memoize(timeout=60)
+def current_data_version() -> str:
+    """
+    return the version of the source tables, checked at most once a minute
+    """
+    return fetch_data_version()
 
-# mongodb setup
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-client = MongoClient(MONGO_URI)
-db = client["covid_db"]
-comments_col = db["comments"]
 
-# file storage
-fs = gridfs.GridFS(db)
+def _is_ok_response(rv) -> bool:
+    """
+    response_filter for cached endpoints
+    only successful responses are cached, errors are retried on the next request
+    """
+    return not isinstance(rv, tuple) or rv[1] == 200
+
+
+def series_cache_key() -> str:
+    """
+    response cache key of a time-series request: path, query string and data version
+    when the version can't be read the request is served uncached
+    """
+    args = urlencode(sorted(request.args.items(multi=True)))
+    return f"series/{current_data_version()}{request.path}?{args}"
 
-# preload mortality data from kaggle
-df_mortality_raw = load_kaggle_mortality_data()
-df_mortality = preprocess_mortality_data(df_mortality_raw)
+
+def series_cache_disabled() -> bool:
+    return SERIES_CACHE_TTL <= 0
+
+
+def records_response(df: pd.DataFrame):
+    """
+    jsonify a dataframe as a list of records, timed as the serialize phase
+    """
+    with phase("serialize"):
+        return jsonify(df.to_dict(orient="records"))
+
+
+def max_points_arg():
+    """
+    ?max_points= of a time-series request (about the chart width in pixels),
+    at least MIN_POINTS, None returns every point
+    raises ValueError for anything but a positive integer
+    """
+    max_points = request.args.get("max_points")
+    if max_points is None:
+        return None
+    try:
+        max_points = int(max_points)
+    except ValueError:
+        raise ValueError("max_points must be an integer")
+    if max_points < 1:
+        raise ValueError("max_points must be at least 1")
+    return max(max_points, MIN_POINTS)
+
+
+def since_arg():
+    """
+    ?since=YYYY-MM-DD of a time-series request: only rows dated on or after it are
+    returned, clients refetch the last weeks that may have been revised and merge them
+    None returns the whole history, raises ValueError for an invalid date
+    """
+    since = request.args.get("since")
+    if not since:
+        return None
+    try:
+        since = pd.Timestamp(since)
+    except ValueError:
+        raise ValueError("since must be a date (YYYY-MM-DD)")
+    if since.tzinfo is not None:
+        since = since.tz_convert(None)
+    return since.normalize()
 
 
 # --- api endpoints ---
 
 
 @app.route(f"/{EXCESS_MORTALITY_PAGE}", methods=["GET"])
+@cache.cached(timeout=SERIES_CACHE_TTL, key_prefix=series_cache_key, unless=series_cache_disabled,
+              response_filter=_is_ok_response)
 def get_covid_data():
     """
     return merged covid + mortality data for a given country
@@ -62,13 +160,23 @@ def get_covid_data():
     country = request.args.get("country")
     if not country:
         return jsonify({"error": "country parameter required"}), 400
+    try:
+        since = since_arg()
+        max_points = max_points_arg()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     query = """
         SELECT COUNTRY_REGION, DEATHS, DATE
         FROM ECDC_GLOBAL
         WHERE UPPER(COUNTRY_REGION) = %s
     """
-    df_covid_raw = fetch_data_from_snowflake(query, return_df=True, params=(country.upper(),))
+    params = (country.upper(),)
+    if since is not None:
+        # whole months only, a month starting before since would be summed partially
+        query += "  AND DATE >= %s\n"
+        params += (since.replace(day=1).date(),)
+    df_covid_raw = fetch_data_from_snowflake(query, return_df=True, params=params)
 
     # Convert daily covid deaths to monthly totals
     df_temp = df_covid_raw[['COUNTRY_REGION', 'DEATHS', 'DATE']].copy()
@@ -85,7 +193,8 @@ def get_covid_data():
             'DEATHS': 'deaths_covid'
         })
     )
-    # rename columns for consistency
+    # merge against the blocks of the matched countries only
+    df_mortality = mortality.get().countries_frame(df_covid_monthly['country_name'].unique())
     df_merged = pd.merge(
         df_mortality, df_covid_monthly,
         on=['country_name', 'year', 'month'],
@@ -101,8 +210,10 @@ def get_covid_data():
     df_merged["date"] = pd.to_datetime(
         df_merged["year"].astype(str) + "-" + df_merged["month"].astype(str) + "-01"
     )
+    df_merged = downsample(df_merged, "date", ["deaths_allcause", "deaths_covid", "deaths_without_covid"],
+                           max_points)
 
-    return jsonify(df_merged.to_dict(orient="records")), 200
+    return records_response(df_merged), 200
 
 
 @app.route("/comments", methods=["POST"])
@@ -113,7 +224,7 @@ def add_comment():
     # check if image file is uploaded
     if "image" in request.files:
         image = request.files["image"]
-        file_id = fs.put(image, filename=image.filename, content_type=image.content_type)
+        file_id = mongo.get().fs.put(image, filename=image.filename, content_type=image.content_type)
     else:
         file_id = None
 
@@ -139,8 +250,8 @@ def add_comment():
     if file_id:
         doc["image_id"] = str(file_id)
 
-    comments_col.insert_one(doc)
-    cache.clear()
+    mongo.get().comments.insert_one(doc)
+    comments_cache.clear()
 
     return jsonify({"message": "Comment added"}), 201
 
@@ -151,7 +262,7 @@ def get_comment_image(file_id):
     return image stored in gridfs by file_id
     """
     try:
-        gridout = fs.get(ObjectId(file_id))
+        gridout = mongo.get().fs.get(ObjectId(file_id))
         mimetype = gridout.metadata.get("contentType") if gridout.metadata else None
         return send_file(
             io.BytesIO(gridout.read()),
@@ -162,8 +273,40 @@ def get_comment_image(file_id):
         return jsonify({"error": "Image not found"}), 404
 
 
+@single_flight
+@cache.memoize(timeout=3600)
+def get_population(data_version: str) -> dict:
+    """
+    population dimension: upper-cased country -> its distinct populations in ECDC_GLOBAL
+    read once per data version, the vaccination queries attach it in memory
+    """
+    rows = fetch_data_from_snowflake("SELECT DISTINCT COUNTRY_REGION, POPULATION FROM ECDC_GLOBAL", return_df=False)
+    population = {}
+    for country, pop in rows:
+        population.setdefault(country.upper(), []).append(pop)
+    return population
+
+
+def world_population(population: dict):
+    """sum of the distinct country populations, None if there are none"""
+    values = [pop for pops in population.values() for pop in pops if pop is not None]
+    return sum(values) if values else None
+
+
+def attach_population(df: pd.DataFrame, populations: list) -> pd.DataFrame:
+    """
+    add the POPULATION column to a country's rows
+    a country with several populations gets its rows once per population, like a join
+    """
+    if len(populations) == 1:
+        return df.assign(POPULATION=populations[0])
+    df = pd.concat([df.assign(POPULATION=pop) for pop in populations], ignore_index=True)
+    return df.sort_values("DATE", kind="stable", ignore_index=True)
+
 
 @app.route(f"/{VACCINATION_PAGE}", methods=["GET"])
+@cache.cached(timeout=SERIES_CACHE_TTL, key_prefix=series_cache_key, unless=series_cache_disabled,
+              response_filter=_is_ok_response)
 def get_vaccination_data():
     """
     return vaccination data for a given country or world
@@ -171,158 +314,137 @@ def get_vaccination_data():
     country = request.args.get("country")
     if not country:
         return jsonify({"error": "country parameter required"}), 400
+    try:
+        since = since_arg()
+        max_points = max_points_arg()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    since_params = (since.date(),) if since is not None else ()
 
     try:
+        population = get_population(current_data_version())
         if country.upper() == "WORLD":
-            # world-level aggregation
-            # attach world population (single value) to each aggregated row
-            query = """
-            WITH pop AS (
-                SELECT SUM(POPULATION) AS WORLD_POP
-                FROM (
-                    SELECT DISTINCT COUNTRY_REGION, POPULATION
-                    FROM ECDC_GLOBAL
-                )
-            )
-            SELECT v.DATE,
-                   SUM(v.PEOPLE_VACCINATED) AS PEOPLE_VACCINATED,
-                   SUM(v.PEOPLE_FULLY_VACCINATED) AS PEOPLE_FULLY_VACCINATED,
-                   SUM(v.TOTAL_VACCINATIONS) AS TOTAL_VACCINATIONS,
-                   p.WORLD_POP AS POPULATION
-            FROM OWID_VACCINATIONS v
-            CROSS JOIN pop p
-            GROUP BY v.DATE, p.WORLD_POP
-            ORDER BY v.DATE;
+            # world-level aggregation, world population attached to each aggregated row
+            query = f"""
+            SELECT DATE,
+                   SUM(PEOPLE_VACCINATED) AS PEOPLE_VACCINATED,
+                   SUM(PEOPLE_FULLY_VACCINATED) AS PEOPLE_FULLY_VACCINATED,
+                   SUM(TOTAL_VACCINATIONS) AS TOTAL_VACCINATIONS
+            FROM OWID_VACCINATIONS
+            {"WHERE DATE >= %s" if since is not None else ""}
+            GROUP BY DATE
+            ORDER BY DATE;
             """
-            df_vax = fetch_data_from_snowflake(query, return_df=True)
+            df_vax = fetch_data_from_snowflake(query, return_df=True, params=since_params)
+            df_vax["POPULATION"] = world_population(population)
         else:
-            # country-level data
-            query = """
-                SELECT v.COUNTRY_REGION, v.DATE,
-                       v.PEOPLE_VACCINATED, v.PEOPLE_FULLY_VACCINATED,
-                       v.TOTAL_VACCINATIONS, p.POPULATION
-                FROM OWID_VACCINATIONS v
-                JOIN (
-                    SELECT DISTINCT COUNTRY_REGION, POPULATION
-                    FROM ECDC_GLOBAL
-                ) p
-                  ON UPPER(v.COUNTRY_REGION) = UPPER(p.COUNTRY_REGION)
-                WHERE UPPER(v.COUNTRY_REGION) = %s
-                  AND v.TOTAL_VACCINATIONS IS NOT NULL
-                ORDER BY v.DATE
+            # country-level data, only countries with a population (as the join to ECDC_GLOBAL did)
+            populations = population.get(country.upper())
+            if not populations:
+                return jsonify([]), 200
+
+            query = f"""
+                SELECT COUNTRY_REGION, DATE,
+                       PEOPLE_VACCINATED, PEOPLE_FULLY_VACCINATED,
+                       TOTAL_VACCINATIONS
+                FROM OWID_VACCINATIONS
+                WHERE UPPER(COUNTRY_REGION) = %s
+                  AND TOTAL_VACCINATIONS IS NOT NULL
+                  {"AND DATE >= %s" if since is not None else ""}
+                ORDER BY DATE
             """
-            df_vax = fetch_data_from_snowflake(query, return_df=True, params=(country.upper(),))
+            df_vax = fetch_data_from_snowflake(query, return_df=True, params=(country.upper(),) + since_params)
+            df_vax = attach_population(df_vax, populations)
 
         if df_vax.empty:
             return jsonify([]), 200
 
+        df_vax = downsample(df_vax, "DATE", ["PEOPLE_VACCINATED", "PEOPLE_FULLY_VACCINATED", "TOTAL_VACCINATIONS"],
+                            max_points)
         df_vax["date"] = pd.to_datetime(df_vax["DATE"]).dt.strftime("%Y-%m-%d")
-        return jsonify(df_vax.to_dict(orient="records")), 200
+        return records_response(df_vax), 200
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
-@app.route(f"/{INFECTION_CASES_PAGE}", methods=["GET"])
-def get_infection_cases():
+def weekly_series(measure: str):
     """
-    return infection cases data for a given country or world
+    weekly measure (CASES_WEEKLY or DEATHS_WEEKLY) and population of ?country= or World
+    from the weekly dataset, one warehouse read per data version for both pages
+    with ?max_points= rows carry the running total (CUMULATIVE) of the full series
     """
     country = request.args.get("country")
     if not country:
         return jsonify({"error": "country parameter required"}), 400
-
     try:
-        if country.upper() == "WORLD":
-            # world-level aggregation
-            query = """
-                SELECT DATE,
-                       SUM(CASES_WEEKLY) AS CASES_WEEKLY,
-                       SUM(POPULATION) AS POPULATION
-                FROM ECDC_GLOBAL_WEEKLY
-                GROUP BY DATE
-                ORDER BY DATE
-            """
-            df = fetch_data_from_snowflake(query, return_df=True)
-        else:
-            # country-level data
-            query = """
-                SELECT COUNTRY_REGION, DATE,
-                       CASES_WEEKLY, POPULATION
-                FROM ECDC_GLOBAL_WEEKLY
-                WHERE UPPER(COUNTRY_REGION) = %s
-                ORDER BY DATE
-            """
-            df = fetch_data_from_snowflake(query, return_df=True, params=(country.upper(),))
+        since = since_arg()
+        max_points = max_points_arg()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    try:
+        df = weekly.get(current_data_version()).lookup(country, measure)
+        if max_points:
+            # over the whole history, negative corrections don't count (as on the dashboard)
+            df["CUMULATIVE"] = df[measure].clip(lower=0).fillna(0).cumsum()
+        if since is not None:
+            df = df[pd.to_datetime(df["DATE"]) >= since]
         if df.empty:
             return jsonify([]), 200
 
+        if max_points:
+            df = downsample(df, "DATE", [measure, "CUMULATIVE"], max_points)
         df["date"] = pd.to_datetime(df["DATE"]).dt.strftime("%Y-%m-%d")
-        return jsonify(df.to_dict(orient="records")), 200
+        return records_response(df), 200
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
+@app.route(f"/{INFECTION_CASES_PAGE}", methods=["GET"])
+@cache.cached(timeout=SERIES_CACHE_TTL, key_prefix=series_cache_key, unless=series_cache_disabled,
+              response_filter=_is_ok_response)
+def get_infection_cases():
+    """
+    return infection cases data for a given country or world
+    """
+    return weekly_series("CASES_WEEKLY")
+
+
 @app.route(f"/{INFECTION_DEATHS_PAGE}", methods=["GET"])
+@cache.cached(timeout=SERIES_CACHE_TTL, key_prefix=series_cache_key, unless=series_cache_disabled,
+              response_filter=_is_ok_response)
 def get_infection_deaths():
     """
     return infection deaths data for a given country or world
     """
-    country = request.args.get("country")
-    if not country:
-        return jsonify({"error": "country parameter required"}), 400
-
-    try:
-        if country.upper() == "WORLD":
-            query = """
-                SELECT DATE,
-                       SUM(DEATHS_WEEKLY) AS DEATHS_WEEKLY,
-                       SUM(POPULATION) AS POPULATION
-                FROM ECDC_GLOBAL_WEEKLY
-                GROUP BY DATE
-                ORDER BY DATE
-            """
-            df = fetch_data_from_snowflake(query, return_df=True)
-        else:
-            query = """
-                SELECT COUNTRY_REGION, DATE,
-                       DEATHS_WEEKLY, POPULATION
-                FROM ECDC_GLOBAL_WEEKLY
-                WHERE UPPER(COUNTRY_REGION) = %s
-                ORDER BY DATE
-            """
-            df = fetch_data_from_snowflake(query, return_df=True, params=(country.upper(),))
-
-        if df.empty:
-            return jsonify([]), 200
-
-        df["date"] = pd.to_datetime(df["DATE"]).dt.strftime("%Y-%m-%d")
-        return jsonify(df.to_dict(orient="records")), 200
-
-    except Exception as e:
-        traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+    return weekly_series("DEATHS_WEEKLY")
 
 
 @app.route(f"/{MORTALITY_FORECAST_PAGE}", methods=["GET"])
+# the mortality data doesn't change with the warehouse, one Prophet fit per country
+@cache.cached(timeout=SERIES_CACHE_TTL, query_string=True, unless=series_cache_disabled,
+              response_filter=_is_ok_response)
 def forecast_endpoint():
     country = request.args.get("country", "Lithuania")
     try:
-        df_out = build_forecast(country)
+        df_out = build_forecast(country, df_monthly=mortality.get().lookup(country))
         df_out["date"] = df_out["date"].dt.strftime("%Y-%m-%d")
-        return jsonify(df_out.to_dict(orient="records")), 200
+        return records_response(df_out), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route(f"/{CLUSTERING_PAGE}", methods=["GET"])
-def clustering_api():
-    k = int(request.args.get("k", 3))
-
+@single_flight   # concurrent cold requests wait for one fit instead of each running it
+@cache.memoize(timeout=3600)
+def get_precomputed_clusters(data_version: str) -> dict:
+    """
+    fetch yearly totals and fit KMeans for every k on the slider
+    cached per data version, so /clustering?k= is a lookup
+    """
     sql = """
     SELECT 
         COUNTRY_REGION,
@@ -335,29 +457,179 @@ def clustering_api():
     GROUP BY COUNTRY_REGION, EXTRACT(YEAR FROM DATE)
     """
     df = fetch_data_from_snowflake(sql)
+    return offload(precompute_clusters, df)
+
 
-    if df.empty:
+@single_flight
+@cache.memoize(timeout=3600)
+def get_precomputed_trajectories(data_version: str) -> dict:
+    """
+    cluster the weekly cases/deaths curves of the weekly dataset for every k on the slider
+    cached per data version
+    """
+    df = weekly.get(data_version).frame
+    return offload(precompute_trajectory_clusters, df)
+
+
+# clustering modes: six yearly numbers per country, or full weekly curves
+CLUSTERING_MODES = {
+    "yearly": get_precomputed_clusters,
+    "trajectory": get_precomputed_trajectories,
+}
+
+
+@app.route(f"/{CLUSTERING_PAGE}", methods=["GET"])
+def clustering_api():
+    """
+    return the precomputed clustering for ?k= (2-6, at most one cluster per country)
+    """
+    try:
+        k = int(request.args.get("k", 3))
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+
+    mode = request.args.get("mode", "yearly")
+    if mode not in CLUSTERING_MODES:
+        return jsonify({"error": f"Invalid mode: {mode}"}), 400
+
+    try:
+        precomputed = CLUSTERING_MODES[mode](current_data_version())
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+    try:
+        df_clusters = clusters_for_k(precomputed, k)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if df_clusters.empty:
         return jsonify([]), 200
 
-    df_clusters = run_clustering(df, k)
-    return df_clusters.to_json(orient="records"), 200
+    with phase("serialize"):
+        body = df_clusters.to_json(orient="records")
+    return body, 200
+
+
+@app.route(f"/{CLUSTERING_PAGE}/scores", methods=["GET"])
+def clustering_scores_api():
+    """
+    return silhouette and inertia for every precomputed k
+    """
+    mode = request.args.get("mode", "yearly")
+    if mode not in CLUSTERING_MODES:
+        return jsonify({"error": f"Invalid mode: {mode}"}), 400
+
+    try:
+        precomputed = CLUSTERING_MODES[mode](current_data_version())
+        return jsonify(cluster_scores(precomputed)), 200
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@cache.memoize(timeout=600)
+def table_columns(table: str) -> list:
+    """
+    return the (name, type) columns of a table from INFORMATION_SCHEMA
+    """
+    return get_table_columns(table, fetch_data_from_snowflake)
+
+
+def eda_source(table: str, columns=None, where=None, sample=None) -> dict:
+    """
+    compile the columns/where/sample parameters of an EDA request into safe SQL parts
+    raises ValueError for unknown tables/columns and invalid predicates
+    """
+    return build_source(table, table_columns(table), columns, where, sample, dialect=warehouse_backend())
+
+
+def _eda_filters() -> dict:
+    """
+    columns/where/sample of an EDA request, from the query string or a json body
+    """
+    body = request.get_json(silent=True) or {}
+    return {key: request.args.get(key) or body.get(key) for key in ("columns", "where", "sample")}
+
+
 @app.route(f"/{EDA_PAGE}", methods=["GET"])
 def run_eda_api():
+    """
+    run EDA on a table
+    mode=sample (default) profiles the first 5000 rows in pandas,
+    mode=stream reads the whole table in Arrow batches with mergeable statistics
+    mode=pushdown computes the statistics inside the warehouse with one aggregate query
+    columns=A,B, where=<predicate> and sample=<percent> narrow the rows and columns read
+    """
     table = request.args.get("table")
     if not table:
         return jsonify({"error": "table parameter required"}), 400
 
-    try:
-        sql = f"SELECT * FROM {table} LIMIT 5000"
-        df = fetch_data_from_snowflake(sql, return_df=True)
+    mode = request.args.get("mode", "sample")
+    if mode not in ("sample", "stream", "pushdown"):
+        return jsonify({"error": f"Invalid mode: {mode}"}), 400
 
-        from eda import run_basic_eda
-        results = run_basic_eda(df, name=table)
+    try:
+        filters = _eda_filters()
+        source = eda_source(table, **filters)
+        # /eda/preview serves the table's first rows, filtered or sampled rows aren't
+        keep_preview = not any(filters.values())
+        if mode == "stream":
+            batches = fetch_arrow_batches_from_snowflake(build_select(source), params=source["params"])
+            results = run_streaming_eda(batches, name=table, workers=EDA_STREAM_WORKERS, keep_preview=keep_preview)
+        elif mode == "pushdown":
+            results = run_pushdown_eda(source, fetch_data_from_snowflake, dialect=warehouse_backend())
+        else:
+            sql = build_select(source, limit=EDA_SAMPLE_ROWS)
+            df = fetch_data_from_snowflake(sql, return_df=True, params=source["params"])
+            results = offload(run_basic_eda, df, name=table, keep_preview=keep_preview)
 
         # ensure safe JSON
-        from eda import _make_json_safe
         return jsonify(_make_json_safe(results)), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route(f"/{EDA_PAGE}/preview", methods=["GET"])
+def get_eda_preview():
+    """
+    return the first rows of a table from the bounded preview cache
+    ?columns=A,B projects columns, ?rows=N limits rows (max 50)
+    tables not profiled yet by this worker are read once and cached
+    """
+    table = request.args.get("table")
+    if not table:
+        return jsonify({"error": "table parameter required"}), 400
+
+    try:
+        rows = int(request.args.get("rows", PREVIEW_ROWS))
+    except ValueError:
+        return jsonify({"error": "rows must be an integer"}), 400
+    if not 1 <= rows <= PREVIEW_ROWS:
+        return jsonify({"error": f"rows must be between 1 and {PREVIEW_ROWS}"}), 400
+
+    try:
+        df = previews.get(table)
+        if df is None:
+            sql = f"SELECT * FROM {'.'.join(split_table_name(table))} LIMIT {PREVIEW_ROWS}"
+            df = fetch_data_from_snowflake(sql, return_df=True)
+            previews.put(table, df)
+
+        columns = [c for c in request.args.get("columns", "").split(",") if c]
+        unknown = [c for c in columns if c not in df.columns]
+        if unknown:
+            return jsonify({"error": f"Unknown columns: {', '.join(unknown)}"}), 400
+
+        df = df[columns or list(df.columns)].head(rows)
+        df = df.astype(object).where(df.notna(), None)
+        return records_response(df), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
@@ -365,17 +637,24 @@ def run_eda_api():
 
 # --- api endpoints ---
 
+# tables that can be queried for a country list
+COUNTRY_TABLES = ["ECDC_GLOBAL", "ECDC_GLOBAL_WEEKLY", "OWID_VACCINATIONS"]
+
+
 @app.route("/countries", methods=["GET"])
-@cache.cached(query_string=True)   # cache per ?table= value
+@cache.cached(query_string=True, response_filter=_is_ok_response)   # cache per ?table= / ?tables= value
 def get_countries():
     """
     return list of distinct countries from a given table
+    with ?tables=A,B return {table: [countries]} for several tables in one query
     """
+    if "tables" in request.args:
+        return get_countries_for_tables(request.args["tables"].split(","))
+
     table_name = request.args.get("table", "ECDC_GLOBAL")
     try:
         # Ensure table_name is validated to prevent SQL injection
-        allowed_tables = ["ECDC_GLOBAL", "ECDC_GLOBAL_WEEKLY", "OWID_VACCINATIONS"]
-        if table_name not in allowed_tables:
+        if table_name not in COUNTRY_TABLES:
             return jsonify({"error": f"Invalid table name: {table_name}"}), 400
 
         query = f"SELECT DISTINCT COUNTRY_REGION FROM {table_name}"
@@ -383,17 +662,102 @@ def get_countries():
         snowflake_countries = [country[0] for country in countries]
 
         # find common countries with mortality dataset
-        common_countries = set(df_mortality['country_name']).intersection(set(snowflake_countries))
+        common_countries = mortality.get().countries.intersection(set(snowflake_countries))
         common_countries_list = sorted(list(common_countries))
-    except Exception:
-        common_countries_list = []
+    except Exception as e:
         traceback.print_exc()
+        return jsonify({"error": str(e)}), 503
 
     return jsonify(common_countries_list), 200
 
 
+def get_countries_for_tables(tables: list):
+    """
+    return {table: [countries]} for several tables
+    all tables are read with a single UNION ALL query
+    """
+    invalid = [t for t in tables if t not in COUNTRY_TABLES]
+    if invalid or not tables:
+        return jsonify({"error": f"Invalid table name: {', '.join(invalid)}"}), 400
+
+    try:
+        query = " UNION ALL ".join(
+            f"SELECT DISTINCT '{t}' AS TABLE_NAME, COUNTRY_REGION FROM {t}" for t in tables
+        )
+        rows = fetch_data_from_snowflake(query, return_df=False)
+
+        # find common countries with mortality dataset per table
+        mortality_countries = mortality.get().countries
+        result = {t: set() for t in tables}
+        for table_name, country in rows:
+            if country in mortality_countries:
+                result[table_name].add(country)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({t: sorted(c) for t, c in result.items()}), 200
+
+
+@app.route("/data-version", methods=["GET"])
+def get_data_version():
+    """
+    return the current data version, clients use it to key their caches
+    """
+    try:
+        return jsonify({"version": current_data_version()}), 200
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 503
+
+
+@app.route("/ready", methods=["GET"])
+def get_readiness():
+    """
+    return the startup state of this worker, 503 until the required data is loaded
+    """
+    status = readiness(BOOT)
+    status["warmer"] = warmer_status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    return request phase histograms in the Prometheus text format
+    """
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+# orderings of /admin/queries
+QUERY_ORDERS = ("total", "p95", "max", "mean", "calls")
+
+
+@app.route("/admin/queries", methods=["GET"])
+def get_query_stats():
+    """
+    return the top-N warehouse queries of this worker by total or p95 time (?order=, ?n=)
+    and its latest slow queries
+    """
+    order = request.args.get("order", "total")
+    if order not in QUERY_ORDERS:
+        return jsonify({"error": f"order must be one of {', '.join(QUERY_ORDERS)}"}), 400
+    try:
+        n = int(request.args.get("n", 20))
+    except ValueError:
+        return jsonify({"error": "n must be an integer"}), 400
+    n = max(1, min(n, 500))
+
+    return jsonify({
+        "slow_query_ms": SLOW_QUERY_MS,
+        "order": order,
+        "queries": top_queries(n, order),
+        "recent_slow": recent_slow_queries(n),
+    }), 200
+
+
 @app.route("/comments", methods=["GET"])
-@cache.cached(query_string=True)   # cache per ?country= & ?page=
+@comments_cache.cached(query_string=True)   # cache per ?country= & ?page=
 def get_comments():
     """
     return list of comments (filtered by country or page if provided)
@@ -404,7 +768,7 @@ def get_comments():
     if "page" in request.args:
         query["page"] = request.args["page"]
 
-    comments = list(comments_col.find(query, {"_id": 0}))
+    comments = list(mongo.get().comments.find(query, {"_id": 0}))
     for c in comments:
         if "image_id" in c:
             c["image_url"] = f"/comments/image/{c['image_id']}"
@@ -430,23 +794,123 @@ def list_tables():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route(f"/{EDA_PAGE}/report", methods=["GET"])
-def download_eda_report():
+
+@app.route(f"/{EDA_PAGE}/columns", methods=["GET"])
+def list_table_columns():
+    """
+    return the columns of a table with their types
+    """
     table = request.args.get("table")
     if not table:
         return jsonify({"error": "table parameter required"}), 400
 
     try:
-        sql = f"SELECT * FROM {table} LIMIT 5000"
-        df = fetch_data_from_snowflake(sql, return_df=True)
+        return jsonify([{"name": name, "type": dtype} for name, dtype in table_columns(table)]), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@cache.memoize(timeout=60)
+def table_data_version(table: str) -> str:
+    """
+    return the version of a single table, checked at most once a minute
+    """
+    return fetch_data_version(tables=(table.split(".")[-1].upper(),))
+
+
+def _eda_report_builder(table: str, source: dict):
+    """
+    return the function a report job runs to build the report of a table
+    """
+    def build(out_file):
+        sql = build_select(source, limit=EDA_SAMPLE_ROWS)
+        df = fetch_data_from_snowflake(sql, return_df=True, params=source["params"])
+        # ydata-profiling is CPU-bound, in a gevent worker it would hold every greenlet
+        offload(run_detailed_eda, df, name=table, out_file=out_file)
+    return build
 
-        from eda import run_detailed_eda
-        out_file = run_detailed_eda(df, name=table)
-        if not out_file or not os.path.exists(out_file):
-            return jsonify({"error": "Report generation failed"}), 500
 
-        return send_file(out_file, as_attachment=True)
+def _submit_eda_report(table: str, filters: dict) -> dict:
+    source = eda_source(table, **filters)
+    # one report per table, data version and set of filters
+    version = table_data_version(table)
+    if any(filters.values()):
+        version += hashlib.sha1(repr(sorted(filters.items())).encode()).hexdigest()[:8]
+    return submit_job(table, version, _eda_report_builder(table, source))
 
+
+@app.route(f"/{EDA_PAGE}/report/jobs", methods=["POST"])
+def submit_eda_report():
+    """
+    submit a detailed report job for a table
+    returns the job, existing jobs for the same table, data version and filters are reused
+    """
+    table = request.args.get("table") or (request.get_json(silent=True) or {}).get("table")
+    if not table:
+        return jsonify({"error": "table parameter required"}), 400
+
+    try:
+        job = _submit_eda_report(table, _eda_filters())
+        return jsonify(job), 200 if job["status"] == DONE else 202
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route(f"/{EDA_PAGE}/report/jobs/<job_id>", methods=["GET"])
+def eda_report_status(job_id):
+    """
+    return the status of a report job (queued, running, done or failed)
+    """
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
+
+
+@app.route(f"/{EDA_PAGE}/report/jobs/<job_id>/result", methods=["GET"])
+def eda_report_result(job_id):
+    """
+    return the finished report of a job as a download
+    """
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] != DONE:
+        return jsonify(job), 409
+
+    try:
+        return send_file(report_path(job_id), as_attachment=True, download_name=f"eda_{job_id}_report.html")
+    except FileNotFoundError:
+        # evicted after the status was read
+        return jsonify({"error": "Report expired, submit the job again"}), 410
+
+
+@app.route(f"/{EDA_PAGE}/report", methods=["GET"])
+def download_eda_report():
+    """
+    return the cached report of a table, or submit a job and return it with 202
+    """
+    table = request.args.get("table")
+    if not table:
+        return jsonify({"error": "table parameter required"}), 400
+
+    try:
+        job = _submit_eda_report(table, _eda_filters())
+        if job["status"] == DONE:
+            try:
+                return send_file(report_path(job["job_id"]), as_attachment=True)
+            except FileNotFoundError:
+                # evicted after the status was read, build it again
+                job = _submit_eda_report(table, _eda_filters())
+        return jsonify(job), 202
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
@@ -454,33 +918,34 @@ def download_eda_report():
 @app.route("/patterns", methods=["GET"])
 def covid_patterns():
     """
-    Detect COVID waves (rise -> peak -> fall) for a given country using MATCH_RECOGNIZE
+    Detect COVID waves (rise -> peak -> fall) for a given country
+    from the wave catalog of the weekly dataset, the WAVES table (PATTERNS_ENGINE=table)
+    or with MATCH_RECOGNIZE (PATTERNS_ENGINE=sql)
+    ?smoothing=<1-8 weeks> and ?min_prominence=<0-0.9, by 0.1> tune the catalog (numpy engine only)
     """
     country = request.args.get("country")
     if not country:
         return jsonify({"error": "country parameter required"}), 400
 
     try:
-        sql = """
-            SELECT *
-            FROM ECDC_GLOBAL_WEEKLY
-            MATCH_RECOGNIZE (
-              PARTITION BY COUNTRY_REGION
-              ORDER BY DATE
-              MEASURES
-                FIRST(DATE) AS wave_start,
-                LAST(DATE) AS wave_end,
-                MAX(CASES_WEEKLY) AS peak_cases
-              ONE ROW PER MATCH
-              PATTERN (rise+ peak fall+)
-              DEFINE
-                rise AS CASES_WEEKLY > LAG(CASES_WEEKLY),
-                peak AS CASES_WEEKLY >= LAG(CASES_WEEKLY) AND CASES_WEEKLY >= LEAD(CASES_WEEKLY),
-                fall AS CASES_WEEKLY < LAG(CASES_WEEKLY)
-            )
-            WHERE UPPER(COUNTRY_REGION) = %s
-        """
-        df = fetch_data_from_snowflake(sql, return_df=True, params=(country.upper(),))
+        smoothing = int(request.args.get("smoothing", 1))
+        min_prominence = float(request.args.get("min_prominence", 0))
+    except ValueError:
+        return jsonify({"error": "smoothing must be an integer and min_prominence a number"}), 400
+    # the slider steps only: each setting is a catalog of every country
+    steps = [step for step in PROMINENCE_STEPS if abs(step - min_prominence) < 1e-9]
+    if smoothing not in SMOOTHING_WEEKS or not steps:
+        return jsonify({"error": f"smoothing must be {SMOOTHING_WEEKS.start}-{SMOOTHING_WEEKS.stop - 1} weeks "
+                                 f"and min_prominence one of {', '.join(map(str, PROMINENCE_STEPS))}"}), 400
+    min_prominence = steps[0]
+
+    try:
+        if PATTERNS_ENGINE == "sql":
+            df = fetch_sql_waves(fetch_data_from_snowflake, country)
+        elif PATTERNS_ENGINE == "table":
+            df = fetch_table_waves(fetch_data_from_snowflake, country)
+        else:
+            df = waves.get(current_data_version()).get(smoothing, min_prominence).country(country)
 
         if df.empty:
             return jsonify([]), 200
@@ -488,7 +953,7 @@ def covid_patterns():
         df["wave_start"] = pd.to_datetime(df["WAVE_START"]).dt.strftime("%Y-%m-%d")
         df["wave_end"] = pd.to_datetime(df["WAVE_END"]).dt.strftime("%Y-%m-%d")
 
-        return jsonify(df.to_dict(orient="records")), 200
+        return records_response(df), 200
 
     except Exception as e:
         traceback.print_exc()
@@ -496,5 +961,9 @@ def covid_patterns():
 
 
 
+# process age once the app is importable; with --preload this is the master's boot,
+# forked workers start from here
+BOOT = {"pid": os.getpid(), "seconds": process_age()}
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -1,38 +1,177 @@
 #api/src/clustering.py
+import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+from joblib import Parallel, delayed
 
-def run_clustering(df: pd.DataFrame, k: int = 3) -> pd.DataFrame:
+# scikit-learn is imported by the functions that fit, on first use,
+# so importing this module (and booting the API) stays cheap
+
+# cluster counts offered by the slider on the dashboard
+K_RANGE = range(2, 7)
+YEARS = [2020, 2021, 2022]
+
+
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Compute clusters based on Covid-19 deaths + cases per 100k.
-    Vaccination is optional (if available).
+    Build Covid-19 deaths + cases per 100k for every country and year
+    with a single pivot instead of a loop over countries.
+    Countries without population are dropped.
+    """
+    pop = df.groupby("COUNTRY_REGION")["POPULATION"].max().astype(float)
+    pop = pop[pop > 0]
+
+    totals = df.pivot_table(
+        index="COUNTRY_REGION",
+        columns=df["YEAR"].astype(int),
+        values=["TOTAL_DEATHS", "TOTAL_CASES"],
+        aggfunc="sum",
+        fill_value=0
+    ).astype(float)
+
+    df_feat = pd.DataFrame({"country": pop.index})
+    for year in YEARS:
+        deaths = totals.get(("TOTAL_DEATHS", year), pd.Series(0.0, index=totals.index)).reindex(pop.index, fill_value=0)
+        cases = totals.get(("TOTAL_CASES", year), pd.Series(0.0, index=totals.index)).reindex(pop.index, fill_value=0)
+        df_feat[f"deaths_{year}_per100k"] = (deaths / pop * 100000).to_numpy()
+        df_feat[f"cases_{year}_per100k"] = (cases / pop * 100000).to_numpy()
+
+    return df_feat.dropna().reset_index(drop=True)
+
+
+def _fit_kmeans(X_scaled: np.ndarray, k: int, minibatch: bool = False) -> dict:
+    """
+    Fit KMeans (or MiniBatchKMeans for wide matrices) for one k,
+    returns labels, inertia and silhouette
     """
-    features = []
-    for country, grp in df.groupby("COUNTRY_REGION"):
-        pop = grp["POPULATION"].max() or None
-        if not pop or pop == 0:
-            continue
-        rec = {"country": country}
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
 
-        for year in [2020, 2021, 2022]:
-            deaths = grp.loc[grp["YEAR"] == year, "TOTAL_DEATHS"].sum()
-            cases = grp.loc[grp["YEAR"] == year, "TOTAL_CASES"].sum()
-            rec[f"deaths_{year}_per100k"] = (deaths / pop) * 100000 if deaths else 0
-            rec[f"cases_{year}_per100k"] = (cases / pop) * 100000 if cases else 0
+    model = MiniBatchKMeans if minibatch else KMeans
+    km = model(n_clusters=k, random_state=42, n_init="auto").fit(X_scaled)
+    silhouette = silhouette_score(X_scaled, km.labels_) if 1 < k < len(X_scaled) else None
+    return {
+        "k": k,
+        "labels": km.labels_.astype(int),
+        "inertia": float(km.inertia_),
+        "silhouette": float(silhouette) if silhouette is not None else None
+    }
 
-        features.append(rec)
 
-    df_feat = pd.DataFrame(features).dropna()
+def precompute_clusters(df: pd.DataFrame, k_values=K_RANGE, n_jobs: int = -1) -> dict:
+    """
+    Build and scale the feature matrix once, then fit KMeans
+    for every k in parallel.
+    Returns the features, the scaled matrix and per-k results.
+    """
+    df_feat = build_features(df) if not df.empty else pd.DataFrame()
     if df_feat.empty:
-        return pd.DataFrame()
+        return {"features": df_feat, "X_scaled": None, "results": {}}
 
-    # Normalize features
     from sklearn.preprocessing import StandardScaler
-    from sklearn.cluster import KMeans
+
+    # Normalize features
     X = df_feat.drop(columns=["country"]).values
     X_scaled = StandardScaler().fit_transform(X)
 
-    km = KMeans(n_clusters=k, random_state=42, n_init="auto").fit(X_scaled)
-    df_feat["cluster"] = km.labels_.astype(int)
+    ks = [k for k in k_values if k <= len(X_scaled)]
+    fits = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(_fit_kmeans)(X_scaled, k) for k in ks)
+
+    return {"features": df_feat, "X_scaled": X_scaled, "results": {fit["k"]: fit for fit in fits}}
+
+
+def build_trajectories(df: pd.DataFrame):
+    """
+    Build a compact float32 matrix (countries x weeks) of weekly
+    cases and deaths curves from ECDC_GLOBAL_WEEKLY rows.
+    Each curve is per 100k and scaled by its own peak, so countries
+    are compared by the shape of their waves, not their size.
+    Returns the country names and the matrix [cases | deaths].
+    """
+    df = df[df["POPULATION"].astype(float) > 0]
+    countries, c_idx = np.unique(df["COUNTRY_REGION"].to_numpy(), return_inverse=True)
+    weeks, w_idx = np.unique(pd.to_datetime(df["DATE"]).to_numpy(), return_inverse=True)
+    pop = df.groupby("COUNTRY_REGION")["POPULATION"].max().reindex(countries).to_numpy(dtype=np.float32)
+
+    curves = []
+    for measure in ["CASES_WEEKLY", "DEATHS_WEEKLY"]:
+        m = np.zeros((len(countries), len(weeks)), dtype=np.float32)
+        np.add.at(m, (c_idx, w_idx), df[measure].fillna(0).to_numpy(dtype=np.float32))
+        np.clip(m, 0, None, out=m)
+        m *= (100000 / pop)[:, None]
+        peak = m.max(axis=1, keepdims=True)
+        np.divide(m, peak, out=m, where=peak > 0)
+        curves.append(m)
+
+    return countries, np.hstack(curves)
 
-    return df_feat
+
+def precompute_trajectory_clusters(df: pd.DataFrame, k_values=K_RANGE, n_jobs: int = -1) -> dict:
+    """
+    Cluster countries on their normalized weekly cases/deaths curves
+    with MiniBatchKMeans for every k in parallel.
+    The records carry the same yearly per-100k features as the
+    yearly mode, so the dashboard renders both the same way.
+    """
+    if df.empty:
+        return {"features": pd.DataFrame(), "X_scaled": None, "results": {}, "minibatch": True}
+
+    # yearly totals for the records, from the same weekly rows
+    dates = pd.to_datetime(df["DATE"])
+    df_years = (
+        df[dates.dt.year.isin(YEARS)]
+        .assign(YEAR=dates.dt.year)
+        .groupby(["COUNTRY_REGION", "YEAR"])
+        .agg(TOTAL_DEATHS=("DEATHS_WEEKLY", "sum"),
+             TOTAL_CASES=("CASES_WEEKLY", "sum"),
+             POPULATION=("POPULATION", "max"))
+        .reset_index()
+    )
+    df_feat = build_features(df_years)
+
+    countries, X = build_trajectories(df)
+    keep = np.isin(countries, df_feat["country"].to_numpy())
+    countries, X = countries[keep], X[keep]
+    df_feat = df_feat.set_index("country").loc[countries].reset_index()
+
+    ks = [k for k in k_values if k <= len(X)]
+    fits = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(_fit_kmeans)(X, k, True) for k in ks)
+
+    return {"features": df_feat, "X_scaled": X, "results": {fit["k"]: fit for fit in fits}, "minibatch": True}
+
+
+def clusters_for_k(precomputed: dict, k: int) -> pd.DataFrame:
+    """
+    Look up the clustering for k in precomputed results,
+    raises ValueError if k was not precomputed (outside K_RANGE
+    or more clusters than countries), nothing is fitted per request.
+    """
+    df_feat = precomputed["features"]
+    if df_feat.empty:
+        return pd.DataFrame()
+
+    fit = precomputed["results"].get(k)
+    if fit is None:
+        ks = sorted(precomputed["results"])
+        raise ValueError(f"k must be one of {', '.join(map(str, ks))}" if ks else "no clustering available")
+
+    df_out = df_feat.copy()
+    df_out["cluster"] = fit["labels"]
+    return df_out
+
+
+def cluster_scores(precomputed: dict) -> list:
+    """
+    Silhouette and inertia for every precomputed k
+    """
+    return [
+        {"k": k, "inertia": fit["inertia"], "silhouette": fit["silhouette"]}
+        for k, fit in sorted(precomputed["results"].items())
+    ]
+
+
+def run_clustering(df: pd.DataFrame, k: int = 3) -> pd.DataFrame:
+    """
+    Compute clusters based on Covid-19 deaths + cases per 100k.
+    Vaccination is optional (if available).
+    """
+    return clusters_for_k(precompute_clusters(df, k_values=[k], n_jobs=1), k)
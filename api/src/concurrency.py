@@ -0,0 +1,60 @@
+# api/src/concurrency.py
+import functools
+import sys
+import threading
+
+# Helpers for running the API under threaded (gthread) and cooperative
+# (gevent) gunicorn workers, see api/gunicorn.conf.py.
+#   - single_flight: concurrent calls of an expensive cached function with the
+#     same arguments wait for one computation instead of all running it
+#   - offload: CPU-bound work (KMeans fits, EDA statistics and reports) runs in
+#     gevent's native thread pool so it doesn't stall every other greenlet of the
+#     worker. Not for work that starts subprocesses (Prophet's Stan fit): gevent
+#     can only watch children from the main thread, and waiting for a subprocess
+#     is cooperative anyway
+# Both use threading primitives, which gevent's monkey patching makes cooperative.
+
+
+def cooperative() -> bool:
+    """True in a gevent worker, when the stdlib is monkey patched"""
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("socket")
+
+
+def single_flight(fn):
+    """
+    let one caller per argument tuple run fn, the others wait and then
+    call it again, which for a memoized fn is a cache hit
+    """
+    guard = threading.Lock()
+    inflight = {}       # arguments -> [lock, waiters]
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        with guard:
+            entry = inflight.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                return fn(*args, **kwargs)
+        finally:
+            with guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del inflight[key]
+
+    return wrapper
+
+
+def offload(fn, *args, **kwargs):
+    """
+    run a CPU-bound fn: in gevent's thread pool in a gevent worker,
+    directly otherwise (threads already run it in parallel with I/O)
+    """
+    if not cooperative():
+        return fn(*args, **kwargs)
+
+    import gevent
+
+    return gevent.get_hub().threadpool.apply(fn, args, kwargs)
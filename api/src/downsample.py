@@ -0,0 +1,67 @@
+# api/src/downsample.py
+import numpy as np
+import pandas as pd
+
+# Visual downsampling of time series for ?max_points= (largest triangle three
+# buckets). A chart can't show more points than it has pixels, so the
+# dashboards ask for about their width and the payload stays the same size
+# whatever the length of the history.
+
+MIN_POINTS = 3      # first, last and at least one bucket
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """
+    indices of the n points of (x, y) that keep the shape of the line
+    Vectorized over all buckets: the point picked in a bucket forms the largest
+    triangle with the averages of the previous and the next bucket (classic LTTB
+    uses the previously picked point, which makes it sequential).
+    First and last points are always kept, missing y values count as the last known one.
+    """
+    size = len(y)
+    if n >= size or n < MIN_POINTS:
+        return np.arange(size)
+
+    x = np.asarray(x, dtype=float)
+    y = pd.Series(np.asarray(y, dtype=float)).ffill().fillna(0).to_numpy()
+
+    # points 1..size-2 split into n-2 buckets
+    edges = np.linspace(1, size - 1, n - 1).astype(int)
+    starts, stops = edges[:-1], edges[1:]
+    counts = stops - starts
+
+    csx, csy = np.r_[0, np.cumsum(x)], np.r_[0, np.cumsum(y)]
+    avg_x = (csx[stops] - csx[starts]) / counts
+    avg_y = (csy[stops] - csy[starts]) / counts
+
+    # neighbours of every bucket: previous average (first point) and next average (last point)
+    ax, ay = np.r_[x[0], avg_x[:-1]], np.r_[y[0], avg_y[:-1]]
+    cx, cy = np.r_[avg_x[1:], x[-1]], np.r_[avg_y[1:], y[-1]]
+
+    bucket = np.repeat(np.arange(n - 2), counts)
+    points = np.arange(1, size - 1)
+    area = np.abs((ax[bucket] - cx[bucket]) * (y[points] - ay[bucket])
+                  - (ax[bucket] - x[points]) * (cy[bucket] - ay[bucket]))
+
+    # first point with the largest area of each bucket
+    best = np.maximum.reduceat(area, starts - 1)
+    hits = np.flatnonzero(area == best[bucket])
+    _, first = np.unique(bucket[hits], return_index=True)
+    return np.r_[0, points[hits[first]], size - 1]
+
+
+def downsample(df: pd.DataFrame, x: str, columns: list, max_points: int) -> pd.DataFrame:
+    """
+    rows of df (sorted by x) picked by LTTB on every column, at most max_points
+    (3 per column at least): each column gets an equal share, the rows kept are their union
+    """
+    if max_points is None or len(df) <= max_points:
+        return df
+
+    xs = pd.to_datetime(df[x]).to_numpy(dtype="datetime64[s]").astype(float) / 86400
+    share = max(max_points // len(columns), MIN_POINTS)
+    keep = np.unique(np.concatenate([
+        lttb_indices(xs, pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float), share)
+        for col in columns
+    ]))
+    return df.iloc[keep].reset_index(drop=True)
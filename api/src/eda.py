@@ -1,6 +1,52 @@
 # api/src/eda.py
 import pandas as pd
 import os
+import threading
+from collections import OrderedDict
+
+# first rows of every profiled table, served by /eda/preview
+PREVIEW_ROWS = 50
+PREVIEW_MAX_BYTES = int(os.getenv("EDA_PREVIEW_MAX_BYTES", 32 * 1024 * 1024))
+
+
+class PreviewCache:
+    """
+    Bounded in-memory LRU of table previews (DataFrames),
+    least recently used previews are evicted above max_bytes
+    """
+
+    def __init__(self, max_bytes: int = PREVIEW_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()     # name -> (df, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, name: str, df: pd.DataFrame) -> None:
+        df = df.head(PREVIEW_ROWS).copy()
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if name in self._items:
+                self._bytes -= self._items.pop(name)[1]
+            self._items[name] = (df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._bytes -= evicted
+
+    def get(self, name: str):
+        """the preview of a table, or None"""
+        with self._lock:
+            item = self._items.get(name)
+            if item is None:
+                return None
+            self._items.move_to_end(name)
+            return item[0]
+
+
+previews = PreviewCache()
+
 
 def _make_json_safe(obj):
     """Convert Pandas/numpy objects to JSON-safe types recursively"""
@@ -17,8 +63,11 @@ def _make_json_safe(obj):
     return obj
 
 
-def run_basic_eda(df: pd.DataFrame, name: str = "dataset") -> dict:
-    """Run a simple EDA on a pandas DataFrame."""
+def run_basic_eda(df: pd.DataFrame, name: str = "dataset", keep_preview: bool = True) -> dict:
+    """
+    Run a simple EDA on a pandas DataFrame.
+    keep_preview=False for filtered or sampled rows, which aren't the table's first rows
+    """
     results = {}
     results["shape"] = (int(df.shape[0]), int(df.shape[1]))
     results["columns"] = {str(k): str(v) for k, v in df.dtypes.to_dict().items()}
@@ -26,15 +75,15 @@ def run_basic_eda(df: pd.DataFrame, name: str = "dataset") -> dict:
     results["summary_stats"] = _make_json_safe(df.describe(include="all").to_dict())
     results["correlations"] = _make_json_safe(df.corr(numeric_only=True).to_dict())
 
-    # Save preview
-    preview_path = f"eda_{name}_preview.csv"
-    df.head(50).to_csv(preview_path, index=False)
-    results["preview_file"] = preview_path
+    # Keep preview
+    if keep_preview:
+        previews.put(name, df)
     return results
 
-def run_detailed_eda(df: pd.DataFrame, name: str = "dataset"):
+def run_detailed_eda(df: pd.DataFrame, name: str = "dataset", out_file: str = None):
     """
     Generate a detailed HTML profiling report if ydata-profiling is installed.
+    Writes to out_file if given, otherwise into the reports directory.
     Returns the absolute path of the report file.
     """
     try:
@@ -43,12 +92,13 @@ def run_detailed_eda(df: pd.DataFrame, name: str = "dataset"):
         print("⚠️ ydata-profiling not installed. Skipping detailed EDA.")
         return None
 
-    # Ensure reports directory exists
-    reports_dir = os.path.join(os.path.dirname(__file__), "reports")
-    os.makedirs(reports_dir, exist_ok=True)
+    if out_file is None:
+        # Ensure reports directory exists
+        reports_dir = os.path.join(os.path.dirname(__file__), "reports")
+        os.makedirs(reports_dir, exist_ok=True)
 
-    safe_name = name.replace(".", "_").replace(" ", "_")
-    out_file = os.path.join(reports_dir, f"eda_{safe_name}_report.html")
+        safe_name = name.replace(".", "_").replace(" ", "_")
+        out_file = os.path.join(reports_dir, f"eda_{safe_name}_report.html")
 
     profile = ProfileReport(df, title=f"EDA Report for {name}", explorative=True)
     profile.to_file(out_file)
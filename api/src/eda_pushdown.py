@@ -0,0 +1,125 @@
+# api/src/eda_pushdown.py
+import math
+import re
+from decimal import Decimal
+
+from src.eda_query import quote
+
+# Warehouse-side EDA.
+# Column types are read from INFORMATION_SCHEMA.COLUMNS and all summary
+# statistics are computed by one aggregate query per table, so only a few
+# hundred numbers cross the network instead of the table rows.
+# Works on Snowflake and on the local DuckDB stand-in, the dialects only
+# differ in the name of the approximate percentile function.
+
+DIALECTS = {
+    "snowflake": {"percentile": "APPROX_PERCENTILE({col}, {q})"},
+    "local": {"percentile": "APPROX_QUANTILE({col}, {q})"},
+}
+
+# numeric INFORMATION_SCHEMA.COLUMNS.DATA_TYPE values (snowflake + duckdb)
+NUMERIC_TYPE = re.compile(
+    r"(NUMBER|DECIMAL|NUMERIC)(\(.*\))?|FLOAT\d*|DOUBLE( PRECISION)?|REAL|BYTEINT|U?(TINY|SMALL|BIG|HUGE)?INT(EGER|\d+)?",
+    re.IGNORECASE
+)
+QUANTILES = [(0.25, "25%"), (0.5, "50%"), (0.75, "75%")]
+MAX_CORR_COLUMNS = 50   # CORR pairs grow quadratically with the numeric columns
+
+
+def build_pushdown_query(source: dict, dialect: str = "snowflake"):
+    """
+    Build the single aggregate query for a compiled source (see eda_query.build_source).
+    Returns the sql and the plan, a list of (column, statistic) in select order,
+    numeric columns get count/min/max/mean/std/quartiles, the others count/unique,
+    numeric pairs get CORR (pairwise complete rows, like pandas).
+    """
+    percentile = DIALECTS[dialect]["percentile"]
+    columns = source["columns"]
+    numeric = [name for name, dtype in columns if NUMERIC_TYPE.fullmatch(dtype)]
+
+    exprs, plan = ["COUNT(*)"], [(None, "rows")]
+    for name, _ in columns:
+        col = quote(name)
+        stats = [("count", f"COUNT({col})"), ("nulls", f"COUNT_IF({col} IS NULL)")]
+        if name in numeric:
+            stats += [
+                ("min", f"MIN({col})"),
+                ("max", f"MAX({col})"),
+                ("mean", f"AVG({col})"),
+                ("std", f"STDDEV({col})"),
+            ]
+            stats += [(key, percentile.format(col=col, q=q)) for q, key in QUANTILES]
+        else:
+            stats.append(("unique", f"APPROX_COUNT_DISTINCT({col})"))
+        for stat, expr in stats:
+            exprs.append(expr)
+            plan.append((name, stat))
+
+    corr_columns = numeric[:MAX_CORR_COLUMNS]
+    for i, a in enumerate(corr_columns):
+        for b in corr_columns[i + 1:]:
+            exprs.append(f"CORR({quote(a)}, {quote(b)})")
+            plan.append(((a, b), "corr"))
+
+    select = ",\n    ".join(f"{expr} AS S{i}" for i, expr in enumerate(exprs))
+    sql = f"SELECT\n    {select}\nFROM {source['from']}{source['where']}"
+    return sql, plan
+
+
+def _to_number(value):
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        value = float(value)
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def run_pushdown_eda(source: dict, fetch, dialect: str = "snowflake") -> dict:
+    """
+    Run the EDA of a whole table (or its filtered/sampled rows) inside the warehouse.
+    fetch is fetch_data_from_snowflake (or anything with its signature).
+    Returns the same JSON shape as eda.run_basic_eda, except top/freq,
+    which would need a GROUP BY per column, and the preview.
+    """
+    columns = source["columns"]
+    sql, plan = build_pushdown_query(source, dialect)
+    row = fetch(sql, return_df=False, params=tuple(source["params"]))[0]
+
+    rows = 0
+    summary = {
+        name: dict.fromkeys(["count", "unique", "top", "freq", "mean", "std",
+                             "min", "25%", "50%", "75%", "max"])
+        for name, _ in columns
+    }
+    missing = {}
+    corr_columns = [name for name, dtype in columns if NUMERIC_TYPE.fullmatch(dtype)][:MAX_CORR_COLUMNS]
+    correlations = {a: {b: (1.0 if a == b else None) for b in corr_columns} for a in corr_columns}
+
+    for (target, stat), value in zip(plan, row):
+        value = _to_number(value)
+        if stat == "rows":
+            rows = int(value or 0)
+        elif stat == "nulls":
+            missing[target] = int(value or 0)
+        elif stat == "corr":
+            a, b = target
+            correlations[a][b] = correlations[b][a] = None if value is None else float(value)
+        elif stat in ("count", "unique"):
+            summary[target][stat] = float(value or 0) if stat == "count" else int(value or 0)
+        else:
+            summary[target][stat] = None if value is None else float(value)
+
+    # a column without two values has no correlation, not even with itself
+    for name in corr_columns:
+        if summary[name]["count"] < 2:
+            correlations[name][name] = None
+
+    return {
+        "shape": (rows, len(columns)),
+        "columns": {name: dtype for name, dtype in columns},
+        "missing_values": missing,
+        "summary_stats": summary,
+        "correlations": correlations,
+    }
@@ -0,0 +1,220 @@
+# api/src/eda_query.py
+import re
+
+# Builds the SELECT behind an EDA request from its parameters:
+#   columns=A,B                  projection, validated against the table
+#   where=A > 10 AND B = 'x'     small predicate DSL, compiled to bound params
+#   sample=5                     warehouse-side row sampling, in percent
+# Identifiers are checked against INFORMATION_SCHEMA and quoted, values
+# are always passed as query parameters, so no user text reaches the SQL.
+
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_$]*")
+
+SAMPLE_CLAUSE = {
+    "snowflake": "TABLESAMPLE BERNOULLI ({p})",
+    "local": "TABLESAMPLE {p}% (bernoulli)",
+}
+
+MAX_CLAUSES = 20
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<string>'(?:[^']|'')*')
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+  | (?P<op><=|>=|!=|<>|=|<|>)
+  | (?P<punct>[(),])
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+)""", re.VERBOSE)
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def split_table_name(table: str) -> list:
+    """
+    [database.][schema.]table -> list of identifiers
+    raises ValueError for anything that is not a plain identifier
+    """
+    parts = table.split(".")
+    if not 1 <= len(parts) <= 3 or not all(IDENTIFIER.fullmatch(p) for p in parts):
+        raise ValueError(f"Invalid table name: {table}")
+    return parts
+
+
+def get_table_columns(table: str, fetch) -> list:
+    """
+    (column name, data type) pairs of a table, in table order
+    """
+    parts = split_table_name(table)
+    info_schema = f"{parts[0]}.INFORMATION_SCHEMA" if len(parts) == 3 else "INFORMATION_SCHEMA"
+    sql = f"""
+        SELECT COLUMN_NAME, DATA_TYPE
+        FROM {info_schema}.COLUMNS
+        WHERE UPPER(TABLE_NAME) = UPPER(%s)
+    """
+    params = [parts[-1]]
+    if len(parts) > 1:
+        sql += " AND UPPER(TABLE_SCHEMA) = UPPER(%s)"
+        params.append(parts[-2])
+    sql += " ORDER BY ORDINAL_POSITION"
+
+    rows = fetch(sql, return_df=False, params=tuple(params))
+    if not rows:
+        raise ValueError(f"Unknown table: {table}")
+    return [(str(name), str(dtype)) for name, dtype in rows]
+
+
+def _tokenize(text: str) -> list:
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Invalid where clause near: {text[pos:pos + 20]}")
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "word":
+            value = value.upper() if value.upper() in ("AND", "IS", "NOT", "NULL", "IN", "LIKE") else value
+        tokens.append((kind, value))
+        pos = m.end()
+    return tokens
+
+
+def _literal(token):
+    kind, value = token
+    if kind == "string":
+        return value[1:-1].replace("''", "'")
+    if kind == "number":
+        return float(value) if any(c in value for c in ".eE") else int(value)
+    raise ValueError(f"Expected a number or a 'quoted' value, got: {value}")
+
+
+def compile_where(where: str, columns: dict) -> tuple:
+    """
+    Compile the where DSL into SQL with %s placeholders.
+    Grammar: clause [AND clause ...], where a clause is one of
+        COL (= | != | <> | < | <= | > | >=) value
+        COL [NOT] LIKE 'pattern'
+        COL [NOT] IN (value, ...)
+        COL IS [NOT] NULL
+    values are numbers or 'quoted' text (dates as 'YYYY-MM-DD').
+    columns maps upper-cased names to the real column names.
+    Returns (sql, params).
+    """
+    tokens = _tokenize(where)
+    clauses, params, i = [], [], 0
+
+    def take(kind=None, value=None):
+        nonlocal i
+        if i >= len(tokens):
+            raise ValueError("Incomplete where clause")
+        tok = tokens[i]
+        if (kind and tok[0] != kind) or (value and tok[1] != value):
+            raise ValueError(f"Unexpected token in where clause: {tok[1]}")
+        i += 1
+        return tok
+
+    def peek(value):
+        return i < len(tokens) and tokens[i][1] == value
+
+    while True:
+        name = take("word")[1]
+        column = columns.get(name.upper())
+        if column is None:
+            raise ValueError(f"Unknown column in where clause: {name}")
+        col = quote(column)
+
+        if peek("IS"):
+            take()
+            negate = peek("NOT")
+            if negate:
+                take()
+            take("word", "NULL")
+            clauses.append(f"{col} IS {'NOT ' if negate else ''}NULL")
+        else:
+            negate = peek("NOT")
+            if negate:
+                take()
+            if peek("IN"):
+                take()
+                take("punct", "(")
+                values = [_literal(take())]
+                while peek(","):
+                    take()
+                    values.append(_literal(take()))
+                take("punct", ")")
+                clauses.append(f"{col} {'NOT ' if negate else ''}IN ({', '.join(['%s'] * len(values))})")
+                params += values
+            elif peek("LIKE"):
+                take()
+                value = _literal(take("string"))
+                clauses.append(f"{col} {'NOT ' if negate else ''}LIKE %s")
+                params.append(value)
+            elif not negate and i < len(tokens) and tokens[i][0] == "op":
+                op = take()[1]
+                clauses.append(f"{col} {op} %s")
+                params.append(_literal(take()))
+            else:
+                raise ValueError(f"Expected an operator after {name}")
+
+        if len(clauses) > MAX_CLAUSES:
+            raise ValueError(f"At most {MAX_CLAUSES} where clauses are allowed")
+        if i == len(tokens):
+            break
+        take("word", "AND")
+
+    return " AND ".join(clauses), params
+
+
+def parse_sample(sample) -> float:
+    """sample percent in (0, 100], or None"""
+    if sample in (None, ""):
+        return None
+    try:
+        p = float(sample)
+    except (TypeError, ValueError):
+        raise ValueError("sample must be a percentage")
+    if not 0 < p <= 100:
+        raise ValueError("sample must be between 0 and 100")
+    return p
+
+
+def build_source(table: str, table_columns: list, columns=None, where=None, sample=None,
+                 dialect: str = "snowflake") -> dict:
+    """
+    Compile the EDA request parameters of a table.
+    Returns the selected (name, type) columns, the FROM clause (with sampling),
+    the WHERE clause (or "") and its params.
+    """
+    by_name = {name.upper(): name for name, _ in table_columns}
+
+    selected = table_columns
+    if columns:
+        wanted = [c.strip() for c in columns.split(",") if c.strip()] if isinstance(columns, str) else list(columns)
+        unknown = [c for c in wanted if c.upper() not in by_name]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        wanted = {by_name[c.upper()] for c in wanted}
+        selected = [(name, dtype) for name, dtype in table_columns if name in wanted]
+
+    from_sql = ".".join(split_table_name(table))
+    p = parse_sample(sample)
+    if p is not None and p < 100:
+        from_sql += " " + SAMPLE_CLAUSE[dialect].format(p=p)
+
+    where_sql, params = compile_where(where, by_name) if where and where.strip() else ("", [])
+    return {
+        "columns": selected,
+        "from": from_sql,
+        "where": f" WHERE {where_sql}" if where_sql else "",
+        "params": params,
+    }
+
+
+def build_select(source: dict, limit: int = None) -> str:
+    """SELECT of the projected columns for a compiled source"""
+    select = ", ".join(quote(name) for name, _ in source["columns"])
+    sql = f"SELECT {select} FROM {source['from']}{source['where']}"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return sql
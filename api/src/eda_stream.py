@@ -0,0 +1,345 @@
+# api/src/eda_stream.py
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.eda import previews, PREVIEW_ROWS
+from src.concurrency import offload
+
+# Streaming EDA over a whole table.
+# Every batch is summarized into mergeable statistics (counts, nulls,
+# Welford/Chan moments, min/max, t-digest quantiles, HyperLogLog distinct
+# counts, top values and pairwise co-moments), batches are summarized in
+# parallel and merged, so memory stays bounded by the batches in flight.
+
+HLL_PRECISION = 12          # 4096 registers, ~1.6% error
+DIGEST_COMPRESSION = 200    # t-digest delta
+TOP_CAPACITY = 1000         # misra-gries counters for top/freq
+
+
+class HyperLogLog:
+    """Mergeable distinct count sketch"""
+
+    def __init__(self, p: int = HLL_PRECISION):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def add(self, values: pd.Series) -> None:
+        if values.empty:
+            return
+        h = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = h & np.uint64((1 << (64 - self.p)) - 1)
+        # rank = leading zeros in the remaining bits + 1
+        bit_length = np.zeros(len(rest), dtype=np.int64)
+        nz = rest > 0
+        bit_length[nz] = np.frexp(rest[nz].astype(np.float64))[1]
+        rank = (64 - self.p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # small range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class TDigest:
+    """Mergeable quantile sketch (merging t-digest with the k1 scale function)"""
+
+    def __init__(self, compression: int = DIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def add(self, values: np.ndarray) -> None:
+        if len(values):
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other: "TDigest") -> None:
+        if len(other.means):
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        # centroids falling into the same k1 unit are merged
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+
+        w = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / w
+        self.weights = w
+
+    def quantile(self, q: float):
+        if not len(self.means):
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        positions = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        return float(np.interp(q, positions, self.means))
+
+
+class ColumnStats:
+    """Mergeable statistics of one column"""
+
+    def __init__(self, dtype: str, numeric: bool):
+        self.dtype = dtype
+        self.numeric = numeric
+        self.count = 0          # non-null values
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.digest = TDigest() if numeric else None
+        self.hll = HyperLogLog()
+        self.top = {}           # misra-gries counters, non-numeric columns only
+
+    @classmethod
+    def from_series(cls, s: pd.Series, numeric: bool) -> "ColumnStats":
+        st = cls(str(s.dtype), numeric)
+        values = s.dropna()
+        st.nulls = int(len(s) - len(values))
+        st.count = int(len(values))
+        st.hll.add(values)
+        if not st.count:
+            return st
+
+        if numeric:
+            arr = values.to_numpy(dtype=np.float64)
+            st.mean = float(arr.mean())
+            st.m2 = float(((arr - st.mean) ** 2).sum())
+            st.min, st.max = float(arr.min()), float(arr.max())
+            st.digest.add(arr)
+        else:
+            st.top = values.astype(str).value_counts().to_dict()
+            st._trim_top()
+        return st
+
+    def merge(self, other: "ColumnStats") -> None:
+        # an all-null first batch doesn't know the column type yet
+        if not self.count and other.numeric != self.numeric:
+            self.dtype, self.numeric, self.digest = other.dtype, other.numeric, other.digest
+            other_digest = None
+        else:
+            other_digest = other.digest
+
+        # Chan et al. parallel variance
+        n = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.count * other.count / n
+            self.mean += delta * other.count / n
+            if other.min is not None:
+                self.min = other.min if self.min is None else min(self.min, other.min)
+                self.max = other.max if self.max is None else max(self.max, other.max)
+        self.count = n
+        self.nulls += other.nulls
+        self.hll.merge(other.hll)
+        if self.numeric and other_digest is not None:
+            self.digest.merge(other_digest)
+        elif not self.numeric:
+            for value, c in other.top.items():
+                self.top[value] = self.top.get(value, 0) + c
+            self._trim_top()
+
+    def _trim_top(self) -> None:
+        if len(self.top) > TOP_CAPACITY:
+            cut = sorted(self.top.values(), reverse=True)[TOP_CAPACITY]
+            self.top = {v: c - cut for v, c in self.top.items() if c > cut}
+
+    def summary(self) -> dict:
+        """same keys as DataFrame.describe(include="all")"""
+        out = dict.fromkeys(["count", "unique", "top", "freq", "mean", "std",
+                             "min", "25%", "50%", "75%", "max"])
+        out["count"] = float(self.count)
+        if self.numeric:
+            if self.count:
+                out["mean"] = self.mean
+                out["std"] = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None
+                out["min"], out["max"] = self.min, self.max
+                for q, key in [(0.25, "25%"), (0.5, "50%"), (0.75, "75%")]:
+                    out[key] = self.digest.quantile(q)
+        else:
+            out["unique"] = self.hll.count()
+            if self.top:
+                out["top"], out["freq"] = max(self.top.items(), key=lambda kv: kv[1])
+        return out
+
+
+class PairStats:
+    """Mergeable pairwise co-moments of numeric columns (pairwise complete rows)"""
+
+    def __init__(self, columns: list):
+        k = len(columns)
+        self.columns = columns
+        self.n = np.zeros((k, k))
+        self.mean_x = np.zeros((k, k))   # mean of column i over rows where i and j are set
+        self.mean_y = np.zeros((k, k))   # mean of column j over the same rows
+        self.cxy = np.zeros((k, k))
+        self.m2x = np.zeros((k, k))
+        self.m2y = np.zeros((k, k))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: list) -> "PairStats":
+        st = cls(columns)
+        if not columns or df.empty:
+            return st
+        X = df[columns].to_numpy(dtype=np.float64)
+        mask = ~np.isnan(X)
+        M = mask.astype(np.float64)
+
+        # shift by column means first for numerical stability
+        shift = np.nan_to_num(np.nanmean(np.where(mask, X, np.nan), axis=0)) if mask.any() else np.zeros(len(columns))
+        Xc = np.where(mask, X - shift, 0.0)
+
+        n = M.T @ M
+        sx = Xc.T @ M                 # sum of x_i over rows where j is set too
+        sy = sx.T
+        sxy = Xc.T @ Xc
+        sxx = (Xc * Xc).T @ M
+        syy = sxx.T
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            st.n = n
+            st.mean_x = np.where(n > 0, sx / n, 0.0) + shift[:, None]
+            st.mean_y = np.where(n > 0, sy / n, 0.0) + shift[None, :]
+            st.cxy = np.where(n > 0, sxy - sx * sy / n, 0.0)
+            st.m2x = np.where(n > 0, sxx - sx * sx / n, 0.0)
+            st.m2y = np.where(n > 0, syy - sy * sy / n, 0.0)
+        return st
+
+    def merge(self, other: "PairStats") -> None:
+        n = self.n + other.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            f = np.where(n > 0, self.n * other.n / n, 0.0)
+            w = np.where(n > 0, other.n / n, 0.0)
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        self.cxy += other.cxy + dx * dy * f
+        self.m2x += other.m2x + dx * dx * f
+        self.m2y += other.m2y + dy * dy * f
+        self.mean_x += dx * w
+        self.mean_y += dy * w
+        self.n = n
+
+    def correlations(self) -> dict:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = self.cxy / np.sqrt(self.m2x * self.m2y)
+        r = np.where(self.n > 1, r, np.nan)
+        return {
+            ci: {cj: (None if np.isnan(r[i, j]) else float(r[i, j])) for j, cj in enumerate(self.columns)}
+            for i, ci in enumerate(self.columns)
+        }
+
+
+class TableStats:
+    """Mergeable statistics of a whole table"""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+        self.pairs = None
+        self.preview = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "TableStats":
+        st = cls()
+        st.rows = len(df)
+        numeric = [c for c in df.columns
+                   if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+        st.columns = {str(c): ColumnStats.from_series(df[c], c in numeric) for c in df.columns}
+        st.pairs = PairStats.from_frame(df, numeric)
+        return st
+
+    def merge(self, other: "TableStats") -> None:
+        if not self.columns:
+            self.rows, self.columns, self.pairs = other.rows, other.columns, other.pairs
+            return
+        self.rows += other.rows
+        for name, col in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(col)
+        if self.pairs is not None and other.pairs is not None and self.pairs.columns == other.pairs.columns:
+            self.pairs.merge(other.pairs)
+
+    def result(self) -> dict:
+        """same JSON shape as eda.run_basic_eda"""
+        return {
+            "shape": (int(self.rows), len(self.columns)),
+            "columns": {name: col.dtype for name, col in self.columns.items()},
+            "missing_values": {name: col.nulls for name, col in self.columns.items()},
+            "summary_stats": {name: col.summary() for name, col in self.columns.items()},
+            "correlations": self.pairs.correlations() if self.pairs is not None else {},
+        }
+
+
+def _batch_to_frame(batch) -> pd.DataFrame:
+    """arrow table/record batch (or DataFrame) -> DataFrame, decimals as floats"""
+    if isinstance(batch, pd.DataFrame):
+        return batch
+    import pyarrow as pa
+    columns = []
+    for field, column in zip(batch.schema, batch.columns):
+        if pa.types.is_decimal(field.type):
+            column = column.cast(pa.float64())
+        columns.append(column)
+    return pa.table(columns, names=batch.schema.names).to_pandas()
+
+
+def _summarize_batch(batch) -> tuple:
+    df = _batch_to_frame(batch)
+    return TableStats.from_frame(df), df
+
+
+def run_streaming_eda(batches, name: str = "dataset", workers: int = 4, preview_rows: int = PREVIEW_ROWS,
+                      keep_preview: bool = True) -> dict:
+    """
+    Run EDA over an iterable of Arrow batches (or DataFrames) covering a whole table.
+    Batches are summarized in parallel by a thread pool, at most 2*workers
+    batches are in memory at a time (in a gevent worker the pool's greenlets
+    hand the summaries to native threads, see src/concurrency.py).
+    Returns the same shape as run_basic_eda.
+    keep_preview=False when the batches are filtered, see run_basic_eda
+    """
+    total = TableStats()
+    preview = None
+
+    def collect(future):
+        nonlocal preview
+        stats, df = future.result()
+        if preview is None and not df.empty:
+            preview = df.head(preview_rows)
+        total.merge(stats)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eda-stream") as pool:
+        pending = []
+        for batch in batches:
+            pending.append(pool.submit(offload, _summarize_batch, batch))
+            # bounded number of batches in flight, merged in order
+            while len(pending) >= 2 * workers:
+                collect(pending.pop(0))
+        for future in pending:
+            collect(future)
+
+    results = total.result()
+
+    # Keep preview
+    if keep_preview and preview is not None:
+        previews.put(name, preview)
+    return results
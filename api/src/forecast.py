@@ -1,14 +1,17 @@
 import pandas as pd
-from prophet import Prophet
 from shared.utils import preprocess_mortality_data, load_kaggle_mortality_data
 
-def build_forecast(country: str, horizon_months: int = 24):
+def build_forecast(country: str, horizon_months: int = 24, df_monthly: pd.DataFrame = None):
     """
     Forecast expected deaths for 2020–2022 based on 2015–2019.
     Return observed (2015–<2023) and forecast (2020–2022).
+    df_monthly is the preprocessed mortality data, loaded from Kaggle if not given
     """
-    df = load_kaggle_mortality_data()
-    df_monthly = preprocess_mortality_data(df)
+    # prophet is slow to import, only workers that forecast load it
+    from prophet import Prophet
+
+    if df_monthly is None:
+        df_monthly = preprocess_mortality_data(load_kaggle_mortality_data())
 
     if country.upper() == "WORLD":
         # Aggregate world deaths by month
@@ -19,7 +22,7 @@ def build_forecast(country: str, horizon_months: int = 24):
         )
         df_monthly["country_name"] = "World"
     else:
-        df_monthly = df_monthly[df_monthly["country_name"] == country]
+        df_monthly = df_monthly[df_monthly["country_name"] == country].copy()
 
     df_monthly["date"] = pd.to_datetime(
         df_monthly["year"].astype(str) + "-" + df_monthly["month"].astype(str) + "-01"
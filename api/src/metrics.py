@@ -0,0 +1,134 @@
+# api/src/metrics.py
+import threading
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from shared.timing import PHASES, start_request, end_request, phase
+
+# Request phase timings (shared/timing.py) as Server-Timing headers and
+# Prometheus histograms, rendered in the text exposition format by /metrics.
+# Metrics are kept per process, every gunicorn worker reports its own.
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _labels(names, values) -> str:
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+class Histogram:
+    """cumulative-bucket histogram with labels, like prometheus_client's"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, buckets: tuple = BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}   # label values -> [bucket counts..., count, sum]
+
+    def observe(self, value: float, *labelvalues) -> None:
+        with self._lock:
+            series = self._series.setdefault(labelvalues, [0] * (len(self.buckets) + 1) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for labelvalues, series in items:
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-2] + [series[-2]]):
+                labels = _labels(self.labelnames + ("le",), labelvalues + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_count{labels} {series[-2]}")
+            lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labelvalues) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+request_phase_seconds = Histogram(
+    "api_request_phase_seconds",
+    "Time spent per request phase (connect, query, fetch, transform, serialize, total)",
+    ("endpoint", "phase"),
+)
+requests_total = Counter("api_requests_total", "Requests served", ("endpoint", "method", "status"))
+METRICS = [request_phase_seconds, requests_total]
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """counts jsonify's encoding as the serialize phase"""
+
+    def dumps(self, obj, **kwargs):
+        with phase("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+def _endpoint() -> str:
+    # the route pattern, not the path, keeps the label set bounded
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+def _start():
+    start_request()
+
+
+def _finish(response):
+    timings = end_request()
+    if timings is None:
+        return response
+
+    phases = timings.summary()
+    response.headers["Server-Timing"] = ", ".join(
+        f"{name};dur={phases[name] * 1000:.2f}" for name in PHASES + ("total",)
+    )
+
+    endpoint = _endpoint()
+    for name, seconds in phases.items():
+        request_phase_seconds.observe(seconds, endpoint, name)
+    requests_total.inc(endpoint, request.method, response.status_code)
+    return response
+
+
+def _discard(_exc=None):
+    # a request that failed before after_request must not leak its recorder
+    end_request()
+
+
+def init_metrics(app) -> None:
+    """record phase timings for every request of app"""
+    app.json = TimedJSONProvider(app)
+    app.before_request(_start)
+    app.after_request(_finish)
+    app.teardown_request(_discard)
+
+
+def render_metrics() -> str:
+    """all metrics in the Prometheus text format"""
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
@@ -0,0 +1,84 @@
+# api/src/mortality_store.py
+import numpy as np
+import pandas as pd
+
+# Monthly all-cause deaths held by every API process. The frame is sorted by
+# country, year and month with compact dtypes (categorical country, int16
+# year, int8 month, int32 deaths), and an offset index maps each country to
+# its contiguous block, so a lookup is a slice instead of a scan of all rows.
+# Numeric arrays also stay shared after a `gunicorn --preload` fork: unlike
+# object columns, reading them doesn't touch Python refcounts and dirty the pages.
+
+
+def _deaths_dtype(deaths: pd.Series):
+    """int32 when the counts are whole numbers (they are in the Kaggle data), float32 otherwise"""
+    values = deaths.to_numpy(dtype=float)
+    if np.isfinite(values).all() and (values % 1 == 0).all() and np.abs(values).max(initial=0) < 2 ** 31:
+        return np.int32
+    return np.float32
+
+
+class MortalityStore:
+    """
+    preprocessed mortality data (see preprocess_mortality_data) indexed by country
+    """
+
+    def __init__(self, df_monthly: pd.DataFrame):
+        self.source_bytes = int(df_monthly.memory_usage(deep=True).sum())
+
+        df = df_monthly.sort_values(["country_name", "year", "month"], kind="stable")
+        self.frame = pd.DataFrame({
+            "country_name": pd.Categorical(df["country_name"]),
+            "year": df["year"].to_numpy(dtype=np.int16),
+            "month": df["month"].to_numpy(dtype=np.int8),
+            "deaths_allcause": df["deaths_allcause"].to_numpy(dtype=_deaths_dtype(df["deaths_allcause"])),
+        })
+
+        # rows are sorted by the category codes, each country is one run of equal codes
+        codes = self.frame["country_name"].cat.codes.to_numpy()
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], int)
+        stops = np.r_[starts[1:], len(codes)]
+        categories = self.frame["country_name"].cat.categories
+        self.offsets = {categories[codes[a]]: (int(a), int(b)) for a, b in zip(starts, stops)}
+        self.countries = frozenset(self.offsets)
+        self._world = None
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def country(self, name: str) -> pd.DataFrame:
+        """rows of one country (empty if unknown), without scanning the others"""
+        start, stop = self.offsets.get(name, (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def countries_frame(self, names) -> pd.DataFrame:
+        """rows of several countries, concatenated blocks"""
+        blocks = [self.country(name) for name in dict.fromkeys(names) if name in self.offsets]
+        return pd.concat(blocks) if blocks else self.frame.iloc[0:0]
+
+    def world(self) -> pd.DataFrame:
+        """deaths of all countries summed by month, country_name "World", computed once"""
+        if self._world is None:
+            world = (
+                self.frame.groupby(["year", "month"])["deaths_allcause"]
+                .sum()
+                .reset_index()
+            )
+            world["country_name"] = "World"
+            self._world = world
+        return self._world
+
+    def lookup(self, name: str) -> pd.DataFrame:
+        """rows of a country, or the world totals for "World" """
+        return self.world() if name.upper() == "WORLD" else self.country(name)
+
+    def memory(self) -> dict:
+        """bytes of the compact frame against the frame it was built from"""
+        nbytes = int(self.frame.memory_usage(deep=True).sum())
+        return {
+            "rows": len(self.frame),
+            "countries": len(self.offsets),
+            "bytes": nbytes,
+            "source_bytes": self.source_bytes,
+            "saved_bytes": self.source_bytes - nbytes,
+        }
@@ -0,0 +1,241 @@
+# api/src/patterns.py
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# COVID wave detection (rise+ -> peak -> fall+ over weekly cases).
+# The numpy engine runs the same pattern as the MATCH_RECOGNIZE query
+# over every country at once: the sign of the week-to-week difference is
+# run-length encoded and waves are read off consecutive runs
+#   [+ run of >= 2 weeks][- run]              peak is the last rising week
+#   [+ run][one flat week][- run]             peak is the flat week
+# which is exactly what the greedy SQL pattern matches, so with no
+# smoothing and no prominence filter both engines return the same waves.
+# /patterns reads the catalogs from the weekly rows the API already holds per
+# data version (src/weekly_store.py), one catalog per slider setting, indexed
+# by country like the weekly store.
+
+# wave detection for /patterns: "numpy" (in-process catalog), "table" (materialized WAVES)
+# or "sql" (MATCH_RECOGNIZE per request)
+PATTERNS_ENGINE = os.getenv("PATTERNS_ENGINE", "numpy").lower()
+
+WAVE_COLUMNS = ["COUNTRY_REGION", "WAVE_START", "WAVE_END", "PEAK_CASES"]
+
+# ?smoothing= and ?min_prominence= values of /patterns, as on the dashboard sliders
+SMOOTHING_WEEKS = range(1, 9)
+PROMINENCE_STEPS = [i / 10 for i in range(10)]
+
+WAVES_SQL = """
+    SELECT *
+    FROM ECDC_GLOBAL_WEEKLY
+    MATCH_RECOGNIZE (
+      PARTITION BY COUNTRY_REGION
+      ORDER BY DATE
+      MEASURES
+        FIRST(DATE) AS wave_start,
+        LAST(DATE) AS wave_end,
+        MAX(CASES_WEEKLY) AS peak_cases
+      ONE ROW PER MATCH
+      PATTERN (rise+ peak fall+)
+      DEFINE
+        rise AS CASES_WEEKLY > LAG(CASES_WEEKLY),
+        peak AS CASES_WEEKLY >= LAG(CASES_WEEKLY) AND CASES_WEEKLY >= LEAD(CASES_WEEKLY),
+        fall AS CASES_WEEKLY < LAG(CASES_WEEKLY)
+    )
+"""
+
+WEEKLY_CASES_SQL = """
+    SELECT COUNTRY_REGION, DATE, CASES_WEEKLY
+    FROM ECDC_GLOBAL_WEEKLY
+    ORDER BY COUNTRY_REGION, DATE
+"""
+
+# symbols of the week-to-week difference, NO_DIFF for missing values and country borders
+RISE, FLAT, FALL, NO_DIFF = 1, 0, -1, 2
+
+
+def _run_length_encode(sym: np.ndarray):
+    """starts, values and lengths of the runs of equal symbols"""
+    starts = np.flatnonzero(np.r_[True, sym[1:] != sym[:-1]])
+    lengths = np.diff(np.r_[starts, len(sym)])
+    return starts, sym[starts], lengths
+
+
+def detect_waves(df: pd.DataFrame, smoothing: int = 1, min_prominence: float = 0.0) -> pd.DataFrame:
+    """
+    Detect waves for all countries in one pass over ECDC_GLOBAL_WEEKLY rows
+    (COUNTRY_REGION, DATE, CASES_WEEKLY).
+    smoothing: centered rolling mean over that many weeks before detection (1 = none)
+    min_prominence: drop waves whose peak rises less than this fraction
+                    above the higher of the weeks before and at the end of the wave
+    Returns COUNTRY_REGION, WAVE_START, WAVE_END, PEAK_CASES (raw cases) per wave.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=WAVE_COLUMNS)
+
+    df = df.sort_values(["COUNTRY_REGION", "DATE"], kind="stable").reset_index(drop=True)
+    codes, countries = pd.factorize(df["COUNTRY_REGION"])
+    raw = pd.to_numeric(df["CASES_WEEKLY"], errors="coerce").to_numpy(dtype=np.float64)
+
+    x = raw
+    if smoothing > 1:
+        x = (
+            pd.Series(raw)
+            .groupby(codes)
+            .transform(lambda s: s.rolling(smoothing, center=True, min_periods=1).mean())
+            .to_numpy()
+        )
+
+    # sign of the difference between consecutive weeks of the same country
+    diff = np.diff(x)
+    sym = np.where(np.isnan(diff), NO_DIFF, np.sign(diff)).astype(np.int8)
+    sym[codes[1:] != codes[:-1]] = NO_DIFF
+    if not len(sym):
+        return pd.DataFrame(columns=WAVE_COLUMNS)
+
+    starts, values, lengths = _run_length_encode(sym)
+    n = len(starts)
+
+    def shifted(arr, k, fill):
+        out = np.full(n, fill, dtype=arr.dtype)
+        out[:n - k] = arr[k:]
+        return out
+
+    next_val, next_len, next_start = shifted(values, 1, NO_DIFF), shifted(lengths, 1, 0), shifted(starts, 1, 0)
+    after_val, after_len, after_start = shifted(values, 2, NO_DIFF), shifted(lengths, 2, 0), shifted(starts, 2, 0)
+
+    # difference i is between rows i and i+1, so a run of differences
+    # starting at s covers rows s+1 .. s+length
+    rise = values == RISE
+    peak_on_rise = rise & (lengths >= 2) & (next_val == FALL)
+    peak_on_flat = rise & (next_val == FLAT) & (next_len == 1) & (after_val == FALL)
+
+    first = starts + 1
+    last = np.where(peak_on_flat, after_start + after_len, next_start + next_len)
+    match = peak_on_rise | peak_on_flat
+    first, last = first[match], last[match]
+    if not len(first):
+        return pd.DataFrame(columns=WAVE_COLUMNS)
+
+    # max over each [first, last] range, with a sentinel so reduceat never runs off the end
+    def range_max(arr):
+        padded = np.r_[arr, -np.inf]
+        return np.maximum.reduceat(padded, np.ravel(np.column_stack([first, last + 1])))[::2]
+
+    peak_cases = range_max(raw)
+
+    if min_prominence > 0:
+        peak = range_max(x)
+        base = np.maximum(x[first - 1], x[last])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            prominence = np.where(peak > 0, (peak - base) / peak, 0.0)
+        keep = prominence >= min_prominence
+        first, last, peak_cases = first[keep], last[keep], peak_cases[keep]
+
+    return pd.DataFrame({
+        "COUNTRY_REGION": countries[codes[first]],
+        "WAVE_START": df["DATE"].to_numpy()[first],
+        "WAVE_END": df["DATE"].to_numpy()[last],
+        "PEAK_CASES": peak_cases,
+    })
+
+
+class WaveCatalog:
+    """
+    waves of all countries (detect_waves) indexed by upper-cased country
+    """
+
+    def __init__(self, waves: pd.DataFrame):
+        waves = waves.assign(KEY=waves["COUNTRY_REGION"].str.upper()).sort_values(["KEY", "WAVE_START"],
+                                                                                    kind="stable")
+        keys = waves.pop("KEY").to_numpy()
+        self.frame = waves.reset_index(drop=True)
+
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], int)
+        stops = np.r_[starts[1:], len(keys)]
+        self.offsets = {keys[a]: (int(a), int(b)) for a, b in zip(starts, stops)}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def country(self, name: str) -> pd.DataFrame:
+        """waves of one country ordered by start (empty if it has none)"""
+        start, stop = self.offsets.get(name.upper(), (0, 0))
+        return self.frame.iloc[start:stop].copy()
+
+
+class WaveCatalogs:
+    """
+    wave catalogs of one set of weekly rows (COUNTRY_REGION, DATE, CASES_WEEKLY),
+    detected on first use per (smoothing, min_prominence)
+    """
+
+    def __init__(self, weekly: pd.DataFrame):
+        self.weekly = weekly[["COUNTRY_REGION", "DATE", "CASES_WEEKLY"]]
+        self._catalogs = {}
+        self._lock = threading.Lock()
+
+    def get(self, smoothing: int = 1, min_prominence: float = 0.0) -> WaveCatalog:
+        key = (smoothing, min_prominence)
+        catalog = self._catalogs.get(key)
+        if catalog is None:
+            # concurrent requests for the same setting wait for one detection
+            with self._lock:
+                catalog = self._catalogs.get(key)
+                if catalog is None:
+                    catalog = WaveCatalog(detect_waves(self.weekly, smoothing, min_prominence))
+                    self._catalogs[key] = catalog
+        return catalog
+
+
+def fetch_sql_waves(fetch, country: str = None) -> pd.DataFrame:
+    """
+    Waves from the warehouse MATCH_RECOGNIZE query, for one country or all
+    """
+    if country:
+        return fetch(WAVES_SQL + " WHERE UPPER(COUNTRY_REGION) = %s", return_df=True, params=(country.upper(),))
+    return fetch(WAVES_SQL, return_df=True)
+
+
+def fetch_table_waves(fetch, country: str) -> pd.DataFrame:
+    """
+    Waves of one country from the materialized WAVES catalog (see sql/setup.py),
+    a point lookup on the clustering key
+    """
+    sql = """
+        SELECT COUNTRY_REGION, WAVE_START, WAVE_END, PEAK_CASES
+        FROM WAVES
+        WHERE COUNTRY_KEY = %s
+        ORDER BY WAVE_START
+    """
+    return fetch(sql, return_df=True, params=(country.upper(),))
+
+
+def compare_engines(numpy_waves: pd.DataFrame, sql_waves: pd.DataFrame) -> pd.DataFrame:
+    """
+    Waves found by only one of the engines (empty when both agree)
+    """
+    def normalize(df):
+        df = df.rename(columns=str.upper)[WAVE_COLUMNS].copy()
+        df["WAVE_START"] = pd.to_datetime(df["WAVE_START"])
+        df["WAVE_END"] = pd.to_datetime(df["WAVE_END"])
+        df["PEAK_CASES"] = df["PEAK_CASES"].astype(float)
+        return df
+
+    merged = normalize(numpy_waves).merge(normalize(sql_waves), how="outer", indicator=True)
+    return merged[merged["_merge"] != "both"]
+
+
+if __name__ == "__main__":
+    # parity check of the numpy engine against MATCH_RECOGNIZE on the live warehouse
+    from shared.utils import fetch_data_from_snowflake
+
+    numpy_waves = detect_waves(fetch_data_from_snowflake(WEEKLY_CASES_SQL, return_df=True))
+    sql_waves = fetch_sql_waves(fetch_data_from_snowflake)
+    diff = compare_engines(numpy_waves, sql_waves)
+    print(f"numpy: {len(numpy_waves)} waves, sql: {len(sql_waves)} waves, mismatches: {len(diff)}")
+    if not diff.empty:
+        print(diff.to_string(index=False))
+        raise SystemExit(1)
@@ -0,0 +1,156 @@
+# api/src/reports.py
+import os
+import re
+import json
+import hashlib
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# detailed EDA reports are built in the background by a bounded pool
+# and stored per (table, data version). Job state lives in small json
+# files next to the reports, so every gunicorn worker can answer polls
+# and concurrent submissions for the same table share one job. In a gevent
+# worker the pool runs greenlets: builders hand their profiling to a native
+# thread with src.concurrency.offload.
+
+REPORTS_DIR = os.getenv("EDA_REPORTS_DIR", os.path.join(os.path.dirname(__file__), "reports"))
+REPORT_WORKERS = int(os.getenv("EDA_REPORT_WORKERS", 2))
+REPORT_MAX_AGE = int(os.getenv("EDA_REPORT_MAX_AGE", 24 * 3600))             # seconds
+REPORT_MAX_BYTES = int(os.getenv("EDA_REPORT_MAX_BYTES", 200 * 1024 * 1024))
+JOB_TIMEOUT = int(os.getenv("EDA_REPORT_JOB_TIMEOUT", 30 * 60))               # stale running jobs
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="eda-report")
+
+
+def make_job_id(table: str, version: str) -> str:
+    """
+    job id for a table at a data version, safe for urls and file names
+    a hash of the raw name keeps tables that sanitize alike (A.B, A_B) apart
+    """
+    digest = hashlib.sha1(table.encode()).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9]+', '_', table)}_{digest}-{version}"
+
+
+def report_path(job_id: str) -> str:
+    return os.path.join(REPORTS_DIR, f"eda_{job_id}_report.html")
+
+
+def _status_path(job_id: str) -> str:
+    return os.path.join(REPORTS_DIR, f"eda_{job_id}.json")
+
+
+def _write_status(job_id: str, status: dict) -> None:
+    # write + rename, so readers never see a half written file
+    # (temp name per process and thread, request threads may write the same job)
+    tmp = f"{_status_path(job_id)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(status, f)
+    os.replace(tmp, _status_path(job_id))
+
+
+def get_job(job_id: str):
+    """
+    return the status dict of a job, or None if unknown
+    """
+    if not re.fullmatch(r"[A-Za-z0-9_]+-[A-Za-z0-9]+", job_id):
+        return None
+
+    try:
+        with open(_status_path(job_id)) as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        # report kept but status evicted/lost
+        if os.path.exists(report_path(job_id)):
+            return {"job_id": job_id, "status": DONE}
+        return None
+
+    # a worker died while building the report
+    if status["status"] in (QUEUED, RUNNING) and time.time() - status["updated_at"] > JOB_TIMEOUT:
+        status.update(status=FAILED, error="Report job timed out")
+    return status
+
+
+def submit_job(table: str, version: str, build) -> dict:
+    """
+    Submit a report job for table at version.
+    build(out_file) generates the report file.
+    Returns the existing job if one is done or in progress.
+    """
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    job_id = make_job_id(table, version)
+
+    status = get_job(job_id)
+    if status and status["status"] != FAILED:
+        return status
+
+    # a lock left behind by a killed worker
+    lock = _status_path(job_id) + ".lock"
+    try:
+        if time.time() - os.path.getmtime(lock) > JOB_TIMEOUT:
+            os.remove(lock)
+    except OSError:
+        pass
+
+    # claim the job, only one submitter wins across threads and workers
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        os.close(fd)
+    except FileExistsError:
+        return get_job(job_id) or {"job_id": job_id, "table": table, "status": QUEUED}
+
+    status = {"job_id": job_id, "table": table, "version": version, "status": QUEUED,
+              "submitted_at": time.time(), "updated_at": time.time()}
+    _write_status(job_id, status)
+    _executor.submit(_run_job, job_id, build)
+    return status
+
+
+def _run_job(job_id: str, build) -> None:
+    status = get_job(job_id)
+    try:
+        status.update(status=RUNNING, updated_at=time.time())
+        _write_status(job_id, status)
+
+        build(report_path(job_id))
+        if not os.path.exists(report_path(job_id)):
+            raise RuntimeError("Report generation failed")
+
+        status.update(status=DONE, updated_at=time.time())
+    except Exception as e:
+        traceback.print_exc()
+        status.update(status=FAILED, error=str(e), updated_at=time.time())
+    finally:
+        _write_status(job_id, status)
+        try:
+            os.remove(_status_path(job_id) + ".lock")
+        except OSError:
+            pass
+        evict_reports()
+
+
+def evict_reports(max_age: int = REPORT_MAX_AGE, max_bytes: int = REPORT_MAX_BYTES) -> None:
+    """
+    Remove reports older than max_age, then the oldest ones
+    until the directory is below max_bytes
+    """
+    try:
+        entries = [os.path.join(REPORTS_DIR, f) for f in os.listdir(REPORTS_DIR) if f.endswith("_report.html")]
+        reports = sorted((os.path.getmtime(p), os.path.getsize(p), p) for p in entries)
+    except OSError:
+        return
+
+    now = time.time()
+    total = sum(size for _, size, _ in reports)
+    for mtime, size, path in reports:
+        if now - mtime <= max_age and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            os.remove(path.replace("_report.html", ".json"))
+        except OSError:
+            pass
+        total -= size
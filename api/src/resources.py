@@ -0,0 +1,206 @@
+# api/src/resources.py
+import os
+import sys
+import time
+import resource
+import threading
+import traceback
+from types import SimpleNamespace
+
+import gridfs
+from pymongo import MongoClient
+
+from shared.utils import load_kaggle_mortality_data, preprocess_mortality_data, fetch_data_from_snowflake
+from src.mortality_store import MortalityStore
+from src.weekly_store import WeeklyStore, WEEKLY_QUERY
+from src.patterns import WaveCatalogs
+
+# Staged startup of the API.
+#   1. import: flask app, routes, caches, no I/O besides stage 2
+#   2. preload: the required datasets (mortality, a local CSV or a Kaggle download),
+#      loaded once at the end of importing src.api; with `gunicorn --preload` that
+#      happens in the master before fork and workers share the pages copy-on-write
+#   3. lazy: per-process clients (MongoDB is not fork-safe) and heavy libraries
+#      (Prophet, scikit-learn), created by each worker on first use, and
+#      warehouse datasets, built per data version on first use
+# A failed stage doesn't stop the boot, it is retried on use and reported by /ready.
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+RETRY_AFTER = 30        # seconds before a failed resource is tried again
+
+
+class Resource:
+    """
+    A value built on first use, with its state for /ready
+    per_process=True builds it again in a forked child (clients, sockets)
+    """
+
+    def __init__(self, name: str, factory, required: bool = False, per_process: bool = False):
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.per_process = per_process
+        self.state = "pending"
+        self.error = None
+        self.seconds = None
+        self.loaded_by = None       # pid of the process that built the value
+        self._failed_at = 0.0
+        self._value = None
+        self._lock = threading.Lock()
+
+    def _ready(self) -> bool:
+        return self.state == "ready" and (not self.per_process or self.loaded_by == os.getpid())
+
+    def get(self):
+        if self._ready():
+            return self._value
+        with self._lock:
+            if self._ready():
+                return self._value
+            if self.state == "failed" and time.time() - self._failed_at < RETRY_AFTER:
+                raise RuntimeError(f"{self.name} unavailable: {self.error}")
+
+            self.state = "loading"
+            start = time.perf_counter()
+            try:
+                self._value = self.factory()
+            except Exception as e:
+                self.state, self.error, self._failed_at = "failed", str(e), time.time()
+                raise
+            self.state, self.error = "ready", None
+            self.seconds = round(time.perf_counter() - start, 3)
+            self.loaded_by = os.getpid()
+            return self._value
+
+    def status(self) -> dict:
+        state = self.state if self._ready() or self.state != "ready" else "pending"
+        return {"state": state, "required": self.required, "seconds": self.seconds,
+                "loaded_by": self.loaded_by, "error": self.error}
+
+
+class VersionedResource:
+    """
+    A value built from the warehouse for one data version, rebuilt when the version
+    changes. Held in the process, not in the response cache, which would pickle
+    it on every read
+    """
+
+    def __init__(self, name: str, factory):
+        self.name = name
+        self.factory = factory      # factory(version) -> value
+        self.seconds = None
+        self._current = None        # (version, value)
+        self._lock = threading.Lock()
+
+    def get(self, version: str):
+        current = self._current
+        if current is not None and current[0] == version:
+            return current[1]
+        with self._lock:
+            if self._current is not None and self._current[0] == version:
+                return self._current[1]
+            start = time.perf_counter()
+            value = self.factory(version)
+            self.seconds = round(time.perf_counter() - start, 3)
+            self._current = (version, value)
+            return value
+
+    def status(self) -> dict:
+        current = self._current
+        return {"state": "ready" if current else "pending",
+                "version": current[0] if current else None, "seconds": self.seconds}
+
+
+def _load_mortality():
+    return MortalityStore(preprocess_mortality_data(load_kaggle_mortality_data()))
+
+
+def _load_weekly(version: str):
+    return WeeklyStore(fetch_data_from_snowflake(WEEKLY_QUERY))
+
+
+def _load_waves(version: str):
+    return WaveCatalogs(weekly.get(version).frame)
+
+
+def _connect_mongo():
+    client = MongoClient(MONGO_URI)
+    db = client["covid_db"]
+    return SimpleNamespace(client=client, comments=db["comments"], fs=gridfs.GridFS(db),
+                           request_stats=db["request_stats"])
+
+
+# monthly all-cause deaths from the Kaggle dataset, indexed by country
+mortality = Resource("mortality_data", _load_mortality, required=True)
+# comments collection, GridFS image store and request counts of the cache warmer
+mongo = Resource("mongo", _connect_mongo, per_process=True)
+
+# weekly cases and deaths of every country, per data version
+weekly = VersionedResource("weekly", _load_weekly)
+# /patterns wave catalogs, detected from the weekly rows
+waves = VersionedResource("waves", _load_waves)
+
+RESOURCES = [mortality, mongo]
+DATASETS = [weekly, waves]
+# imported on first use by the endpoints that need them
+LAZY_MODULES = ("prophet", "sklearn")
+
+
+def preload() -> None:
+    """load the datasets now, failures are logged and retried on use"""
+    for res in RESOURCES:
+        if res.required:
+            try:
+                res.get()
+            except Exception:
+                traceback.print_exc()
+
+
+def process_age() -> float:
+    """seconds since this process was started (or forked), None without procfs"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 3)
+
+
+def rss_mb() -> float:
+    """current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20, 1)
+    except OSError:
+        # no procfs (macOS): peak instead of current, in bytes there
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 20, 1)
+
+
+def readiness(boot: dict = None) -> dict:
+    """
+    state of every stage, ready when all required resources are loaded
+    required resources that failed are retried here
+    boot is {"pid", "seconds"} of the process that imported the app
+    """
+    for res in RESOURCES:
+        if res.required and not res._ready():
+            try:
+                res.get()
+            except Exception:
+                pass
+
+    status = {
+        "ready": all(res._ready() for res in RESOURCES if res.required),
+        "pid": os.getpid(),
+        "boot": boot,
+        "process_age_seconds": process_age(),
+        "rss_mb": rss_mb(),
+        "resources": {res.name: res.status() for res in RESOURCES},
+        "datasets": {res.name: res.status() for res in DATASETS},
+        "modules": {name: name in sys.modules for name in LAZY_MODULES},
+    }
+    if mortality._ready():
+        status["resources"][mortality.name]["memory"] = mortality.get().memory()
+    return status
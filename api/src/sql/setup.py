@@ -1,5 +1,8 @@
 #api/src/sql/setup.py
-from shared.utils import get_snowflake_connection
+import sys
+
+from shared.utils import get_snowflake_connection, fetch_data_from_snowflake, fetch_data_version
+from src.patterns import WAVES_SQL
 
 
 def setup_snowflake(commands_file: str = 'setup.sql') -> None:
@@ -25,6 +28,65 @@ def setup_snowflake(commands_file: str = 'setup.sql') -> None:
     print("Snowflake setup complete.")
 
 
+def missing_tables(tables) -> list:
+    """the tables (or views) of the current schema that don't exist"""
+    placeholders = ", ".join(["%s"] * len(tables))
+    rows = fetch_data_from_snowflake(
+        f"SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE UPPER(TABLE_NAME) IN ({placeholders})",
+        return_df=False, params=tuple(tables),
+    )
+    found = {row[0].upper() for row in rows}
+    return [t for t in tables if t not in found]
+
+
+def refresh_waves(force: bool = False) -> bool:
+    """
+    Rebuild the WAVES catalog with MATCH_RECOGNIZE over ECDC_GLOBAL_WEEKLY,
+    only if the table changed since the last refresh (or force=True)
+    Run by `setup.py --refresh-waves` and, with PATTERNS_ENGINE=table, by the
+    API's cache warmer every cycle (src/warmer.py)
+    returns True if the catalog was rebuilt
+    """
+    missing = missing_tables(("ECDC_GLOBAL_WEEKLY", "WAVES", "WAVES_REFRESH"))
+    if missing:
+        print(f"WAVES not refreshed, missing: {', '.join(missing)}")
+        return False
+
+    version = fetch_data_version(tables=("ECDC_GLOBAL_WEEKLY",))
+    refreshed = fetch_data_from_snowflake("SELECT SOURCE_VERSION FROM WAVES_REFRESH", return_df=False)
+    if not force and refreshed and refreshed[0][0] == version:
+        print("WAVES is up to date.")
+        return False
+
+    conn = get_snowflake_connection()
+    cursor = conn.cursor()
+    try:
+        # swap the catalog and its version in one transaction, readers never see it empty
+        cursor.execute("BEGIN")
+        cursor.execute(f"""
+            INSERT OVERWRITE INTO WAVES
+            SELECT UPPER(COUNTRY_REGION), COUNTRY_REGION, WAVE_START, WAVE_END, PEAK_CASES
+            FROM ({WAVES_SQL})
+        """)
+        cursor.execute("DELETE FROM WAVES_REFRESH")
+        cursor.execute("INSERT INTO WAVES_REFRESH VALUES (%s, CURRENT_TIMESTAMP())", (version,))
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    print("WAVES refreshed.")
+    return True
+
+
 if __name__ == "__main__":
-    setup_snowflake()
+    # --refresh-waves: only rebuild the wave catalog, once ECDC_GLOBAL_WEEKLY is loaded
+    # (setup.sql recreates the database, the source table doesn't exist right after it)
+    if "--refresh-waves" in sys.argv:
+        refresh_waves(force="--force" in sys.argv)
+    else:
+        setup_snowflake()
     print("Setup completed successfully.")
@@ -56,3 +56,28 @@ USE DATABASE COVID_DB;
 CREATE OR REPLACE SCHEMA ANALYTICS;
 
 USE SCHEMA ANALYTICS;
+
+------------------------------------------------------------
+-- 4) Wave catalog
+-- MATCH_RECOGNIZE waves of all countries, materialized so
+-- /patterns is a point lookup (PATTERNS_ENGINE=table).
+-- Clustered by the upper-cased country, the lookup key.
+-- Filled by refresh_waves (setup.py --refresh-waves, and the
+-- API's cache warmer every cycle with PATTERNS_ENGINE=table),
+-- which rebuilds it only when ECDC_GLOBAL_WEEKLY changed since
+-- the last refresh.
+------------------------------------------------------------
+CREATE OR REPLACE TABLE WAVES (
+  COUNTRY_KEY VARCHAR,
+  COUNTRY_REGION VARCHAR,
+  WAVE_START DATE,
+  WAVE_END DATE,
+  PEAK_CASES NUMBER
+)
+CLUSTER BY (COUNTRY_KEY);
+
+-- version of ECDC_GLOBAL_WEEKLY the catalog was built from
+CREATE OR REPLACE TABLE WAVES_REFRESH (
+  SOURCE_VERSION VARCHAR,
+  REFRESHED_AT TIMESTAMP_NTZ
+);
@@ -0,0 +1,318 @@
+# api/src/warmer.py
+import os
+import json
+import time
+import fcntl
+import tempfile
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import pandas as pd
+from flask import request
+
+from shared.utils import fetch_data_from_snowflake, warehouse_backend
+from shared.config.config import (EXCESS_MORTALITY_PAGE, VACCINATION_PAGE, INFECTION_CASES_PAGE,
+                                  INFECTION_DEATHS_PAGE, MORTALITY_FORECAST_PAGE, CLUSTERING_PAGE)
+from src.resources import mongo
+from src.patterns import PATTERNS_ENGINE
+
+# Background cache warmer. After a deploy or a cache flush the first users would
+# wait for the warehouse to resume and for full queries, so the workers ask for
+# the most requested views themselves (started by post_worker_init, gunicorn.conf.py):
+#   - request stats: successful dashboard requests are counted per (endpoint,
+#     country, max_points), in the process and, when MongoDB is up, summed over
+#     workers and deploys in the request_stats collection
+#   - one worker leads, the one holding a non-blocking lock on CACHE_WARM_LOCK (the
+#     lock goes with the process, another worker takes it over). Only the leader
+#     reads the resource monitors and request stats, refreshes WAVES and plans a
+#     cycle; the other workers replay its last plan into their in-process caches
+#     and nothing else
+#   - a cycle (at start, then every CACHE_WARM_INTERVAL seconds) requests the shared
+#     views (data version, country lists, clustering), then the dropdown defaults
+#     ("World", the first country) and the most requested views, CACHE_WARM_TOP in
+#     all, through the app with at most CACHE_WARM_CONCURRENCY at a time: caches
+#     fill the way user requests fill them, and hits cost nothing
+#   - the dashboards always send ?max_points= (their chart width rounded up to
+#     200 px), so the defaults are warmed at the most requested max_points, or at
+#     CACHE_WARM_MAX_POINTS before any request was counted
+#   - with PATTERNS_ENGINE=table a cycle first rebuilds the WAVES catalog when
+#     ECDC_GLOBAL_WEEKLY changed (src/sql/setup.py refresh_waves), nothing else
+#     follows the data loads in the warehouse
+#   - a cycle is skipped while a warehouse resource monitor (api/src/sql/setup.sql)
+#     has used CACHE_WARM_MAX_CREDIT_SHARE of its quota, or can't be read: warming
+#     can wait, user queries can't
+
+WARM_INTERVAL = int(os.getenv("CACHE_WARM_INTERVAL", 3600))     # seconds, 0 disables the warmer
+WARM_TOP = int(os.getenv("CACHE_WARM_TOP", 20))
+WARM_CONCURRENCY = int(os.getenv("CACHE_WARM_CONCURRENCY", 2))
+# below the 85% SUSPEND trigger of the monitors, at their NOTIFY level
+WARM_MAX_CREDIT_SHARE = float(os.getenv("CACHE_WARM_MAX_CREDIT_SHARE", 0.75))
+WARM_MONITORS = [m for m in os.getenv("CACHE_WARM_MONITORS", "RM_COVID_DAILY,RM_BUDGET_MONTHLY").split(",") if m]
+# an lg=8 chart in a 1280 px browser (840 px) and on a 1920 px screen (1240 px)
+WARM_MAX_POINTS = [int(n) for n in os.getenv("CACHE_WARM_MAX_POINTS", "1000,1400").split(",") if n]
+WARM_MAX_POINTS_TOP = 2     # max_points values the defaults are warmed at
+# per host: set it to a shared volume for one leader over several containers
+WARM_LOCK = os.getenv("CACHE_WARM_LOCK", os.path.join(tempfile.gettempdir(), "covid-api-warmer.lock"))
+WARM_PLAN = WARM_LOCK + ".json"     # paths of the leader's last cycle
+FOLLOW_POLL = 60    # seconds between the other workers' checks for a new plan
+
+WARMER_HEADER = "X-Cache-Warmer"        # marks the warmer's own requests, they aren't counted
+WARM_PAGES = (EXCESS_MORTALITY_PAGE, VACCINATION_PAGE, INFECTION_CASES_PAGE,
+              INFECTION_DEATHS_PAGE, MORTALITY_FORECAST_PAGE)
+SERIES_PAGES = (EXCESS_MORTALITY_PAGE, VACCINATION_PAGE, INFECTION_CASES_PAGE, INFECTION_DEATHS_PAGE)  # with ?max_points=
+MAX_TRACKED = 1000      # distinct views counted per process, the least requested are dropped
+COUNTRY_TABLES = "ECDC_GLOBAL,ECDC_GLOBAL_WEEKLY,OWID_VACCINATIONS"     # as the dashboards request them
+
+_lock = threading.Lock()
+_totals = Counter()     # (page, country, max_points) -> requests served by this process
+_pending = Counter()    # not yet added to request_stats
+_status = {"state": "idle", "role": None, "last_run": None, "seconds": None, "warmed": 0, "failed": 0,
+           "skipped": None}
+_started_by = None
+_lead_fd = None         # open lock file while this process leads
+_followed = 0.0         # time of the last plan replayed by this process
+
+
+def _record(response):
+    if (response.status_code != 200 or request.headers.get(WARMER_HEADER)
+            or "since" in request.args or "country" not in request.args):
+        return response
+
+    page = request.path.strip("/")
+    if page in WARM_PAGES:
+        view = (page, request.args["country"], request.args.get("max_points", type=int))
+        with _lock:
+            _totals[view] += 1
+            _pending[view] += 1
+            if len(_totals) > MAX_TRACKED:
+                kept = dict(_totals.most_common(MAX_TRACKED // 2))
+                _totals.clear()
+                _totals.update(kept)
+    return response
+
+
+def init_request_stats(app) -> None:
+    """count the dashboard views served by app"""
+    app.after_request(_record)
+
+
+def _view_id(view: tuple) -> str:
+    return "|".join(str(v) for v in view)
+
+
+def flush_stats() -> None:
+    """add the views counted since the last flush to the request_stats collection"""
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+
+    try:
+        stats = mongo.get().request_stats
+        for view, n in list(pending.items()):
+            stats.update_one({"_id": _view_id(view)},
+                             {"$inc": {"count": n},
+                              "$set": {"page": view[0], "country": view[1], "max_points": view[2]}},
+                             upsert=True)
+            del pending[view]
+    finally:
+        # what wasn't added is kept for the next cycle
+        with _lock:
+            _pending.update(pending)
+
+
+def top_views(n: int = WARM_TOP) -> list:
+    """the n most requested views, over all workers when MongoDB is up"""
+    try:
+        flush_stats()
+        docs = mongo.get().request_stats.find().sort("count", -1).limit(n)
+        return [(d["page"], d["country"], d.get("max_points")) for d in docs]
+    except Exception:
+        traceback.print_exc()
+        with _lock:
+            return [view for view, _ in _totals.most_common(n)]
+
+
+def common_max_points(views: list) -> list:
+    """the most requested ?max_points= values of views (most requested first), WARM_MAX_POINTS without any"""
+    counted = list(dict.fromkeys(mp for page, _, mp in views if page in SERIES_PAGES and mp))
+    return (counted or WARM_MAX_POINTS)[:WARM_MAX_POINTS_TOP]
+
+
+def default_views(countries: dict, max_points: list = ()) -> list:
+    """what the dashboards show before a country is picked, at each of the max_points values"""
+    defaults = [(page, "World") for page in (VACCINATION_PAGE, INFECTION_CASES_PAGE, INFECTION_DEATHS_PAGE)]
+    # excess mortality has no World view, its dropdown selects the first country
+    if countries.get("ECDC_GLOBAL"):
+        defaults.append((EXCESS_MORTALITY_PAGE, countries["ECDC_GLOBAL"][0]))
+
+    views = [(page, country, mp) for mp in (max_points or [None]) for page, country in defaults]
+    return views + [(MORTALITY_FORECAST_PAGE, "World", None)]
+
+
+def monitor_usage() -> dict:
+    """used share of the credit quota of every CACHE_WARM_MONITORS resource monitor"""
+    if warehouse_backend() == "local":
+        return {}
+
+    usage = {}
+    for name in WARM_MONITORS:
+        df = fetch_data_from_snowflake("SHOW RESOURCE MONITORS LIKE %s", params=(name,))
+        if df.empty:
+            continue
+        quota = pd.to_numeric(df["credit_quota"].iloc[0], errors="coerce")
+        used = pd.to_numeric(df["used_credits"].iloc[0], errors="coerce")
+        if quota and quota > 0:
+            usage[name] = round(float(used or 0) / float(quota), 3)
+    return usage
+
+
+def view_path(view: tuple) -> str:
+    page, country, max_points = view
+    params = {"country": country}
+    if max_points:
+        params["max_points"] = max_points
+    return f"/{page}?{urlencode(params)}"
+
+
+def take_lead() -> bool:
+    """True once this process holds the warmer lock, it keeps it until it exits"""
+    global _lead_fd
+    if _lead_fd is not None:
+        return True
+    fd = os.open(WARM_LOCK, os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _lead_fd = fd
+    return True
+
+
+def _write_plan(shared: list, views: list) -> None:
+    # write + rename, the other workers never read half a plan
+    tmp = f"{WARM_PLAN}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"at": time.time(), "shared": shared, "views": views}, f)
+    os.replace(tmp, WARM_PLAN)
+
+
+def _warm(app, shared: list, views: list) -> list:
+    """request the shared paths, then the views CACHE_WARM_CONCURRENCY at a time"""
+    client = app.test_client()
+    headers = {WARMER_HEADER: "1"}
+
+    def get(path: str):
+        try:
+            return client.get(path, headers=headers)
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    # shared views first, the per-country ones wait on the same data version
+    responses = [get(path) for path in shared]
+    with ThreadPoolExecutor(max_workers=WARM_CONCURRENCY, thread_name_prefix="cache-warmer") as pool:
+        return responses + list(pool.map(get, views))
+
+
+def _finish(start: float, responses: list) -> dict:
+    failed = sum(resp is None or resp.status_code != 200 for resp in responses)
+    _status.update(state="idle", last_run=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   seconds=round(time.perf_counter() - start, 3),
+                   warmed=len(responses) - failed, failed=failed)
+    return warmer_status()
+
+
+def warm_once(app) -> dict:
+    """one warming cycle of the leading worker, returns the warmer status"""
+    start = time.perf_counter()
+    _status.update(state="running", role="leader", skipped=None)
+    try:
+        usage = monitor_usage()
+    except Exception as e:
+        traceback.print_exc()
+        _status.update(state="idle", skipped=f"resource monitors unavailable: {e}")
+        return warmer_status()
+    over = {name: share for name, share in usage.items() if share >= WARM_MAX_CREDIT_SHARE}
+    if over:
+        _status.update(state="idle", skipped=f"resource monitor quota used: {over}")
+        return warmer_status()
+
+    if PATTERNS_ENGINE == "table":
+        from src.sql.setup import refresh_waves
+
+        try:
+            refresh_waves()
+        except Exception:
+            traceback.print_exc()
+
+    shared = ["/data-version", f"/countries?tables={COUNTRY_TABLES}", f"/{CLUSTERING_PAGE}"]
+    responses = _warm(app, shared, [])
+    countries = responses[1].get_json() if responses[1] is not None and responses[1].status_code == 200 else {}
+
+    top = top_views()
+    views = list(dict.fromkeys(default_views(countries, common_max_points(top)) + top))[:WARM_TOP]
+    paths = [view_path(v) for v in views]
+    responses += _warm(app, [], paths)
+    _write_plan(shared, paths)
+    return _finish(start, responses)
+
+
+def follow_once(app) -> dict:
+    """
+    replay the leader's last plan into this worker's caches, once per plan
+    no warehouse query of its own: no resource monitors, request stats or WAVES refresh
+    """
+    global _followed
+    _status.update(role="follower")
+    try:
+        # this worker's request counts, summed by the leader
+        flush_stats()
+    except Exception:
+        traceback.print_exc()
+
+    try:
+        with open(WARM_PLAN) as f:
+            plan = json.load(f)
+    except (OSError, ValueError):
+        _status.update(skipped="no plan from the leading worker yet")
+        return warmer_status()
+    if plan["at"] <= _followed:
+        return warmer_status()
+
+    start = time.perf_counter()
+    _status.update(state="running", skipped=None)
+    responses = _warm(app, plan["shared"], plan["views"])
+    _followed = plan["at"]
+    return _finish(start, responses)
+
+
+def _run(app) -> None:
+    while True:
+        wait = WARM_INTERVAL
+        try:
+            if take_lead():
+                warm_once(app)
+            else:
+                follow_once(app)
+                wait = min(WARM_INTERVAL, FOLLOW_POLL)
+        except Exception:
+            traceback.print_exc()
+            _status["state"] = "idle"
+        time.sleep(wait)
+
+
+def start_warmer(app) -> None:
+    """start the warming loop of this process, once"""
+    global _started_by
+    if WARM_INTERVAL <= 0 or _started_by == os.getpid():
+        return
+    _started_by = os.getpid()
+    threading.Thread(target=_run, args=(app,), name="cache-warmer", daemon=True).start()
+
+
+def warmer_status() -> dict:
+    return {"enabled": _started_by == os.getpid(), "interval": WARM_INTERVAL, **_status}
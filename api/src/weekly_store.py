@@ -0,0 +1,63 @@
+# api/src/weekly_store.py
+import numpy as np
+import pandas as pd
+
+# Weekly cases and deaths of every country from ECDC_GLOBAL_WEEKLY, read once
+# per data version and shared by /infection-cases, /infection-deaths and the
+# trajectory clustering. Rows are sorted by country and date with an offset
+# index, so a country is a slice, and the World series (both measures summed
+# per week) is computed once.
+
+WEEKLY_QUERY = """
+    SELECT COUNTRY_REGION, DATE, CASES_WEEKLY, DEATHS_WEEKLY, POPULATION
+    FROM ECDC_GLOBAL_WEEKLY
+"""
+MEASURES = ("CASES_WEEKLY", "DEATHS_WEEKLY")
+NUMERIC = MEASURES + ("POPULATION",)
+
+
+def _as_fetched(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    numeric columns without missing values back to integers, the way a query
+    for these rows alone returns them (a NULL elsewhere makes the column float)
+    """
+    for col in NUMERIC:
+        if col in df and df[col].dtype.kind == "f" and df[col].notna().all() and (df[col] % 1 == 0).all():
+            df[col] = df[col].astype(np.int64)
+    return df
+
+
+class WeeklyStore:
+    """
+    ECDC_GLOBAL_WEEKLY rows (WEEKLY_QUERY) indexed by upper-cased country
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        for col in NUMERIC:
+            df[col] = pd.to_numeric(df[col])
+        df = df.assign(KEY=df["COUNTRY_REGION"].str.upper()).sort_values(["KEY", "DATE"], kind="stable")
+        keys = df.pop("KEY").to_numpy()
+        self.frame = df.reset_index(drop=True)
+
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], int)
+        stops = np.r_[starts[1:], len(keys)]
+        self.offsets = {keys[a]: (int(a), int(b)) for a, b in zip(starts, stops)}
+
+        # per week sums of all countries, NULL (NaN) only where every country is
+        self.world = (
+            self.frame.groupby("DATE")[list(NUMERIC)]
+            .sum(min_count=1)
+            .reset_index()
+        )
+
+    def country(self, name: str, measure: str) -> pd.DataFrame:
+        """COUNTRY_REGION, DATE, measure, POPULATION of one country ordered by date"""
+        start, stop = self.offsets.get(name.upper(), (0, 0))
+        return _as_fetched(self.frame.iloc[start:stop][["COUNTRY_REGION", "DATE", measure, "POPULATION"]].copy())
+
+    def world_series(self, measure: str) -> pd.DataFrame:
+        """DATE, measure, POPULATION summed over all countries per week"""
+        return _as_fetched(self.world[["DATE", measure, "POPULATION"]].copy())
+
+    def lookup(self, name: str, measure: str) -> pd.DataFrame:
+        return self.world_series(measure) if name.upper() == "WORLD" else self.country(name, measure)
@@ -0,0 +1,34 @@
+# api/tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# `src` (api/src) and `shared` importable, like PYTHONPATH in api/Dockerfile
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT = os.path.dirname(API_DIR)
+for path in (ROOT, API_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.backends import use_mongo_double   # noqa: E402
+
+# before any test module imports src (src.resources binds pymongo.MongoClient)
+use_mongo_double()
+
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    """src.api on the local stand-ins (benchmarks/backends.py) with a small generated dataset"""
+    from benchmarks.backends import prepare_data, load_api
+    from benchmarks.datasets import Scale
+
+    paths = prepare_data(Scale(5), work_dir=str(tmp_path_factory.mktemp("data")))
+    return load_api(paths)
+
+
+@pytest.fixture
+def client(api):
+    api.cache.clear()
+    api.comments_cache.clear()
+    return api.app.test_client()
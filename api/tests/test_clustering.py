@@ -0,0 +1,32 @@
+# api/tests/test_clustering.py
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize("mode", ["yearly", "trajectory"])
+def test_k_is_a_lookup(client, mode):
+    fitted = [s["k"] for s in client.get("/clustering/scores", query_string={"mode": mode}).get_json()]
+    assert fitted and set(fitted) <= set(range(2, 7))
+    for k in fitted:
+        resp = client.get("/clustering", query_string={"k": k, "mode": mode})
+        assert resp.status_code == 200
+        assert json.loads(resp.data)
+
+    # outside 2-6, more clusters than fitted countries, not an integer
+    unfitted = [str(k) for k in range(2, 7) if k not in fitted]
+    for k in ["1", "7", "100", "abc", "2.5"] + unfitted:
+        resp = client.get("/clustering", query_string={"k": k, "mode": mode})
+        assert resp.status_code == 400
+        assert "error" in resp.get_json()
+
+
+@pytest.mark.parametrize("path", ["/clustering", "/clustering/scores"])
+def test_fit_errors_are_json(api, client, monkeypatch, path):
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("warehouse unavailable")
+
+    monkeypatch.setattr(api, "fetch_data_from_snowflake", unavailable)
+    resp = client.get(path)
+    assert resp.status_code == 500
+    assert resp.get_json() == {"error": "warehouse unavailable"}
@@ -0,0 +1,50 @@
+# api/tests/test_comments.py
+import pytest
+
+
+@pytest.fixture
+def queries(api, monkeypatch):
+    """warehouse queries made by the api after the fixture is set up"""
+    made = []
+    fetch = api.fetch_data_from_snowflake
+
+    def counting(*args, **kwargs):
+        made.append(args[0])
+        return fetch(*args, **kwargs)
+
+    monkeypatch.setattr(api, "fetch_data_from_snowflake", counting)
+    return made
+
+
+# the per-data-version results: fits, wave catalog, population, weekly and series responses
+CACHED = [
+    ("/clustering", {"k": 3}),
+    ("/clustering", {"k": 3, "mode": "trajectory"}),
+    ("/patterns", {"country": "World"}),
+    ("/vaccinations", {"country": "World", "max_points": 1000}),
+    ("/infection-cases", {"country": "World", "max_points": 1000}),
+]
+
+
+def test_comment_post_keeps_the_data_caches(api, client, monkeypatch, queries):
+    fits = []
+    precompute = api.precompute_clusters
+
+    def counting(df):
+        fits.append(df)
+        return precompute(df)
+
+    monkeypatch.setattr(api, "precompute_clusters", counting)
+    for path, args in CACHED:
+        assert client.get(path, query_string=args).status_code == 200
+    assert client.get("/comments", query_string={"page": "test"}).get_json() == []
+    queries.clear()
+
+    resp = client.post("/comments", json={"comment": "hello", "user": "test", "page": "test"})
+    assert resp.status_code == 201
+    assert [c["comment"] for c in client.get("/comments", query_string={"page": "test"}).get_json()] == ["hello"]
+
+    for path, args in CACHED:
+        assert client.get(path, query_string=args).status_code == 200
+    assert queries == []
+    assert len(fits) == 1
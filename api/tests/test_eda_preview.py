@@ -0,0 +1,37 @@
+# api/tests/test_eda_preview.py
+import pytest
+
+from src import eda, eda_stream
+
+TABLE = "ECDC_GLOBAL_WEEKLY"
+
+
+@pytest.fixture
+def previews(api, monkeypatch):
+    """an empty preview cache for every module holding it"""
+    cache = eda.PreviewCache()
+    for module in (api, eda, eda_stream):
+        monkeypatch.setattr(module, "previews", cache)
+    return cache
+
+
+def test_filtered_eda_does_not_replace_the_preview(client, previews):
+    resp = client.get("/eda", query_string={"table": TABLE, "columns": "CASES_WEEKLY,DATE",
+                                            "where": "CASES_WEEKLY > 0", "sample": 50})
+    assert resp.status_code == 200
+    assert previews.get(TABLE) is None
+
+    resp = client.get("/eda/preview", query_string={"table": TABLE, "columns": "COUNTRY_REGION"})
+    assert resp.status_code == 200
+    assert resp.get_json()
+
+
+def test_unfiltered_eda_keeps_the_first_rows(client, previews):
+    assert client.get("/eda", query_string={"table": TABLE}).status_code == 200
+    assert previews.get(TABLE) is not None
+    first = client.get("/eda/preview", query_string={"table": TABLE}).get_json()
+
+    for mode in ("sample", "stream"):
+        resp = client.get("/eda", query_string={"table": TABLE, "mode": mode, "where": "CASES_WEEKLY > 1000"})
+        assert resp.status_code == 200
+        assert client.get("/eda/preview", query_string={"table": TABLE}).get_json() == first
@@ -0,0 +1,100 @@
+# api/tests/test_gevent.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import API_DIR, ROOT
+
+pytest.importorskip("gevent")
+
+# The API in a gevent worker: the stdlib patched by api/gunicorn.conf.py with
+# GUNICORN_WORKER_CLASS=gevent, then the app imported, as gunicorn does. A greenlet
+# ticks every 5 ms while a stream EDA and a report job run; CPU-bound work left on
+# the worker's own thread would stop it for the whole computation.
+WORKER = """
+import json, os, runpy, sys, time
+
+root, api_dir, work_dir = sys.argv[1:4]
+sys.path[:0] = [root, api_dir]
+os.environ.update(GUNICORN_WORKER_CLASS="gevent", CACHE_WARM_INTERVAL="0")
+runpy.run_path(os.path.join(api_dir, "gunicorn.conf.py"))
+
+import duckdb
+import gevent
+from benchmarks.backends import prepare_data, load_api
+from benchmarks.datasets import Scale
+
+paths = prepare_data(Scale(5), work_dir=work_dir)
+con = duckdb.connect(paths["warehouse"])
+con.execute("CREATE OR REPLACE TABLE BIG AS SELECT i, random() AS a, random() * 100 AS b, "
+            "(i % 97)::DOUBLE AS c, random() AS d FROM range(1500000) t(i)")
+con.close()
+api = load_api(paths)
+
+
+def profile(df, name="dataset", out_file=None):
+    # stands in for ydata-profiling, not installed for the tests: CPU only
+    deadline = time.perf_counter() + 1.5
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    with open(out_file, "w") as f:
+        f.write("<html></html>")
+    return out_file
+
+
+api.run_detailed_eda = profile
+gaps = []
+
+
+def ticker():
+    last = time.perf_counter()
+    while True:
+        gevent.sleep(0.005)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+
+def stream_eda(client):
+    return client.get("/eda", query_string={"table": "BIG", "mode": "stream"}).status_code
+
+
+def report(client):
+    job = client.post("/eda/report/jobs", query_string={"table": "ECDC_GLOBAL"}).get_json()
+    while job["status"] in ("queued", "running"):
+        gevent.sleep(0.05)
+        job = client.get(f"/eda/report/jobs/{job['job_id']}").get_json()
+    return job["status"]
+
+
+gevent.spawn(ticker)
+gevent.sleep(0.05)
+client = api.app.test_client()
+results = {}
+for name, run in [("stream", stream_eda), ("report", report)]:
+    gaps.clear()
+    start = time.perf_counter()
+    status = run(client)
+    results[name] = {"status": status, "seconds": time.perf_counter() - start, "max_gap": max(gaps, default=None)}
+print(json.dumps(results))
+"""
+
+
+@pytest.fixture(scope="module")
+def gevent_worker(tmp_path_factory):
+    proc = subprocess.run([sys.executable, "-c", WORKER, ROOT, API_DIR, str(tmp_path_factory.mktemp("gevent"))],
+                          capture_output=True, text=True, timeout=600)
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("work, status", [("stream", 200), ("report", "done")])
+def test_cpu_bound_work_leaves_the_greenlets_running(gevent_worker, work, status):
+    result = gevent_worker[work]
+    assert result["status"] == status
+    assert result["max_gap"] is not None
+    # the worker's loop kept switching while the statistics were computed
+    assert result["max_gap"] < result["seconds"] / 3
@@ -0,0 +1,152 @@
+# api/tests/test_patterns.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.patterns import WAVE_COLUMNS, WaveCatalogs, compare_engines, detect_waves
+
+
+def match_recognize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    reference for WAVES_SQL: PATTERN (rise+ peak fall+) matched row by row per country,
+    greedy quantifiers with backtracking, AFTER MATCH SKIP PAST LAST ROW,
+    comparisons with a missing value (LAG/LEAD at the borders, NULL cases) are false
+    """
+    waves = []
+    for country, group in df.sort_values(["COUNTRY_REGION", "DATE"]).groupby("COUNTRY_REGION", sort=False):
+        x = group["CASES_WEEKLY"].astype(float).tolist()
+        dates = group["DATE"].tolist()
+        n = len(x)
+
+        def lag(i):
+            return x[i - 1] if i > 0 else np.nan
+
+        def lead(i):
+            return x[i + 1] if i + 1 < n else np.nan
+
+        def rise(i):
+            return x[i] > lag(i)
+
+        def peak(i):
+            return x[i] >= lag(i) and x[i] >= lead(i)
+
+        def fall(i):
+            return x[i] < lag(i)
+
+        i = 0
+        while i < n:
+            rises = 0
+            while i + rises < n and rise(i + rises):
+                rises += 1
+            end = None
+            for length in range(rises, 0, -1):
+                j = i + length
+                if j < n and peak(j) and j + 1 < n and fall(j + 1):
+                    end = j + 1
+                    while end + 1 < n and fall(end + 1):
+                        end += 1
+                    break
+            if end is None:
+                i += 1
+                continue
+            waves.append((country, dates[i], dates[end], max(x[i:end + 1])))
+            i = end + 1
+    return pd.DataFrame(waves, columns=WAVE_COLUMNS)
+
+
+def weekly(series: dict) -> pd.DataFrame:
+    """ECDC_GLOBAL_WEEKLY rows for {country: weekly cases}"""
+    frames = [
+        pd.DataFrame({"COUNTRY_REGION": country,
+                      "DATE": pd.date_range("2020-01-06", periods=len(cases), freq="W-MON"),
+                      "CASES_WEEKLY": cases})
+        for country, cases in series.items()
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+nan = np.nan
+SERIES = {
+    "single wave": [1, 2, 3, 2, 1],
+    "flat peak": [1, 2, 3, 3, 2, 1],
+    "plateau peak": [1, 2, 3, 3, 3, 2, 1],
+    "plateau on the rise": [1, 2, 2, 3, 4, 2, 1],
+    "plateau on the fall": [1, 2, 4, 3, 3, 1],
+    "one week rise": [1, 2, 1, 0],
+    "back to back": [1, 2, 3, 2, 1, 2, 3, 4, 1, 2, 3, 3, 1],
+    "still rising": [1, 2, 3, 4],
+    "constant": [5, 5, 5, 5],
+    "one week": [7],
+    "two weeks": [1, 2],
+    "nan at the peak": [1, 2, 3, nan, 2, 1],
+    "nan on the fall": [1, 2, 3, 2, nan, 1, 0],
+    "nan first": [nan, 1, 2, 3, 2, 1],
+    "all nan": [nan, nan, nan],
+    "zeros": [0, 0, 1, 2, 0, 0],
+}
+
+
+@pytest.mark.parametrize("name", SERIES)
+def test_detect_waves_matches_match_recognize(name):
+    df = weekly({name: SERIES[name]})
+    assert compare_engines(detect_waves(df), match_recognize(df)).empty
+
+
+def test_detect_waves_matches_match_recognize_for_all_countries_at_once():
+    rng = np.random.default_rng(0)
+    series = dict(SERIES)
+    # small integers: many ties and plateaus
+    series.update({f"random {i}": rng.integers(0, 4, size=120).astype(float) for i in range(10)})
+    series["random with gaps"] = np.where(rng.random(120) < 0.1, nan, rng.integers(0, 6, size=120))
+    # rows out of order, as the warehouse may return them
+    df = weekly(series).sample(frac=1, random_state=0)
+
+    numpy_waves, sql_waves = detect_waves(df), match_recognize(df)
+    assert len(sql_waves) > len(SERIES)
+    assert compare_engines(numpy_waves, sql_waves).empty
+
+
+def test_detect_waves_without_rows():
+    empty = pd.DataFrame(columns=["COUNTRY_REGION", "DATE", "CASES_WEEKLY"])
+    assert list(detect_waves(empty).columns) == WAVE_COLUMNS
+    assert detect_waves(empty).empty
+
+
+def test_wave_catalog_is_indexed_by_country():
+    df = weekly(SERIES)
+    catalogs = WaveCatalogs(df)
+    for smoothing, min_prominence in [(1, 0.0), (3, 0.2)]:
+        waves = detect_waves(df, smoothing, min_prominence)
+        catalog = catalogs.get(smoothing, min_prominence)
+        assert catalogs.get(smoothing, min_prominence) is catalog
+        for country in SERIES:
+            expected = waves[waves["COUNTRY_REGION"] == country]
+            assert compare_engines(catalog.country(country.upper()), expected).empty
+            assert catalog.country(country)["WAVE_START"].is_monotonic_increasing
+    assert catalogs.get().country("nowhere").empty
+
+
+@pytest.mark.parametrize("args", [{"smoothing": 0}, {"smoothing": 9}, {"smoothing": "x"},
+                                  {"min_prominence": -0.1}, {"min_prominence": 0.95},
+                                  {"min_prominence": 0.15}, {"min_prominence": 1}])
+def test_patterns_rejects_settings_off_the_sliders(client, args):
+    resp = client.get("/patterns", query_string={"country": "World", **args})
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
+
+
+def test_patterns_settings_read_the_weekly_rows_once(api, client, monkeypatch):
+    assert client.get("/infection-cases", query_string={"country": "World"}).status_code == 200
+    queries = []
+    fetch = api.fetch_data_from_snowflake
+    monkeypatch.setattr(api, "fetch_data_from_snowflake", lambda *a, **kw: queries.append(a[0]) or fetch(*a, **kw))
+
+    countries = client.get("/countries", query_string={"table": "ECDC_GLOBAL_WEEKLY"}).get_json()
+    queries.clear()
+    for smoothing in (1, 4, 8):
+        for min_prominence in (0, 0.3, "0.9"):
+            for country in countries[:3]:
+                resp = client.get("/patterns", query_string={"country": country, "smoothing": smoothing,
+                                                             "min_prominence": min_prominence})
+                assert resp.status_code == 200
+    assert queries == []
@@ -0,0 +1,30 @@
+# api/tests/test_reports.py
+import time
+
+import pytest
+
+from src import reports
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(reports, "REPORTS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_job_ids_keep_tables_apart(reports_dir):
+    ids = {reports.make_job_id(table, "v1") for table in ("A.B", "A_B", "a.b", "A..B")}
+    assert len(ids) == 4
+    assert all(reports.get_job(job_id) is None for job_id in ids)   # valid ids, no job yet
+
+
+def test_result_of_an_evicted_report(client, reports_dir):
+    job_id = reports.make_job_id("PUBLIC.ECDC_GLOBAL", "v1")
+    reports._write_status(job_id, {"job_id": job_id, "status": reports.DONE, "updated_at": time.time()})
+
+    resp = client.get(f"/eda/report/jobs/{job_id}/result")
+    assert resp.status_code == 410
+    assert "error" in resp.get_json()
+
+    (reports_dir / f"eda_{job_id}_report.html").write_text("<html></html>")
+    assert client.get(f"/eda/report/jobs/{job_id}/result").status_code == 200
@@ -0,0 +1,30 @@
+# api/tests/test_series.py
+import pytest
+
+from src.downsample import MIN_POINTS
+
+SERIES = ["/excess-mortality", "/vaccinations", "/infection-cases", "/infection-deaths"]
+
+
+def country_of(client, path):
+    if path == "/excess-mortality":
+        return client.get("/countries", query_string={"table": "ECDC_GLOBAL"}).get_json()[0]
+    return "World"
+
+
+@pytest.mark.parametrize("path", SERIES)
+@pytest.mark.parametrize("max_points", ["0", "-5", "abc", "2.5", ""])
+def test_invalid_max_points(client, path, max_points):
+    resp = client.get(path, query_string={"country": country_of(client, path), "max_points": max_points})
+    assert resp.status_code == 400
+    assert "max_points" in resp.get_json()["error"]
+
+
+@pytest.mark.parametrize("path", SERIES)
+def test_max_points_below_the_minimum(client, path):
+    country = country_of(client, path)
+    full = client.get(path, query_string={"country": country}).get_json()
+    assert len(full) > MIN_POINTS
+
+    rows = client.get(path, query_string={"country": country, "max_points": 1}).get_json()
+    assert MIN_POINTS <= len(rows) < len(full)
@@ -0,0 +1,109 @@
+# api/tests/test_warmer.py
+import fcntl
+import os
+
+import pytest
+
+from src import warmer
+
+
+@pytest.fixture(autouse=True)
+def lock(tmp_path, monkeypatch):
+    """a lock and plan of the test's own, no leader yet"""
+    path = str(tmp_path / "warmer.lock")
+    monkeypatch.setattr(warmer, "WARM_LOCK", path)
+    monkeypatch.setattr(warmer, "WARM_PLAN", path + ".json")
+    monkeypatch.setattr(warmer, "_lead_fd", None)
+    monkeypatch.setattr(warmer, "_followed", 0.0)
+    yield path
+    if warmer._lead_fd is not None:
+        os.close(warmer._lead_fd)
+
+
+@pytest.fixture
+def queries(api, monkeypatch):
+    """warehouse queries made by the api after the fixture is set up"""
+    made = []
+    fetch = api.fetch_data_from_snowflake
+
+    def counting(*args, **kwargs):
+        made.append(args[0])
+        return fetch(*args, **kwargs)
+
+    monkeypatch.setattr(api, "fetch_data_from_snowflake", counting)
+    return made
+
+
+def test_common_max_points():
+    assert warmer.common_max_points([]) == warmer.WARM_MAX_POINTS[:warmer.WARM_MAX_POINTS_TOP]
+    views = [("mortality-forecast", "World", None), ("vaccinations", "World", 800),
+             ("infection-cases", "Italy", None), ("infection-deaths", "Spain", 1200),
+             ("vaccinations", "Italy", 800), ("excess-mortality", "Estonia", 600)]
+    assert warmer.common_max_points(views) == [800, 1200]
+
+
+@pytest.mark.parametrize("max_points", warmer.WARM_MAX_POINTS[:warmer.WARM_MAX_POINTS_TOP])
+def test_dashboard_defaults_are_warm(client, monkeypatch, queries, max_points):
+    # no counted requests yet: the defaults are warmed at WARM_MAX_POINTS
+    monkeypatch.setattr(warmer, "top_views", lambda n=warmer.WARM_TOP: [])
+    warmer.warm_once(client.application)
+    queries.clear()
+
+    for page in ("vaccinations", "infection-cases", "infection-deaths"):
+        resp = client.get(f"/{page}", query_string={"country": "World", "max_points": max_points})
+        assert resp.status_code == 200
+    assert queries == []
+
+    assert client.get("/vaccinations", query_string={"country": "World", "max_points": 200}).status_code == 200
+    assert queries
+
+
+def test_one_worker_leads(lock):
+    # another worker holds the lock
+    other = os.open(lock, os.O_CREAT | os.O_RDWR)
+    fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    assert not warmer.take_lead()
+    assert not warmer.take_lead()
+
+    # it exited
+    os.close(other)
+    assert warmer.take_lead()
+    assert warmer.take_lead()
+
+
+def test_followers_replay_the_plan_only(api, client, monkeypatch, queries):
+    monkeypatch.setattr(warmer, "top_views", lambda n=warmer.WARM_TOP: [])
+    leader = warmer.warm_once(client.application)
+    assert leader["role"] == "leader" and leader["warmed"]
+
+    # another worker: empty caches, no warehouse queries of its own besides the plan's views
+    def unexpected(*args, **kwargs):
+        raise AssertionError("only the leading worker calls this")
+
+    for name in ("monitor_usage", "top_views", "default_views"):
+        monkeypatch.setattr(warmer, name, unexpected)
+    api.cache.clear()
+    queries.clear()
+
+    follower = warmer.follow_once(client.application)
+    assert follower["role"] == "follower"
+    assert follower["warmed"] == leader["warmed"]
+
+    queries.clear()
+    for max_points in warmer.WARM_MAX_POINTS[:warmer.WARM_MAX_POINTS_TOP]:
+        resp = client.get("/vaccinations", query_string={"country": "World", "max_points": max_points})
+        assert resp.status_code == 200
+    assert queries == []
+
+    # a plan is replayed once
+    api.cache.clear()
+    warmer.follow_once(client.application)
+    assert client.get("/vaccinations", query_string={"country": "World", "max_points": 1000}).status_code == 200
+    assert queries
+
+
+def test_followers_skip_with_the_leader(client, monkeypatch):
+    monkeypatch.setattr(warmer, "monitor_usage", lambda: {"RM_COVID_DAILY": 0.9})
+    assert warmer.warm_once(client.application)["skipped"]
+    assert not os.path.exists(warmer.WARM_PLAN)
+    assert warmer.follow_once(client.application)["skipped"] == "no plan from the leading worker yet"
@@ -0,0 +1,85 @@
+# benchmarks/backends.py
+import json
+import os
+import sys
+import tempfile
+from dataclasses import asdict
+
+# Local stand-ins for the API's backends:
+#   Snowflake -> DuckDB file (WAREHOUSE_BACKEND=local, shared/local_warehouse.py)
+#   MongoDB   -> mongomock, patched into pymongo before src.api connects
+#   Kaggle    -> world_mortality.csv on disk (MORTALITY_DATA_PATH)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT, "api")
+WORK_DIR = os.getenv("BENCH_WORK_DIR", os.path.join(tempfile.gettempdir(), "covid-bench"))
+
+
+def add_import_paths() -> None:
+    """make `src` (api/src) and `shared` importable, like PYTHONPATH in api/Dockerfile"""
+    for path in (ROOT, API_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def prepare_data(scale="small", seed: int = 0, work_dir: str = WORK_DIR) -> dict:
+    """
+    Write the synthetic dataset to a DuckDB warehouse and a mortality CSV in work_dir,
+    reusing the files when they already hold the same scale and seed
+    returns their paths and the table row counts
+    """
+    from benchmarks.datasets import SCALES, write_dataset
+
+    scale = SCALES[scale] if isinstance(scale, str) else scale
+    os.makedirs(work_dir, exist_ok=True)
+    paths = {
+        "warehouse": os.path.join(work_dir, "warehouse.duckdb"),
+        "mortality": os.path.join(work_dir, "world_mortality.csv"),
+        "reports": os.path.join(work_dir, "reports"),
+    }
+    manifest = os.path.join(work_dir, "dataset.json")
+    spec = {"scale": asdict(scale), "seed": seed}
+
+    if os.path.exists(manifest) and all(os.path.exists(paths[k]) for k in ("warehouse", "mortality")):
+        with open(manifest) as f:
+            written = json.load(f)
+        if {k: written.get(k) for k in spec} == spec:
+            return {**paths, "rows": written["rows"]}
+
+    rows = write_dataset(scale, seed, warehouse=paths["warehouse"], mortality_csv=paths["mortality"])
+    with open(manifest, "w") as f:
+        json.dump({**spec, "rows": rows}, f, indent=2)
+    return {**paths, "rows": rows}
+
+
+def local_env(paths: dict) -> dict:
+    """environment variables pointing the API at the local stand-ins"""
+    return {
+        "WAREHOUSE_BACKEND": "local",
+        "LOCAL_WAREHOUSE_PATH": paths["warehouse"],
+        "MORTALITY_DATA_PATH": paths["mortality"],
+        "EDA_REPORTS_DIR": paths["reports"],
+    }
+
+
+def use_mongo_double() -> None:
+    """replace pymongo.MongoClient (and gridfs) with the in-memory mongomock"""
+    import pymongo
+    import mongomock
+    import mongomock.gridfs
+
+    mongomock.gridfs.enable_gridfs_integration()
+    pymongo.MongoClient = mongomock.MongoClient
+
+
+def load_api(paths: dict):
+    """
+    Import src.api against the local stand-ins
+    returns the module (app, cache, ...)
+    """
+    add_import_paths()
+    os.environ.update(local_env(paths))
+    use_mongo_double()
+
+    import src.api as api
+    return api
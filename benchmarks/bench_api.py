@@ -0,0 +1,241 @@
+# benchmarks/bench_api.py
+"""
+Benchmark every API endpoint against local stand-ins (DuckDB warehouse,
+mongomock, mortality CSV), in process through the Flask test client.
+
+    python -m benchmarks.bench_api [--scale 10x] [--iterations 50] [--cases clustering] [--output results.json]
+
+For every case: cold latency (API cache cleared), warm latency percentiles,
+throughput, error rate, Python allocations of one request (tracemalloc)
+and process RSS. Results are written as JSON.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import psutil
+
+from benchmarks.backends import ROOT, prepare_data, load_api
+from benchmarks.datasets import BENCH_COUNTRY, SCALES
+
+# 1x1 png for comment uploads
+PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c63f8ffff3f0005fe02fea7d6a4550000000049454e44ae426082"
+)
+
+
+@dataclass
+class Case:
+    name: str
+    path: str
+    params: dict = field(default_factory=dict)
+    method: str = "GET"
+    body: object = None          # callable returning request kwargs (json=/data=)
+    mutates: bool = False        # clears the API cache, run after the read-only cases
+    setup: object = None         # callable(client) returning the path, run once before timing
+
+
+def _stored_image_path(client) -> str:
+    """upload one image comment and return its /comments/image/<id> path"""
+    client.post("/comments", content_type="multipart/form-data", data={
+        "user": "bench", "comment": "image", "page": "bench-image", "image": (io.BytesIO(PNG), "bench.png")
+    })
+    return client.get("/comments", query_string={"page": "bench-image"}).get_json()[0]["image_url"]
+
+
+def build_cases(country: str = BENCH_COUNTRY) -> list:
+    cases = [
+        Case("countries", "/countries", {"table": "ECDC_GLOBAL"}),
+        Case("countries-batch", "/countries", {"tables": "ECDC_GLOBAL,ECDC_GLOBAL_WEEKLY,OWID_VACCINATIONS"}),
+        Case("data-version", "/data-version"),
+        Case("excess-mortality", "/excess-mortality", {"country": country}),
+        Case("mortality-forecast", "/mortality-forecast", {"country": country}),
+        Case("patterns", "/patterns", {"country": country}),
+        Case("patterns-smoothed", "/patterns", {"country": country, "smoothing": 3, "min_prominence": 0.2}),
+        Case("clustering-scores", "/clustering/scores"),
+        Case("eda-tables", "/eda/tables"),
+        Case("eda-columns", "/eda/columns", {"table": "ECDC_GLOBAL"}),
+        Case("eda-preview", "/eda/preview", {"table": "ECDC_GLOBAL", "rows": 20}),
+        Case("comments", "/comments", {"page": "bench"}),
+        Case("comment-image", "/comments/image/<id>", setup=_stored_image_path),
+    ]
+    for page in ["vaccinations", "infection-cases", "infection-deaths"]:
+        cases += [Case(f"{page}-world", f"/{page}", {"country": "World"}),
+                  Case(f"{page}-country", f"/{page}", {"country": country})]
+    for mode in ["yearly", "trajectory"]:
+        cases += [Case(f"clustering-{mode}-k{k}", "/clustering", {"k": k, "mode": mode}) for k in range(2, 7)]
+    for mode in ["sample", "stream", "pushdown"]:
+        cases.append(Case(f"eda-{mode}", "/eda", {"table": "ECDC_GLOBAL_WEEKLY", "mode": mode}))
+    cases.append(Case("eda-pushdown-filtered", "/eda", {
+        "table": "ECDC_GLOBAL_WEEKLY", "mode": "pushdown",
+        "columns": "CASES_WEEKLY,DEATHS_WEEKLY", "where": f"COUNTRY_REGION = '{country}'"
+    }))
+
+    cases += [
+        Case("comment-post", "/comments", method="POST", mutates=True,
+             body=lambda: {"json": {"user": "bench", "comment": "benchmark", "page": "bench", "country": country}}),
+        Case("comment-post-image", "/comments", method="POST", mutates=True,
+             body=lambda: {"data": {"user": "bench", "comment": "with image", "page": "bench",
+                                    "image": (io.BytesIO(PNG), "bench.png")},
+                           "content_type": "multipart/form-data"}),
+    ]
+    return cases
+
+
+def _request(client, case: Case):
+    kwargs = case.body() if case.body else {}
+    return client.open(case.path, method=case.method, query_string=case.params, **kwargs)
+
+
+def _rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 2 ** 20
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10   # bytes on macOS, KB on Linux
+
+
+def run_case(api, case: Case, iterations: int, warmup: int, concurrency: int) -> dict:
+    client = api.app.test_client()
+    if case.setup:
+        case.path = case.setup(client)
+    peak_before = _peak_rss_mb()
+
+    # cold: nothing cached in the API yet
+    api.cache.clear()
+    api.comments_cache.clear()
+    t0 = time.perf_counter()
+    first = _request(client, case)
+    cold_ms = (time.perf_counter() - t0) * 1000
+
+    for _ in range(warmup):
+        _request(client, case)
+
+    def timed(_):
+        c = api.app.test_client()
+        t = time.perf_counter()
+        resp = c.open(case.path, method=case.method, query_string=case.params,
+                      **(case.body() if case.body else {}))
+        return (time.perf_counter() - t) * 1000, resp.status_code, len(resp.get_data())
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed, range(iterations)))
+    else:
+        samples = [timed(i) for i in range(iterations)]
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([s[0] for s in samples])
+    errors = sum(1 for s in samples if s[1] >= 400)
+
+    # allocations of one warm request, traced separately so tracing doesn't skew latencies
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    _request(client, case)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "case": case.name,
+        "method": case.method,
+        "path": case.path,
+        "params": case.params,
+        "status": first.status_code,
+        "response_bytes": samples[-1][2] if samples else len(first.get_data()),
+        "cold_ms": round(cold_ms, 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p90_ms": round(float(np.percentile(latencies, 90)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "mean_ms": round(float(latencies.mean()), 3),
+        "max_ms": round(float(latencies.max()), 3),
+        "throughput_rps": round(iterations / elapsed, 2),
+        "error_rate": round(errors / iterations, 4),
+        "alloc_peak_kb": round(peak / 1024, 1),
+        "alloc_retained_kb": round(retained / 1024, 1),
+        "rss_mb": round(_rss_mb(), 1),
+        "rss_peak_mb": round(_peak_rss_mb(), 1),
+        "rss_peak_growth_mb": round(_peak_rss_mb() - peak_before, 1),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30, help="timed requests per case")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed requests after the cold one")
+    parser.add_argument("--concurrency", type=int, default=1, help="threads issuing the timed requests")
+    parser.add_argument("--cases", default=None, help="regex, only run matching case names")
+    parser.add_argument("--scale", default="small", choices=SCALES, help="dataset size, 1x ~ the real sources")
+    parser.add_argument("--seed", type=int, default=0, help="dataset seed")
+    parser.add_argument("--output", default=None, help="JSON file (default benchmarks/results/api-<time>.json)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    paths = prepare_data(args.scale, args.seed)
+    api = load_api(paths)
+    boot_s = time.perf_counter() - t0
+
+    cases = build_cases()
+    if args.cases:
+        cases = [c for c in cases if re.search(args.cases, c.name)]
+    cases.sort(key=lambda c: c.mutates)
+
+    results = []
+    for case in cases:
+        result = run_case(api, case, args.iterations, args.warmup, args.concurrency)
+        results.append(result)
+        print(f"{case.name:34s} {result['status']:>4} cold {result['cold_ms']:9.1f} ms  "
+              f"p50 {result['p50_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms  "
+              f"{result['throughput_rps']:8.1f} req/s  alloc {result['alloc_peak_kb']:9.1f} KB  "
+              f"rss {result['rss_mb']:7.1f} MB")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "boot_s": round(boot_s, 3),
+            "scale": args.scale,
+            "seed": args.seed,
+            "table_rows": paths["rows"],
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"api-{args.scale}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"results written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
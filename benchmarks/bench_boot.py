@@ -0,0 +1,182 @@
+# benchmarks/bench_boot.py
+"""
+Boot time and memory of the API
+
+    python -m benchmarks.bench_boot --workers 4
+    python -m benchmarks.bench_boot --source /tmp/before    # another checkout
+
+import: imports src.api in a fresh interpreter (--repeat times) and reports
+the import time, RSS after import and which heavy modules got loaded.
+gunicorn (when installed): starts `gunicorn -w N` with and without --preload
+and reports the time until the app answers and RSS/USS/PSS per worker.
+USS is what a worker does not share with the master, the number --preload
+is meant to reduce.
+
+Compare two revisions with a worktree:
+    git worktree add /tmp/before HEAD~1
+    python -m benchmarks.bench_boot --source /tmp/before
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.backends import ROOT, local_env, prepare_data
+
+HEAVY_MODULES = ("prophet", "sklearn", "pymongo", "gridfs", "kagglehub")
+
+_IMPORT_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+source = os.environ["API_SOURCE"]
+sys.path[:0] = [source, os.path.join(source, "api"), os.environ["BENCH_ROOT"]]
+from benchmarks.backends import use_mongo_double
+use_mongo_double()
+import src.api
+seconds = time.perf_counter() - start
+with open("/proc/self/statm") as f:
+    rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+print(json.dumps({"seconds": seconds, "rss_mb": rss / 2 ** 20,
+                  "modules": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def _env(paths: dict, source: str) -> dict:
+    return dict(os.environ, **local_env(paths), API_SOURCE=source, BENCH_ROOT=ROOT)
+
+
+def measure_import(paths: dict, source: str, repeat: int) -> dict:
+    """import time and RSS of src.api, median of `repeat` fresh interpreters"""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _IMPORT_SCRIPT % (HEAVY_MODULES,)],
+                             env=_env(paths, source), cwd=ROOT, capture_output=True, text=True)
+        if out.returncode:
+            raise RuntimeError(f"import failed:\n{out.stderr[-2000:]}")
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": round(statistics.median(r["seconds"] for r in runs), 3),
+        "rss_mb": round(statistics.median(r["rss_mb"] for r in runs), 1),
+        "modules": runs[-1]["modules"],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url: str, proc, timeout: float) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("gunicorn exited during boot")
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except urllib.error.HTTPError:
+            return          # any HTTP answer means the app is serving (/ready is 404 on older trees)
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"no answer from {url} after {timeout}s")
+
+
+def _memory(proc) -> dict:
+    info = proc.memory_full_info()
+    return {"rss_mb": round(info.rss / 2 ** 20, 1),
+            "uss_mb": round(info.uss / 2 ** 20, 1),
+            "pss_mb": round(getattr(info, "pss", 0) / 2 ** 20, 1)}
+
+
+def measure_gunicorn(paths: dict, source: str, workers: int, preload: bool, warm: list, timeout: float) -> dict:
+    """boot time and per-worker memory of `gunicorn -w workers [--preload]`"""
+    import psutil
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    cmd = ["gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "--timeout", "120"]
+    cmd += ["--preload"] if preload else []
+    cmd += ["benchmarks.serve:api_app()"]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=_env(paths, source),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_until_up(base + "/ready", proc, timeout)
+        first_answer = time.perf_counter() - start
+
+        master = psutil.Process(proc.pid)
+        deadline = time.time() + timeout
+        while len(master.children()) < workers and time.time() < deadline:
+            time.sleep(0.05)
+        # let every worker finish importing the app before reading its memory
+        time.sleep(1.0)
+        for path in warm:
+            for _ in range(workers * 2):
+                try:
+                    urllib.request.urlopen(base + path, timeout=120).read()
+                except urllib.error.HTTPError:
+                    pass
+
+        children = [_memory(child) for child in master.children()]
+        return {
+            "preload": preload,
+            "workers": len(children),
+            "first_answer_s": round(first_answer, 3),
+            "master": _memory(master),
+            "per_worker": {key: round(statistics.mean(c[key] for c in children), 1)
+                           for key in ("rss_mb", "uss_mb", "pss_mb")},
+            "total_uss_mb": round(sum(c["uss_mb"] for c in children) + _memory(master)["uss_mb"], 1),
+        }
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=ROOT, help="checkout whose api/src and shared are measured")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warm", default="/excess-mortality?country=Lithuania,/comments?page=bench",
+                        help="comma separated paths requested on every worker before measuring")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--scale", default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    source = os.path.abspath(args.source)
+    paths = prepare_data(args.scale, args.seed)
+    warm = [p for p in args.warm.split(",") if p]
+
+    result = {"source": source, "import": measure_import(paths, source, args.repeat), "gunicorn": []}
+    print(f"import: {result['import']['seconds']:.3f}s, {result['import']['rss_mb']:.1f} MB RSS, "
+          f"heavy modules: {', '.join(result['import']['modules']) or '-'}")
+
+    if shutil.which("gunicorn"):
+        for preload in (False, True):
+            run = measure_gunicorn(paths, source, args.workers, preload, warm, args.timeout)
+            result["gunicorn"].append(run)
+            print(f"gunicorn -w {run['workers']}{' --preload' if preload else ''}: "
+                  f"up in {run['first_answer_s']:.2f}s, per worker RSS {run['per_worker']['rss_mb']} MB "
+                  f"USS {run['per_worker']['uss_mb']} MB PSS {run['per_worker']['pss_mb']} MB, "
+                  f"total USS {run['total_uss_mb']} MB")
+    else:
+        print("gunicorn not installed, skipping the worker measurements")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
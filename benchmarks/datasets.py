@@ -0,0 +1,241 @@
+# benchmarks/datasets.py
+import argparse
+import os
+import time
+from dataclasses import dataclass, asdict, replace
+
+import numpy as np
+import pandas as pd
+
+# Seeded synthetic COVID data with the columns the API reads from
+# ECDC_GLOBAL, ECDC_GLOBAL_WEEKLY, OWID_VACCINATIONS and the Kaggle
+# world_mortality.csv, at configurable size (countries x years x granularity).
+# Cases follow a few gaussian waves per country on top of winter seasonality
+# and a weekday reporting effect, deaths lag cases with a falling fatality
+# rate, vaccinations follow logistic uptake, all-cause deaths have a seasonal
+# baseline plus the COVID excess.
+#
+#   python -m benchmarks.datasets --scale 10x --warehouse bench.duckdb --csv-dir bench_csv
+
+BENCH_COUNTRY = "Lithuania"
+COUNTRIES = [
+    "Lithuania", "Latvia", "Estonia", "Poland", "Germany", "France", "Italy", "Spain",
+    "Portugal", "Sweden", "Norway", "Finland", "Denmark", "Netherlands", "Belgium",
+    "Austria", "Czechia", "Hungary", "Romania", "Greece",
+]
+TABLES = ["ECDC_GLOBAL", "ECDC_GLOBAL_WEEKLY", "OWID_VACCINATIONS", "world_mortality"]
+CHUNK_COUNTRIES = 250       # countries generated (and held in memory) at a time
+VACCINATION_START = "2021-01-01"
+
+
+@dataclass(frozen=True)
+class Scale:
+    countries: int
+    start_year: int = 2020
+    end_year: int = 2022
+    granularity: str = "daily"          # ECDC_GLOBAL rows, "daily" or "weekly"
+    mortality_start_year: int = 2015
+
+
+# 1x is about the size of the real sources (~200 countries, 2020-2022)
+SCALES = {
+    "small": Scale(20),
+    "1x": Scale(200),
+    "10x": Scale(2000),
+    "100x": Scale(6000, end_year=2029),
+}
+
+
+def country_names(n: int) -> list:
+    """the first names are real countries (BENCH_COUNTRY first), the rest numbered"""
+    return COUNTRIES[:n] + [f"Country {i:05d}" for i in range(len(COUNTRIES), n)]
+
+
+def _iso(names) -> list:
+    return ["C" + n[-5:] if n.startswith("Country ") else n[:3].upper() for n in names]
+
+
+def _wave_intensity(rng, n: int, t: np.ndarray, years: int) -> np.ndarray:
+    """sum of gaussian waves, about two per country and year, shape (n, len(t))"""
+    intensity = np.full((n, len(t)), 0.002)
+    for _ in range(max(1, 2 * years)):
+        center = rng.uniform(0, len(t), (n, 1))
+        width = rng.uniform(10, 45, (n, 1))
+        height = rng.lognormal(0, 0.7, (n, 1)) * (rng.random((n, 1)) < 0.8)
+        intensity += height * np.exp(-0.5 * ((t - center) / width) ** 2)
+    return intensity
+
+
+def _chunk(rng, names: list, scale: Scale) -> dict:
+    """all four tables for a group of countries"""
+    n = len(names)
+    iso = _iso(names)
+    population = np.clip(rng.lognormal(16, 1.5, n), 1e5, 1.4e9).astype(np.int64)
+
+    days = pd.date_range(f"{scale.start_year}-01-01", f"{scale.end_year}-12-31", freq="D")
+    t = np.arange(len(days))
+    years = scale.end_year - scale.start_year + 1
+
+    # cases per day: waves x winter seasonality x weekday reporting
+    seasonal = 1 + 0.3 * np.cos(2 * np.pi * (days.dayofyear.to_numpy() - 15) / 365.25)
+    weekday = np.where(days.dayofweek.to_numpy() >= 5, 0.6, 1.1)
+    rate = population[:, None] * 2e-4 * rng.uniform(0.5, 2, (n, 1))
+    cases = rng.poisson(rate * _wave_intensity(rng, n, t, years) * seasonal * weekday)
+
+    # deaths follow cases two weeks later, the fatality rate falls over time
+    cfr = rng.uniform(0.005, 0.03, (n, 1)) * np.exp(-t / 365) + 0.001
+    lagged = np.pad(cases, ((0, 0), (14, 0)))[:, :len(t)]
+    deaths = rng.poisson(lagged * cfr)
+
+    # weeks start on Monday, like to_period("W")
+    week_starts = days.to_period("W").start_time
+    bounds = np.flatnonzero(np.r_[True, week_starts[1:] != week_starts[:-1]])
+    weeks = week_starts[bounds]
+    cases_weekly = np.add.reduceat(cases, bounds, axis=1)
+    deaths_weekly = np.add.reduceat(deaths, bounds, axis=1)
+
+    def frame(dates, **columns):
+        return pd.DataFrame({
+            "COUNTRY_REGION": np.repeat(names, len(dates)),
+            "ISO3166_1": np.repeat(iso, len(dates)),
+            "DATE": np.tile(dates, n),
+            **{k: v.ravel() if isinstance(v, np.ndarray) and v.ndim == 2 else v for k, v in columns.items()},
+        })
+
+    if scale.granularity == "weekly":
+        ecdc = frame(weeks, POPULATION=np.repeat(population, len(weeks)), CASES=cases_weekly, DEATHS=deaths_weekly)
+    else:
+        ecdc = frame(days, POPULATION=np.repeat(population, len(days)), CASES=cases, DEATHS=deaths)
+    weekly = frame(weeks, CASES_WEEKLY=cases_weekly, DEATHS_WEEKLY=deaths_weekly,
+                   POPULATION=np.repeat(population, len(weeks)))
+
+    # vaccinations: logistic uptake of first, second and booster doses
+    vax_days = days[days >= VACCINATION_START]
+    v = np.arange(len(vax_days))[None, :]
+    plateau = rng.uniform(0.4, 0.9, (n, 1))
+    mid, speed = rng.uniform(90, 300, (n, 1)), rng.uniform(20, 60, (n, 1))
+    first = plateau / (1 + np.exp(-(v - mid) / speed))
+    second = 0.9 * plateau / (1 + np.exp(-(v - mid - 40) / speed))
+    booster = 0.5 * plateau / (1 + np.exp(-(v - mid - 300) / speed))
+    people = np.round(population[:, None] * first)
+    fully = np.round(population[:, None] * second)
+    vax = frame(vax_days, PEOPLE_VACCINATED=people, PEOPLE_FULLY_VACCINATED=fully,
+                TOTAL_VACCINATIONS=people + fully + np.round(population[:, None] * booster))
+
+    # all-cause weekly deaths: seasonal baseline plus the covid deaths of that week
+    m_years = np.arange(scale.mortality_start_year, scale.end_year + 1)
+    m_weeks = np.arange(1, 53)
+    year, week = np.repeat(m_years, len(m_weeks)), np.tile(m_weeks, len(m_years))
+    monday = pd.to_datetime([f"{y}{w}1" for y, w in zip(year, week)], format="%Y%W%w")
+    offset = ((monday - weeks[0]).days // 7).to_numpy()
+    in_range = (offset >= 0) & (offset < len(weeks))
+    covid = np.zeros((n, len(year)))
+    covid[:, in_range] = deaths_weekly[:, offset[in_range]]
+    baseline = (population[:, None] * rng.uniform(0.008, 0.013, (n, 1)) / 52
+                * (1 + 0.15 * np.cos(2 * np.pi * (week - 2) / 52)))
+    mortality = pd.DataFrame({
+        "country_name": np.repeat(names, len(year)),
+        "iso3c": np.repeat(iso, len(year)),
+        "year": np.tile(year, n),
+        "time": np.tile(week, n),
+        "time_unit": "weekly",
+        "deaths": rng.poisson(baseline + 1.3 * covid).ravel(),
+    })
+
+    return {
+        "ECDC_GLOBAL": ecdc,
+        "ECDC_GLOBAL_WEEKLY": weekly,
+        "OWID_VACCINATIONS": vax,
+        "world_mortality": mortality,
+    }
+
+
+def generate_chunks(scale: Scale, seed: int = 0):
+    """yield the tables CHUNK_COUNTRIES countries at a time, so 100x fits in memory"""
+    names = country_names(scale.countries)
+    for i, start in enumerate(range(0, len(names), CHUNK_COUNTRIES)):
+        rng = np.random.default_rng([seed, i])
+        yield _chunk(rng, names[start:start + CHUNK_COUNTRIES], scale)
+
+
+def generate(scale="small", seed: int = 0) -> dict:
+    """
+    Build the four tables as DataFrames
+    scale is a SCALES name or a Scale
+    """
+    scale = SCALES[scale] if isinstance(scale, str) else scale
+    chunks = list(generate_chunks(scale, seed))
+    return {name: pd.concat([c[name] for c in chunks], ignore_index=True) for name in TABLES}
+
+
+def write_dataset(scale="small", seed: int = 0, warehouse: str = None, csv_dir: str = None,
+                  mortality_csv: str = None) -> dict:
+    """
+    Generate the dataset chunk by chunk into the local DuckDB warehouse
+    (see shared/local_warehouse.py) and/or one CSV per table
+    returns the row count of every table
+    """
+    scale = SCALES[scale] if isinstance(scale, str) else scale
+    conn = None
+    if warehouse:
+        import duckdb
+        os.makedirs(os.path.dirname(os.path.abspath(warehouse)), exist_ok=True)
+        conn = duckdb.connect(warehouse)
+    if csv_dir:
+        os.makedirs(csv_dir, exist_ok=True)
+
+    rows = dict.fromkeys(TABLES, 0)
+    try:
+        for i, chunk in enumerate(generate_chunks(scale, seed)):
+            for name, df in chunk.items():
+                rows[name] += len(df)
+                paths = [os.path.join(csv_dir, f"{name}.csv")] if csv_dir else []
+                if name == "world_mortality":
+                    paths += [mortality_csv] if mortality_csv else []
+                elif conn is not None:
+                    conn.register("source", df)
+                    if i == 0:
+                        conn.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM source")
+                    else:
+                        conn.execute(f"INSERT INTO {name} SELECT * FROM source")
+                    conn.unregister("source")
+                for path in paths:
+                    df.to_csv(path, index=False, mode="w" if i == 0 else "a", header=i == 0)
+    finally:
+        if conn is not None:
+            conn.close()
+    return rows
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description="Write a synthetic COVID dataset")
+    parser.add_argument("--scale", default="1x", choices=SCALES, help="size preset, 1x ~ the real sources")
+    parser.add_argument("--countries", type=int, help="override the preset's number of countries")
+    parser.add_argument("--years", help="override the preset's years, e.g. 2020-2025")
+    parser.add_argument("--granularity", choices=["daily", "weekly"], help="ECDC_GLOBAL rows per country")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warehouse", help="local DuckDB warehouse file")
+    parser.add_argument("--csv-dir", help="directory for one CSV per table")
+    args = parser.parse_args(argv)
+    if not (args.warehouse or args.csv_dir):
+        parser.error("nothing to write, give --warehouse and/or --csv-dir")
+
+    scale = SCALES[args.scale]
+    if args.countries:
+        scale = replace(scale, countries=args.countries)
+    if args.years:
+        start, end = (int(y) for y in args.years.split("-"))
+        scale = replace(scale, start_year=start, end_year=end)
+    if args.granularity:
+        scale = replace(scale, granularity=args.granularity)
+
+    t0 = time.perf_counter()
+    rows = write_dataset(scale, args.seed, warehouse=args.warehouse, csv_dir=args.csv_dir)
+    print(f"{asdict(scale)} seed={args.seed} in {time.perf_counter() - t0:.1f} s")
+    for name, count in rows.items():
+        print(f"  {name:20s} {count:>12,} rows")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+# benchmarks/load_test.py
+"""
+Multi-user load test of Dash and the API together, against local stand-ins.
+
+    python -m benchmarks.load_test [--users 8] [--journeys 5] [--k 2,3,4,5,6]
+
+Starts the API and the Dash app as separate servers (benchmarks/serve.py) on
+the synthetic dataset, then every virtual user replays journeys the way a
+browser does: page HTML, /_dash-layout, /_dash-dependencies and the
+/_dash-update-component callbacks, plus the images it loads from the API.
+Reports p50/p95/p99 and error rate per step, written as JSON.
+--api-url/--dash-url target servers that are already running instead.
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from benchmarks.backends import ROOT, WORK_DIR, prepare_data, local_env
+from benchmarks.bench_api import PNG, _git_commit
+from benchmarks.datasets import SCALES
+
+SERVE = os.path.join(ROOT, "benchmarks", "serve.py")
+IMAGE_URL = re.compile(r"/comments/image/[0-9a-f]{24}")
+STARTUP_TIMEOUT = 120
+# clientWidth of a dashboard chart (lg=8 of 12 columns) in a 1280 px browser, the
+# dashboards' ?max_points= follows it
+CHART_WIDTH = 840
+
+
+# servers
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url: str, proc: subprocess.Popen) -> None:
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server for {url} exited with code {proc.returncode}")
+        try:
+            if requests.get(url, timeout=2).status_code < 500:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"server for {url} did not start in {STARTUP_TIMEOUT} s")
+
+
+def start_servers(paths: dict, work_dir: str = WORK_DIR) -> tuple:
+    """
+    Start the API and Dash on free ports, Dash pointed at the API
+    returns (api_url, dash_url, processes)
+    """
+    api_port, dash_port = _free_port(), _free_port()
+    api_url, dash_url = f"http://127.0.0.1:{api_port}", f"http://127.0.0.1:{dash_port}"
+
+    dash_cache = os.path.join(work_dir, "dash-cache")
+    shutil.rmtree(dash_cache, ignore_errors=True)
+    env = {
+        **os.environ, **local_env(paths),
+        "API_BASE": api_url, "API_BASE_EXTERNAL": api_url,
+        "DASH_CACHE_TYPE": "FileSystemCache", "DASH_CACHE_DIR": dash_cache,
+    }
+    env.pop("DASH_CACHE_REDIS_URL", None)
+
+    log = open(os.path.join(work_dir, "servers.log"), "w")
+    procs = [
+        subprocess.Popen([sys.executable, SERVE, "api", "--port", str(api_port)], env=env,
+                         cwd=work_dir, stdout=log, stderr=subprocess.STDOUT),
+        subprocess.Popen([sys.executable, SERVE, "dash", "--port", str(dash_port)], env=env,
+                         cwd=work_dir, stdout=log, stderr=subprocess.STDOUT),
+    ]
+    log.close()     # the servers keep their own handle
+    try:
+        _wait_until_up(f"{api_url}/data-version", procs[0])
+        _wait_until_up(f"{dash_url}/_dash-layout", procs[1])
+    except RuntimeError:
+        stop_servers(procs)
+        raise
+    return api_url, dash_url, procs
+
+
+def stop_servers(procs) -> None:
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# recording
+
+class Recorder:
+    """latency and outcome of every step, shared by all users"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, step: str, ms: float, ok: bool, requests_count: int) -> None:
+        with self._lock:
+            self.samples.setdefault(step, []).append((ms, ok, requests_count))
+
+    def summary(self) -> list:
+        rows = []
+        for step, samples in self.samples.items():
+            ms = np.array([s[0] for s in samples])
+            errors = sum(1 for s in samples if not s[1])
+            rows.append({
+                "step": step,
+                "count": len(samples),
+                "requests": sum(s[2] for s in samples),
+                "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                "p95_ms": round(float(np.percentile(ms, 95)), 2),
+                "p99_ms": round(float(np.percentile(ms, 99)), 2),
+                "mean_ms": round(float(ms.mean()), 2),
+                "max_ms": round(float(ms.max()), 2),
+                "errors": errors,
+                "error_rate": round(errors / len(samples), 4),
+            })
+        return rows
+
+
+class StepError(Exception):
+    pass
+
+
+# virtual user
+
+class User:
+    """one browser session, sequential requests like the Dash renderer"""
+
+    def __init__(self, name: str, api_url: str, dash_url: str, recorder: Recorder, rng: random.Random):
+        self.name = name
+        self.api_url = api_url
+        self.dash_url = dash_url
+        self.recorder = recorder
+        self.rng = rng
+        self.session = requests.Session()
+        self.callbacks = None
+        self._requests = 0
+        self.image_urls = set()
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        self._requests += 1
+        resp = self.session.get(url, timeout=120, **kwargs)
+        if resp.status_code >= 400:
+            raise StepError(f"GET {url} -> {resp.status_code}")
+        return resp
+
+    def step(self, name: str, fn, *args, **kwargs) -> None:
+        """time one user-visible step (a page load, a click) made of several requests"""
+        self._requests = 0
+        ok = True
+        t0 = time.perf_counter()
+        try:
+            fn(*args, **kwargs)
+        except (StepError, requests.RequestException) as e:
+            ok = False
+            print(f"[{self.name}] {name}: {e}", file=sys.stderr)
+        self.recorder.add(name, (time.perf_counter() - t0) * 1000, ok, self._requests)
+
+    # dash protocol
+
+    def open_page(self, path: str) -> None:
+        """what the browser fetches to render a page of the multi-page app"""
+        self._get(self.dash_url + path)
+        self._get(f"{self.dash_url}/_dash-layout")
+        deps = self._get(f"{self.dash_url}/_dash-dependencies").json()
+        if self.callbacks is None:
+            self.callbacks = [d for d in deps if not d.get("clientside_function")]
+        self.callback("_pages_content.children", {"_pages_location.pathname": path, "_pages_location.search": ""},
+                      ["_pages_location.pathname"])
+
+    def _find(self, output: str) -> dict:
+        for dep in self.callbacks:
+            outputs = [o.split("@")[0] for o in dep["output"].strip(".").split("...")]
+            if output in outputs:
+                return dep
+        raise StepError(f"no server callback for {output}")
+
+    def callback(self, output: str, values: dict, changed: list) -> dict:
+        """
+        POST one callback to /_dash-update-component
+        values maps "id.property" to the current value of every input and state
+        """
+        dep = self._find(output)
+        outputs = []
+        for o in dep["output"].strip(".").split("..."):
+            component, prop = o.rsplit(".", 1)
+            outputs.append({"id": component, "property": prop.split("@")[0]})
+
+        def props(items):
+            return [{**x, "value": values.get(f"{x['id']}.{x['property']}")} for x in items]
+
+        body = {
+            "output": dep["output"],
+            "outputs": outputs if dep["output"].startswith("..") else outputs[0],
+            "inputs": props(dep["inputs"]),
+            "state": props(dep["state"]),
+            "changedPropIds": changed,
+        }
+        self._requests += 1
+        resp = self.session.post(f"{self.dash_url}/_dash-update-component", json=body, timeout=300)
+        if resp.status_code == 204:     # PreventUpdate
+            return {}
+        if resp.status_code >= 400:
+            raise StepError(f"callback {output} -> {resp.status_code}")
+        payload = resp.json()
+        if "response" not in payload:
+            raise StepError(f"callback {output} returned no response")
+        # the raw response escapes "/" as \u002f
+        self.image_urls.update(IMAGE_URL.findall(json.dumps(payload)))
+        return payload["response"]
+
+    # journeys
+
+    def comments(self, page: str, dropdown: str, country: str, n_clicks=None) -> None:
+        self.callback(f"{page}-comments-section.children", {
+            f"{page}-filter-country.value": ["filter"],
+            f"{page}-submit-btn.n_clicks": n_clicks,
+            f"{page}-status-clear-timer.n_intervals": 0,
+            f"{dropdown}.value": country,
+        }, [f"{dropdown}.value"] if n_clicks is None else [f"{page}-submit-btn.n_clicks"])
+        # the browser then loads the images of the listed comments from the API
+        for url in list(self.image_urls)[:5]:
+            self._get(self.api_url + url)
+        self.image_urls.clear()
+
+    def dashboard(self, countries: list) -> None:
+        page, dropdown, store = "vaccinations", "vax-country-dropdown", "vax-data-store.data"
+        width = f"{page}-chart-width.data"
+
+        def open_dashboard():
+            self.open_page(f"/dashboards/{page}")
+            self.callback(f"{dropdown}.options", {f"{dropdown}.id": dropdown, f"{dropdown}.value": "World"},
+                          [f"{dropdown}.id"])
+            self.callback(store, {f"{dropdown}.value": "World", width: CHART_WIDTH},
+                          [f"{dropdown}.value"])
+            self.comments(page, dropdown, "World")
+
+        def switch_country(country):
+            self.callback(store, {f"{dropdown}.value": country, width: CHART_WIDTH},
+                          [f"{dropdown}.value"])
+            self.comments(page, dropdown, country)
+
+        def post_comment(country):
+            self.callback(f"{page}-submit-status.children", {
+                f"{page}-submit-btn.n_clicks": 1,
+                f"{page}-status-clear-timer.n_intervals": 0,
+                f"{page}-user-input.value": self.name,
+                f"{page}-comment-input.value": f"load test comment from {self.name}",
+                f"{page}-image-upload.contents": "data:image/png;base64," + base64.b64encode(PNG).decode(),
+                f"{page}-image-upload.filename": "chart.png",
+                f"{dropdown}.value": country,
+            }, [f"{page}-submit-btn.n_clicks"])
+            self.comments(page, dropdown, country, n_clicks=1)
+
+        self.step("dashboard/open", open_dashboard)
+        for country in self.rng.sample(countries, min(3, len(countries))):
+            self.step("dashboard/switch-country", switch_country, country)
+        self.step("comments/post-with-image", post_comment, country)
+
+    def clustering(self, ks: list) -> None:
+        def open_clustering():
+            self.open_page("/analytics/clustering")
+            self.callback("cluster-map.figure", {"k-slider.value": 3, "cluster-mode.value": "yearly"},
+                          ["k-slider.value"])
+
+        self.step("clustering/open", open_clustering)
+        for mode in ["yearly", "trajectory"]:
+            for k in ks:
+                self.step(f"clustering/{mode}", self.callback, "cluster-map.figure",
+                          {"k-slider.value": k, "cluster-mode.value": mode}, ["k-slider.value"])
+
+    def forecast(self, countries: list) -> None:
+        dropdown = "forecast-country-dropdown"
+        country = self.rng.choice(countries)
+        self.step("forecast/open", self.open_page, "/analytics/mortality-forecast")
+        self.step("forecast/run", self.callback, "forecast-graph.figure", {f"{dropdown}.value": country},
+                  [f"{dropdown}.value"])
+
+    def api_client(self, countries: list) -> None:
+        # API consumers that skip the dashboard
+        country = self.rng.choice(countries)
+        self.step("api/countries", self._get, f"{self.api_url}/countries", params={"table": "ECDC_GLOBAL"})
+        self.step("api/infection-cases", self._get, f"{self.api_url}/infection-cases", params={"country": country})
+        self.step("api/patterns", self._get, f"{self.api_url}/patterns", params={"country": country})
+
+
+JOURNEYS = ["dashboard", "clustering", "forecast", "api"]
+
+
+def run_user(index: int, args, api_url: str, dash_url: str, countries: list, recorder: Recorder) -> None:
+    rng = random.Random(args.seed * 1000 + index)
+    user = User(f"user{index:03d}", api_url, dash_url, recorder, rng)
+    journeys = [j for j in JOURNEYS if j in args.journey_types]
+    for _ in range(args.journeys):
+        journey = rng.choice(journeys)
+        if journey == "dashboard":
+            user.dashboard(countries)
+        elif journey == "clustering":
+            user.clustering(args.k)
+        elif journey == "forecast":
+            user.forecast(countries)
+        else:
+            user.api_client(countries)
+        time.sleep(rng.uniform(0, args.think_time))
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--journeys", type=int, default=5, help="journeys per user")
+    parser.add_argument("--journey-types", default=",".join(JOURNEYS),
+                        type=lambda s: s.split(","), help=f"subset of {','.join(JOURNEYS)}")
+    parser.add_argument("--k", default="2,3,4,5,6", type=lambda s: [int(k) for k in s.split(",")],
+                        help="cluster counts a clustering journey goes through")
+    parser.add_argument("--think-time", type=float, default=0.5, help="max pause between journeys, seconds")
+    parser.add_argument("--scale", default="small", choices=SCALES, help="dataset size, 1x ~ the real sources")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--api-url", help="use a running API instead of starting one")
+    parser.add_argument("--dash-url", help="use a running Dash app instead of starting one")
+    parser.add_argument("--output", default=None, help="JSON file (default benchmarks/results/load-<time>.json)")
+    args = parser.parse_args(argv)
+
+    procs = []
+    api_url, dash_url = args.api_url, args.dash_url
+    if not (api_url and dash_url):
+        paths = prepare_data(args.scale, args.seed)
+        api_url, dash_url, procs = start_servers(paths)
+
+    try:
+        countries = requests.get(f"{api_url}/countries", params={"table": "ECDC_GLOBAL"}, timeout=60).json()
+        recorder = Recorder()
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            futures = [pool.submit(run_user, i, args, api_url, dash_url, countries, recorder)
+                       for i in range(args.users)]
+            for f in futures:
+                f.result()
+        elapsed = time.perf_counter() - t0
+    finally:
+        stop_servers(procs)
+
+    steps = sorted(recorder.summary(), key=lambda r: r["step"])
+    print(f"{'step':28s} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for r in steps:
+        print(f"{r['step']:28s} {r['count']:6d} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['p99_ms']:9.1f} "
+              f"{r['error_rate']:7.1%}")
+    total_requests = sum(r["requests"] for r in steps)
+    print(f"{total_requests} requests in {elapsed:.1f} s ({total_requests / elapsed:.1f} req/s)")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "users": args.users,
+            "journeys_per_user": args.journeys,
+            "journey_types": args.journey_types,
+            "k": args.k,
+            "scale": args.scale if procs else None,
+            "seed": args.seed,
+            "api_url": args.api_url,
+            "dash_url": args.dash_url,
+            "elapsed_s": round(elapsed, 2),
+            "requests": total_requests,
+            "throughput_rps": round(total_requests / elapsed, 2),
+        },
+        "steps": steps,
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
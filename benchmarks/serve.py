@@ -0,0 +1,57 @@
+# benchmarks/serve.py
+"""
+Serve the API or the Dash app against the local stand-ins (see backends.py)
+
+    python benchmarks/serve.py api --port 5000
+    python benchmarks/serve.py dash --port 8050
+
+Run it as a script, not with -m from the repo root: the repo's dash/
+directory would shadow the dash package. The API reads the stand-in paths
+from the environment (backends.local_env), Dash reads API_BASE.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def api_app():
+    """
+    The API on the stand-ins, also a gunicorn app factory:
+        gunicorn "benchmarks.serve:api_app()"
+    API_SOURCE serves api/src and shared of another checkout (bench_boot.py --source)
+    """
+    source = os.getenv("API_SOURCE", ROOT)
+    sys.path[:0] = [source, os.path.join(source, "api")]
+    if ROOT not in sys.path:
+        sys.path.append(ROOT)
+    from benchmarks.backends import use_mongo_double
+
+    use_mongo_double()
+    from src.api import app
+    return app
+
+
+def serve_api(port: int) -> None:
+    api_app().run(host="127.0.0.1", port=port, threaded=True)
+
+
+def serve_dash(port: int) -> None:
+    # dash/src as `src` first, the repo root (for `shared`) after site-packages
+    sys.path.insert(0, os.path.join(ROOT, "dash"))
+    sys.path.append(ROOT)
+
+    from src.app import app
+    app.run(host="127.0.0.1", port=port, debug=False, threaded=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("service", choices=["api", "dash"])
+    parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args()
+    if args.service == "api":
+        serve_api(args.port)
+    else:
+        serve_dash(args.port)
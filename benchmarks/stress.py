@@ -0,0 +1,156 @@
+# benchmarks/stress.py
+"""
+Concurrency stress test of the API under gunicorn worker classes
+
+    python -m benchmarks.stress [--configs sync:8,gthread:2x8,gevent:2] [--clients 32]
+
+Every config is "<worker class>:<workers>[x<threads>]" and is served by
+gunicorn with api/gunicorn.conf.py on the local stand-ins. --latency-ms adds a
+simulated warehouse round trip to every query (LOCAL_WAREHOUSE_LATENCY_MS), so
+requests wait on I/O the way they do against Snowflake. --clients threads
+then call a mix of uncached endpoints for --duration seconds.
+Reports throughput, latency, errors and memory (PSS of master + workers,
+the RAM the server actually holds), and requests per second per GB.
+"""
+import argparse
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from benchmarks.backends import ROOT, WORK_DIR, local_env, prepare_data
+from benchmarks.bench_api import _git_commit
+from benchmarks.bench_boot import _memory
+from benchmarks.load_test import _free_port, _wait_until_up
+
+CONFIG = os.path.join(ROOT, "api", "gunicorn.conf.py")
+# endpoints that query the warehouse on every request (response cache disabled in start_gunicorn)
+PATHS = [
+    "/excess-mortality?country=Lithuania",
+    "/vaccinations?country=Lithuania",
+    "/infection-cases?country=Lithuania",
+    "/infection-deaths?country=Lithuania",
+    "/clustering?k=3",
+]
+
+
+def parse_config(spec: str) -> dict:
+    """ "gthread:2x8" -> worker class, workers, threads"""
+    worker_class, _, size = spec.partition(":")
+    workers, _, threads = (size or "1").partition("x")
+    return {"worker_class": worker_class, "workers": int(workers), "threads": int(threads or 1)}
+
+
+def start_gunicorn(config: dict, paths: dict, latency_ms: float):
+    port = _free_port()
+    env = {
+        **os.environ, **local_env(paths),
+        "LOCAL_WAREHOUSE_LATENCY_MS": str(latency_ms),
+        # every request goes to the warehouse: no response cache, no warmer
+        "SERIES_CACHE_TTL": "0",
+        "CACHE_WARM_INTERVAL": "0",
+        "GUNICORN_WORKER_CLASS": config["worker_class"],
+        "GUNICORN_WORKERS": str(config["workers"]),
+        "GUNICORN_THREADS": str(config["threads"]),
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+    }
+    log = open(os.path.join(WORK_DIR, f"gunicorn-{config['worker_class']}.log"), "w")
+    proc = subprocess.Popen(["gunicorn", "-c", CONFIG, "benchmarks.serve:api_app()"],
+                            cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    _wait_until_up(url + "/ready", proc)
+    return url, proc
+
+
+def server_pss_mb(pid: int) -> float:
+    import psutil
+
+    master = psutil.Process(pid)
+    return sum(_memory(p)["pss_mb"] for p in [master] + master.children())
+
+
+def hammer(url: str, clients: int, duration: float) -> dict:
+    """clients threads cycling through PATHS for duration seconds"""
+    deadline = time.perf_counter() + duration
+
+    def client(i):
+        session = requests.Session()
+        latencies, errors, n = [], 0, i
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                ok = session.get(url + PATHS[n % len(PATHS)], timeout=60).status_code < 500
+            except requests.RequestException:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+            n += 1
+        return latencies, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([s for lat, _ in results for s in lat]) * 1000
+    errors = sum(e for _, e in results)
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "error_rate": round(errors / max(len(latencies), 1), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 1) if len(latencies) else None,
+        "p95_ms": round(float(np.percentile(latencies, 95)), 1) if len(latencies) else None,
+    }
+
+
+def run_config(spec: str, paths: dict, args) -> dict:
+    config = parse_config(spec)
+    url, proc = start_gunicorn(config, paths, args.latency_ms)
+    try:
+        # every worker loads its caches (clustering fits) before measuring
+        for path in PATHS:
+            for _ in range(config["workers"] * 2):
+                requests.get(url + path, timeout=120)
+        result = hammer(url, args.clients, args.duration)
+        result["pss_mb"] = round(server_pss_mb(proc.pid), 1)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    result["rps_per_gb"] = round(result["throughput_rps"] / (result["pss_mb"] / 1024), 1)
+    return {"config": spec, **config, **result}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", default="sync:8,gthread:2x8,gevent:2")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--scale", default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    paths = prepare_data(args.scale, args.seed)
+    runs = []
+    for spec in args.configs.split(","):
+        run = run_config(spec, paths, args)
+        runs.append(run)
+        print(f"{spec:<14} {run['throughput_rps']:>8.1f} req/s  p50 {run['p50_ms']} ms  p95 {run['p95_ms']} ms  "
+              f"errors {run['error_rate']:.2%}  PSS {run['pss_mb']:.0f} MB  {run['rps_per_gb']:.0f} req/s per GB")
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"stress-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"commit": _git_commit(), "clients": args.clients, "duration": args.duration,
+                   "latency_ms": args.latency_ms, "scale": args.scale, "runs": runs}, f, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc, page_container
 from src.components.navbar import get_navbar
+from src.components.datastore import ChartTemplateStore
+from src.cache import cache, CACHE_CONFIG
 from shared.config.config import DASHBOARDS_LIST
 
 # create dash app
@@ -17,10 +19,14 @@ app = dash.Dash(
 # expose flask server
 server = app.server
 
+# shared client cache for API responses
+cache.init_app(server, config=CACHE_CONFIG)
+
 # app layout
 app.layout = dbc.Container([
     get_navbar(),
     dcc.Location(id="url"),
+    ChartTemplateStore(),
     dash.page_container
 ], fluid=True)
 
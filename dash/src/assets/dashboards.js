@@ -0,0 +1,227 @@
+// dash/src/assets/dashboards.js
+// clientside figure builders for the dashboards
+// the fetched dataset lives in a dcc.Store, so toggling series,
+// normalization and zoom never goes back to the server
+
+(function () {
+
+    // empty figure with a message as title
+    function placeholder(title, height, template) {
+        return {
+            data: [],
+            layout: {title: {text: title}, template: template, height: height}
+        };
+    }
+
+    // shared x-axis with zoom presets, zoom survives view toggles via uirevision
+    function dateAxis(title) {
+        return {
+            title: {text: title},
+            rangeselector: {
+                buttons: [
+                    {count: 6, label: "6m", step: "month", stepmode: "backward"},
+                    {count: 1, label: "1y", step: "year", stepmode: "backward"},
+                    {step: "all", label: "All"}
+                ],
+                bgcolor: "#444"
+            }
+        };
+    }
+
+    function has(list, value) {
+        return (list || []).indexOf(value) !== -1;
+    }
+
+    // weekly + cumulative cases/deaths, optionally per 100k people
+    // measure is CASES_WEEKLY or DEATHS_WEEKLY, style holds labels and colors
+    function infection(data, series, normalize, template, measure, style) {
+        if (!data) {
+            return placeholder("Please select a country to see the data", 600, template);
+        }
+        if (data.error) {
+            return placeholder(data.error, 600, template);
+        }
+
+        const cols = data.columns;
+        const dates = cols.date;
+        const per100k = normalize === "per100k";
+
+        const weekly = cols[measure].map((v, i) => {
+            const value = Math.max(v || 0, 0);
+            const pop = cols.POPULATION ? cols.POPULATION[i] : null;
+            if (!per100k) {
+                return value;
+            }
+            return pop ? (value / pop) * 100000 : null;
+        });
+
+        // downsampled datasets carry the running total of the full series
+        let running = 0;
+        const cumulative = cols.CUMULATIVE
+            ? cols.CUMULATIVE.map((v, i) => {
+                const pop = cols.POPULATION ? cols.POPULATION[i] : null;
+                return per100k ? (pop ? (v / pop) * 100000 : null) : v;
+            })
+            : weekly.map(v => (running += v || 0));
+
+        const unit = per100k ? " per 100k" : "";
+        const traces = [];
+        if (has(series, "weekly")) {
+            traces.push({x: dates, y: weekly, type: "bar", name: `Weekly New ${style.label}`,
+                         marker: {color: style.barColor}, opacity: 0.6, yaxis: "y"});
+        }
+        if (has(series, "cumulative")) {
+            traces.push({x: dates, y: cumulative, type: "scatter", mode: "lines",
+                         name: `Cumulative ${style.label}`,
+                         line: {color: style.lineColor, dash: "dot"}, yaxis: "y2"});
+        }
+
+        return {
+            data: traces,
+            layout: {
+                title: {text: `COVID-19 Weekly & Cumulative ${style.label} in ${data.country}`},
+                xaxis: dateAxis("Week"),
+                yaxis: {title: {text: `Weekly ${style.label.toLowerCase()}${unit}`}, side: "left"},
+                yaxis2: {title: {text: `Cumulative ${style.label.toLowerCase()}${unit}`},
+                         overlaying: "y", side: "right"},
+                template: template,
+                hovermode: "x unified",
+                height: 600,
+                uirevision: data.country
+            }
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        dashboards: {
+
+            // vaccination progress, optionally as % of population
+            vaccination: function (data, series, normalize, template) {
+                if (!data) {
+                    return placeholder("Please select a country to see the data", 500, template);
+                }
+                if (data.error) {
+                    return placeholder(data.error, 500, template);
+                }
+
+                const cols = data.columns;
+                const dates = cols.date;
+                const population = cols.POPULATION ? cols.POPULATION[0] : null;
+                const percent = normalize === "percent";
+
+                // normalize values to percent of population
+                const scale = function (values) {
+                    if (!percent) {
+                        return values;
+                    }
+                    if (!population) {
+                        return [];
+                    }
+                    return values.map(v => v ? (v / population) * 100 : 0);
+                };
+
+                const peopleVax = scale(cols.PEOPLE_VACCINATED);
+                const fullyVax = scale(cols.PEOPLE_FULLY_VACCINATED);
+                const totalVax = scale(cols.TOTAL_VACCINATIONS);
+
+                const traces = [];
+                if (has(series, "people")) {
+                    traces.push({x: dates, y: peopleVax, type: "scatter", mode: "lines",
+                                 name: percent ? "≥1 Dose (% of population)" : "≥1 Dose"});
+                }
+                if (has(series, "fully")) {
+                    traces.push({x: dates, y: fullyVax, type: "scatter", mode: "lines",
+                                 name: percent ? "Fully Vaccinated (% of population)" : "Fully Vaccinated"});
+                }
+                if (has(series, "doses")) {
+                    traces.push({x: dates, y: totalVax, type: "scatter", mode: "lines",
+                                 name: percent ? "Total Doses per 100 People" : "Total Doses",
+                                 line: {dash: "dot"}});
+                }
+
+                // reference lines at 100% and 200%, only meaningful as percent
+                if (percent && has(series, "reference")) {
+                    traces.push({x: dates, y: dates.map(() => 100), type: "scatter", mode: "lines",
+                                 name: "= 1 dose per person", line: {color: "gray", dash: "dash"}});
+                    traces.push({x: dates, y: dates.map(() => 200), type: "scatter", mode: "lines",
+                                 name: "= 2 doses per person", line: {color: "lightgray", dash: "dot"}});
+                }
+
+                const layout = {
+                    title: {text: `Vaccination Progress in ${data.country}`},
+                    xaxis: dateAxis("Date"),
+                    yaxis: {title: {text: percent ? "% of Population" : "People / Doses"}},
+                    template: template,
+                    hovermode: "x unified",
+                    height: 500,
+                    uirevision: data.country
+                };
+                if (percent) {
+                    // keeps y-axis consistent
+                    layout.yaxis.range = [0, totalVax.reduce((m, v) => Math.max(m, v || 0), 220)];
+                }
+                return {data: traces, layout: layout};
+            },
+
+            // observed vs counterfactual vs covid deaths
+            mortality: function (data, series, normalize, template) {
+                if (!data) {
+                    return placeholder("Please select a country to see the data", 500, template);
+                }
+                if (data.error) {
+                    return placeholder(data.error, 500, template);
+                }
+
+                const cols = data.columns;
+                const dates = cols.date;
+                const share = normalize === "share";
+
+                // as share of all-cause deaths in the same month
+                const scale = function (values) {
+                    if (!share) {
+                        return values;
+                    }
+                    return values.map((v, i) => cols.deaths_allcause[i] ? (v / cols.deaths_allcause[i]) * 100 : null);
+                };
+
+                const traces = [];
+                if (has(series, "allcause")) {
+                    traces.push({x: dates, y: scale(cols.deaths_allcause), type: "scatter",
+                                 mode: "lines+markers", name: "Observed all-cause deaths"});
+                }
+                if (has(series, "counterfactual")) {
+                    traces.push({x: dates, y: scale(cols.deaths_without_covid), type: "scatter",
+                                 mode: "lines", name: "Counterfactual (no COVID)", line: {dash: "dash"}});
+                }
+                if (has(series, "covid")) {
+                    traces.push({x: dates, y: scale(cols.deaths_covid), type: "scatter",
+                                 mode: "lines", name: "Reported COVID deaths", line: {color: "red"}});
+                }
+
+                return {
+                    data: traces,
+                    layout: {
+                        title: {text: `Mortality Trends in ${data.country}`},
+                        xaxis: dateAxis("Date"),
+                        yaxis: {title: {text: share ? "% of all-cause deaths" : "Deaths"}},
+                        template: template,
+                        hovermode: "x unified",
+                        height: 500,
+                        margin: {l: 10, r: 10, t: 40, b: 20},
+                        uirevision: data.country
+                    }
+                };
+            },
+
+            cases: function (data, series, normalize, template) {
+                return infection(data, series, normalize, template, "CASES_WEEKLY",
+                                 {label: "Cases", barColor: "steelblue", lineColor: "orange"});
+            },
+
+            deaths: function (data, series, normalize, template) {
+                return infection(data, series, normalize, template, "DEATHS_WEEKLY",
+                                 {label: "Deaths", barColor: "crimson", lineColor: "purple"});
+            }
+        }
+    });
+})();
@@ -0,0 +1,153 @@
+#dash/src/cache.py
+import os
+import json
+import hashlib
+import tempfile
+import requests
+from flask_caching import Cache
+from flask_caching.backends.filesystemcache import FileSystemCache
+from plotly.io.json import to_json_plotly
+from shared.config.config import API_BASE
+
+# client cache for API responses and figures, bound to the dash server in app.py
+# with DASH_CACHE_REDIS_URL it lives in redis (bounded by maxmemory, LRU eviction,
+# see docker-compose.yml), otherwise on disk, shared by all gunicorn workers of the container
+# (bounded by DASH_CACHE_MAX_ITEMS, LRU eviction by LruFileSystemCache below)
+cache = Cache()
+
+
+class LruFileSystemCache(FileSystemCache):
+    """
+    FileSystemCache evicting the least recently used entries
+    a hit touches the entry's file, over the threshold the oldest files go first
+    (cachelib's own pruning removes them by expiry time)
+    """
+
+    def get(self, key):
+        value = super().get(key)
+        if value is not None:
+            try:
+                os.utime(self._get_filename(key))
+            except OSError:
+                pass
+        return value
+
+    def _remove_older(self) -> bool:
+        files = []
+        for fname in self._list_dir():
+            try:
+                files.append((os.stat(fname).st_mtime, fname))
+            except FileNotFoundError:
+                pass
+
+        for _, fname in sorted(files):
+            try:
+                os.remove(fname)
+                self._update_count(delta=-1)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                return False
+            if not self._over_threshold():
+                break
+        return True
+
+
+if os.getenv("DASH_CACHE_REDIS_URL"):
+    CACHE_CONFIG = {
+        "CACHE_TYPE": "RedisCache",
+        "CACHE_REDIS_URL": os.getenv("DASH_CACHE_REDIS_URL"),
+        "CACHE_KEY_PREFIX": "dash:",
+        "CACHE_DEFAULT_TIMEOUT": 300   # 5 minutes
+    }
+else:
+    CACHE_CONFIG = {
+        "CACHE_TYPE": os.getenv("DASH_CACHE_TYPE", f"{__name__}.LruFileSystemCache"),
+        "CACHE_DIR": os.getenv("DASH_CACHE_DIR", os.path.join(tempfile.gettempdir(), "covid_dash_cache")),
+        "CACHE_THRESHOLD": int(os.getenv("DASH_CACHE_MAX_ITEMS", 500)),
+        "CACHE_DEFAULT_TIMEOUT": 300   # 5 minutes
+    }
+
+# how long country lists are kept before asking the API again
+COUNTRIES_TTL = int(os.getenv("COUNTRIES_CACHE_TTL", 600))
+
+# how long figures are kept, a data version change invalidates them earlier
+FIGURE_CACHE_TTL = int(os.getenv("FIGURE_CACHE_TTL", 3600))
+
+# how long the last fetched series of a dataset is kept, across data versions,
+# so a new version only needs the newer rows (see components/datastore.py)
+SERIES_CACHE_TTL = int(os.getenv("SERIES_CACHE_TTL", 86400))
+
+# how often the data version is checked with the API
+DATA_VERSION_TTL = int(os.getenv("DATA_VERSION_TTL", 60))
+
+
+def get_data_version():
+    """
+    Return the API's data version, cached for DATA_VERSION_TTL
+    returns None if the API can't be reached
+    """
+    version = cache.get("data-version")
+    if version is not None:
+        return version
+
+    try:
+        resp = requests.get(f"{API_BASE}/data-version", timeout=2)
+        if resp.status_code != 200:
+            return None
+        version = resp.json()["version"]
+    except (requests.RequestException, ValueError, KeyError):
+        return None
+
+    cache.set("data-version", version, timeout=DATA_VERSION_TTL)
+    return version
+
+
+def figure_cache_key(page: str, *params):
+    """
+    Build the cache key of a figure from (page, parameters, data version)
+    returns None when the data version is unknown, nothing is cached then
+    """
+    version = get_data_version()
+    if version is None:
+        return None
+    raw = json.dumps([page, params, version], default=str, sort_keys=True)
+    return "figure:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def series_cache_key(page: str, *params):
+    """
+    Build the cache key of a dataset's last fetched series from (page, parameters),
+    without the data version: it is the base newer rows are merged into
+    """
+    raw = json.dumps([page, params], default=str, sort_keys=True)
+    return "series:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def get_cached_figure(key):
+    """
+    Return a cached callback result for key, or None on a miss
+    """
+    if key is None:
+        return None
+    value = cache.get(key)
+    return json.loads(value) if value is not None else None
+
+
+def cache_figure(key, value):
+    """
+    Store a callback result (figures, components, dicts) as serialized JSON
+    returns the value so callbacks can end with `return cache_figure(key, result)`
+    """
+    if key is not None:
+        cache.set(key, to_json_plotly(value), timeout=FIGURE_CACHE_TTL)
+    return value
+
+
+def cache_series(key, value):
+    """
+    Store a dataset's series (see series_cache_key) as serialized JSON for SERIES_CACHE_TTL
+    returns the value
+    """
+    cache.set(key, to_json_plotly(value), timeout=SERIES_CACHE_TTL)
+    return value
@@ -0,0 +1,48 @@
+#dash/src/components/countries.py
+import dash
+from dash import Output, Input, State, callback
+from shared.utils import fetch_country_lists
+from src.cache import cache, COUNTRIES_TTL
+
+# all country list variants, prefetched together in one API request
+COUNTRY_TABLES = ["ECDC_GLOBAL", "ECDC_GLOBAL_WEEKLY", "OWID_VACCINATIONS"]
+
+
+def get_countries(table: str = "ECDC_GLOBAL", include_world: bool = False) -> list:
+    """
+    Return the country list of a table from the shared cache
+    fetches all tables at once on a miss
+    adds 'World' option on top of the list if include_world=True
+    """
+    lists = cache.get("countries")
+    if lists is None:
+        lists = fetch_country_lists(COUNTRY_TABLES)
+        # only cache a real answer, a warming-up API is retried on the next page load
+        if lists:
+            cache.set("countries", lists, timeout=COUNTRIES_TTL)
+
+    countries = lists.get(table, []) if lists else []
+    return ["World"] + countries if include_world else countries
+
+
+def register_country_options(dropdown_id: str, table: str = "ECDC_GLOBAL",
+                             include_world: bool = False, select_first: bool = True):
+    """
+    Registers a callback that fills a country dropdown when the page loads
+    if select_first=True the first country is selected when the current value is not available
+    """
+
+    @callback(
+        [Output(dropdown_id, "options"),
+         Output(dropdown_id, "value")],
+        Input(dropdown_id, "id"),
+        State(dropdown_id, "value")
+    )
+    def load_country_options(_, value):
+        countries = get_countries(table, include_world=include_world)
+        options = [{"label": c, "value": c} for c in countries]
+
+        # keep the current selection so dependent callbacks don't fire twice
+        if not select_first or value in countries or not countries:
+            return options, dash.no_update
+        return options, countries[0]
@@ -0,0 +1,143 @@
+#dash/src/components/datastore.py
+import os
+import requests
+import pandas as pd
+import plotly.io as pio
+import dash
+from dash import dcc, Input, Output
+from shared.config.config import API_BASE
+from src.cache import figure_cache_key, get_cached_figure, cache_figure, series_cache_key, cache_series
+
+# chart widths are rounded up to a multiple of this many pixels
+WIDTH_STEP = 200
+
+# After a data version change a dataset isn't fetched again in full: the series
+# fetched before is kept (cache.series_cache_key) and only rows from
+# DELTA_OVERLAP_DAYS before its last date are asked for (?since=), recent
+# weeks are the ones revised by new reports. Downsampled deltas add up, so once
+# a series has more than twice max_points rows it is fetched in full again.
+DELTA_OVERLAP_DAYS = int(os.getenv("DELTA_OVERLAP_DAYS", 35))
+
+
+def ChartTemplateStore():
+    """
+    Holds the plotly_dark template so clientside callbacks
+    can build figures with the same look as server-side ones
+    """
+    return dcc.Store(id="chart-template", data=pio.templates["plotly_dark"].to_plotly_json())
+
+
+def ChartWidthStore(page: str):
+    """
+    Holds the width in pixels of a page's chart, measured clientside
+    (see register_chart_width), it bounds the points worth fetching
+    """
+    return dcc.Store(id=f"{page}-chart-width")
+
+
+def register_chart_width(page: str, graph_id: str):
+    """
+    Registers a clientside callback that measures the rendered graph once the page
+    shows it (the viewport width if it isn't laid out yet)
+    fetch callbacks take the store as an Input, so they wait for the measurement
+    """
+    dash.clientside_callback(
+        """
+        function(graphId) {
+            const graph = document.getElementById(graphId);
+            return graph && graph.clientWidth ? graph.clientWidth : window.innerWidth;
+        }
+        """,
+        Output(f"{page}-chart-width", "data"),
+        Input(graph_id, "id")
+    )
+
+
+def max_points_for(width):
+    """
+    points to ask the API for (?max_points=) for a chart width,
+    rounded up to WIDTH_STEP so similar screens share cached datasets
+    None (every point) when the width is unknown
+    """
+    if not width:
+        return None
+    return int(-(-width // WIDTH_STEP) * WIDTH_STEP)
+
+
+def series_dates(values) -> pd.Series:
+    """dates of a series' "date" column (ISO or HTTP dates, as the API serializes them)"""
+    return pd.to_datetime(pd.Series(values), format="mixed", utc=True).dt.tz_localize(None)
+
+
+def delta_start(earlier: dict, max_points: int = None):
+    """
+    ?since= date for refreshing an earlier fetched series,
+    None when it has to be fetched in full
+    """
+    if not earlier or "columns" not in earlier or not earlier["columns"].get("date"):
+        return None
+    dates = series_dates(earlier["columns"]["date"])
+    if max_points and len(dates) > 2 * max_points:
+        return None
+    return (dates.max() - pd.Timedelta(days=DELTA_OVERLAP_DAYS)).strftime("%Y-%m-%d")
+
+
+def merge_delta(columns: dict, delta: pd.DataFrame, since: str) -> pd.DataFrame:
+    """
+    earlier series (columns) with its rows from since on replaced by delta,
+    the API may start a delta earlier (whole months), so the cut is at its first date
+    """
+    earlier = pd.DataFrame(columns)
+    cutoff = pd.Timestamp(since)
+    if not delta.empty:
+        cutoff = min(cutoff, series_dates(delta["date"]).min())
+    earlier = earlier[(series_dates(earlier["date"]) < cutoff).to_numpy()]
+    return pd.concat([earlier, delta], ignore_index=True)
+
+
+def fetch_dataset(page: str, country: str, width: int = None) -> dict:
+    """
+    Fetch a dataset for a country from the API, downsampled to the chart width
+    returns it in columnar form for a dcc.Store,
+    or a dict with an "error" message
+    successful results are cached per (page, country, width step, data version),
+    after a version change only the newer rows are fetched and merged
+    """
+    max_points = max_points_for(width)
+    key = figure_cache_key(page, country, max_points)
+    cached = get_cached_figure(key)
+    if cached is not None:
+        return cached
+
+    series_key = series_cache_key(page, country, max_points)
+    earlier = get_cached_figure(series_key)
+    since = delta_start(earlier, max_points)
+
+    params = {"country": country}
+    if max_points:
+        params["max_points"] = max_points
+    if since:
+        params["since"] = since
+    try:
+        resp = requests.get(f"{API_BASE}/{page}", params=params)
+    except requests.RequestException as e:
+        return {"country": country, "error": f"Error fetching data: {e}"}
+
+    if resp.status_code != 200:
+        return {"country": country, "error": f"Error fetching data: {resp.text[:200]}"}
+
+    try:
+        data = resp.json()
+    except Exception:
+        return {"country": country, "error": f"Invalid response: {resp.text[:200]}"}
+
+    # handle empty or error responses, an empty delta only means nothing is newer
+    if isinstance(data, dict) and "error" in data or not data and not since:
+        return {"country": country, "error": "No data available"}
+
+    # records -> columns, so the browser gets one array per series
+    df = pd.DataFrame(data)
+    if since:
+        df = merge_delta(earlier["columns"], df, since)
+    result = cache_series(series_key, {"country": country, "columns": df.to_dict(orient="list")})
+    return cache_figure(key, result)
@@ -7,6 +7,7 @@ import pandas as pd
 import plotly.express as px
 from shared.config.config import API_BASE, CLUSTERING_PAGE
 from src.components.comments import CommentsSection, register_comment_callbacks
+from src.cache import figure_cache_key, get_cached_figure, cache_figure
 
 dash.register_page(__name__, path=f"/analytics/{CLUSTERING_PAGE}", name="Country Clustering")
 
@@ -28,7 +29,19 @@ layout = dbc.Container([
                 id="k-slider", min=2, max=6, step=1, value=3,
                 marks={i: str(i) for i in range(2, 7)}
             )
-        ], width=6)
+        ], width=6),
+        dbc.Col([
+            html.Label("Cluster on:"),
+            dbc.RadioItems(
+                id="cluster-mode",
+                options=[
+                    {"label": "Yearly totals", "value": "yearly"},
+                    {"label": "Weekly trajectories", "value": "trajectory"},
+                ],
+                value="yearly",
+                inline=True
+            )
+        ], width="auto")
     ], className="mb-4"),
 
     dbc.Row([
@@ -59,10 +72,17 @@ layout = dbc.Container([
     [Output("cluster-map", "figure"),
      Output("cluster-table", "children"),
      Output("cluster-explanation", "children")],
-    Input("k-slider", "value")
+    [Input("k-slider", "value"),
+     Input("cluster-mode", "value")]
 )
-def update_clusters(k):
-    resp = requests.get(f"{API_BASE}/{CLUSTERING_PAGE}", params={"k": k})
+def update_clusters(k, mode="yearly"):
+    # serve popular selections from the figure cache
+    key = figure_cache_key(CLUSTERING_PAGE, k, mode)
+    cached = get_cached_figure(key)
+    if cached is not None:
+        return cached
+
+    resp = requests.get(f"{API_BASE}/{CLUSTERING_PAGE}", params={"k": k, "mode": mode})
     if resp.status_code != 200:
         return px.scatter(title="Error fetching clusters"), html.Div("Error"), "Error"
 
@@ -127,7 +147,7 @@ def update_clusters(k):
             ])
         )
 
-    return fig, table, dbc.Card(dbc.CardBody(explanations))
+    return cache_figure(key, (fig, table, dbc.Card(dbc.CardBody(explanations))))
 
 
 # register reusable comment callbacks
@@ -53,21 +53,66 @@ layout = dbc.Container([
         ],
         className="mb-4 justify-content-center align-items-center",
     ),
-    # Download report button
+    # EDA mode: first 5000 rows, the whole table streamed in batches, or computed in the warehouse
     dbc.Row(
         dbc.Col(
-            html.A(
-                "Download More Detailed Report",
-                id="eda-download-btn",
-                className="btn btn-secondary disabled",
-                href="#",
-                target="_blank"  # open in new tab
+            dbc.RadioItems(
+                id="eda-mode",
+                options=[
+                    {"label": "First 5000 rows", "value": "sample"},
+                    {"label": "Full table (streaming)", "value": "stream"},
+                    {"label": "Full table (in warehouse)", "value": "pushdown"},
+                ],
+                value="sample",
+                inline=True
             ),
+            width="auto"
+        ),
+        className="justify-content-center mb-2"
+    ),
+    # Columns, row filter and warehouse-side sampling, applied to the EDA and the report
+    dbc.Row(
+        [
+            dbc.Col(
+                dcc.Dropdown(id="eda-columns", multi=True, placeholder="All columns"),
+                width=4
+            ),
+            dbc.Col(
+                dbc.Input(
+                    id="eda-where",
+                    placeholder="Filter, e.g. CASES_WEEKLY > 100 AND COUNTRY_REGION = 'Lithuania'",
+                    debounce=True
+                ),
+                width=4
+            ),
+            dbc.Col(
+                dbc.Input(id="eda-sample", type="number", min=0.01, max=100, step="any",
+                          placeholder="Sample % (all rows)"),
+                width=2
+            ),
+        ],
+        className="justify-content-center mb-2"
+    ),
+    # Download report button, enabled once the report job is done
+    dbc.Row(
+        dbc.Col(
+            [
+                html.A(
+                    "Download More Detailed Report",
+                    id="eda-download-btn",
+                    className="btn btn-secondary disabled",
+                    href="#",
+                    target="_blank"  # open in new tab
+                ),
+                html.Div(id="eda-report-status", className="text-muted small mt-2")
+            ],
             width="auto",
             className="text-center"
         ),
         className="justify-content-center mt-4 mb-5"
     ),
+    dcc.Store(id="eda-report-job"),
+    dcc.Interval(id="eda-report-poll", interval=2000, disabled=True),
     # Results section
     dbc.Row(
         dbc.Col(
@@ -99,25 +144,51 @@ def load_tables(_):
     return []
 
 
+@dash.callback(
+    [Output("eda-columns", "options"),
+     Output("eda-columns", "value")],
+    Input("eda-table-dropdown", "value")
+)
+def load_columns(table):
+    """Fetch the columns of the selected table from API"""
+    if not table:
+        return [], []
+    try:
+        resp = requests.get(f"{API_BASE}/eda/columns", params={"table": table})
+        if resp.status_code == 200:
+            return [{"label": f"{c['name']} ({c['type']})", "value": c["name"]} for c in resp.json()], []
+    except Exception:
+        return [], []
+    return [], []
+
+
 @dash.callback(
     [
         Output("eda-output", "children"),        # 👈 dummy div to trigger spinner
         Output("eda-results", "children"),       # 👈 actual results below
-        Output("eda-download-btn", "className"),
-        Output("eda-download-btn", "href")
+        Output("eda-report-job", "data"),
+        Output("eda-report-poll", "disabled")
     ],
     Input("eda-run-btn", "n_clicks"),
     State("eda-table-dropdown", "value"),
+    State("eda-mode", "value"),
+    State("eda-columns", "value"),
+    State("eda-where", "value"),
+    State("eda-sample", "value"),
     prevent_initial_call=True
 )
-def run_eda(n_clicks, table):
-    """Run EDA and display results, enable download button"""
+def run_eda(n_clicks, table, mode="sample", columns=None, where=None, sample=None):
+    """Run EDA and display results, submit the detailed report job"""
     if not table:
-        return "", html.Div("Please select a table", className="text-danger"), "btn btn-secondary disabled", "#"
+        return "", html.Div("Please select a table", className="text-danger"), None, True
 
-    resp = requests.get(f"{API_BASE}/eda", params={"table": table})
+    # only the columns, rows and sample asked for are read
+    filters = {"columns": ",".join(columns or []), "where": where or "", "sample": sample or ""}
+    filters = {k: v for k, v in filters.items() if v}
+
+    resp = requests.get(f"{API_BASE}/eda", params={"table": table, "mode": mode, **filters})
     if resp.status_code != 200:
-        return "", html.Div(f"Error: {resp.text}", className="text-danger"), "btn btn-secondary disabled", "#"
+        return "", html.Div(f"Error: {resp.text}", className="text-danger"), None, True
 
     results = resp.json()
 
@@ -146,6 +217,39 @@ def run_eda(n_clicks, table):
         dbc.Table.from_dataframe(corr, striped=True, bordered=True, hover=True),
     ])
 
-    # Enable download
-    download_url = f"{API_BASE_EXTERNAL}/eda/report?table={table}"
-    return "", output, "btn btn-secondary", download_url
+    # Build the detailed report in the background, polled below
+    try:
+        job = requests.post(f"{API_BASE}/eda/report/jobs", params={"table": table, **filters}).json()
+    except Exception:
+        job = None
+    return "", output, job, not job or "job_id" not in job
+
+
+@dash.callback(
+    [
+        Output("eda-download-btn", "className"),
+        Output("eda-download-btn", "href"),
+        Output("eda-report-status", "children"),
+        Output("eda-report-poll", "disabled", allow_duplicate=True)
+    ],
+    [Input("eda-report-poll", "n_intervals"),
+     Input("eda-report-job", "data")],
+    prevent_initial_call=True
+)
+def poll_eda_report(_, job):
+    """Poll the report job, enable download button when it is done"""
+    if not job or "job_id" not in job:
+        return "btn btn-secondary disabled", "#", "", True
+
+    try:
+        job = requests.get(f"{API_BASE}/eda/report/jobs/{job['job_id']}").json()
+    except Exception:
+        return "btn btn-secondary disabled", "#", "Waiting for the API...", False
+
+    status = job.get("status")
+    if status == "done":
+        download_url = f"{API_BASE_EXTERNAL}/eda/report/jobs/{job['job_id']}/result"
+        return "btn btn-secondary", download_url, "", True
+    if status == "failed" or "error" in job:
+        return "btn btn-secondary disabled", "#", f"Report failed: {job.get('error', '')}", True
+    return "btn btn-secondary disabled", "#", "Preparing detailed report...", False
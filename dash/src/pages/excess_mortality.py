@@ -1,22 +1,16 @@
 #dash/src/pages/excess_mortality.py
 
-import requests
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State, ClientsideFunction
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-from shared.config.config import EXCESS_MORTALITY_PAGE, API_BASE
+from shared.config.config import EXCESS_MORTALITY_PAGE
 from src.components.comments import CommentsSection, register_comment_callbacks
-from shared.utils import get_country_list
+from src.components.datastore import fetch_dataset, ChartWidthStore, register_chart_width
+from src.components.countries import register_country_options
 
 # register this page
 dash.register_page(__name__, path=f"/dashboards/{EXCESS_MORTALITY_PAGE}", name="Excess Mortality")
 
-
-
-COUNTRIES = get_country_list(table="ECDC_GLOBAL", include_world=False)
-
-
 # layout
 layout = dbc.Container([
 
@@ -30,14 +24,47 @@ layout = dbc.Container([
         dbc.Col([
             dcc.Dropdown(
                 id="country-dropdown",
-                options=[{"label": c, "value": c} for c in COUNTRIES],
-                value=COUNTRIES[0] if COUNTRIES else "Lithuania",
+                options=[],
+                value=None,
                 placeholder="Select a country",
                 style={"width": "100%"}
             )
         ], width=6)
     ], className="mb-4"),
 
+    # view controls, handled clientside
+    dbc.Row([
+        dbc.Col(
+            dbc.Checklist(
+                id="mortality-series",
+                options=[
+                    {"label": "All-cause deaths", "value": "allcause"},
+                    {"label": "Counterfactual", "value": "counterfactual"},
+                    {"label": "COVID deaths", "value": "covid"},
+                ],
+                value=["allcause", "counterfactual", "covid"],
+                inline=True
+            ),
+            width="auto"
+        ),
+        dbc.Col(
+            dbc.RadioItems(
+                id="mortality-normalize",
+                options=[
+                    {"label": "Deaths", "value": "absolute"},
+                    {"label": "% of all-cause deaths", "value": "share"},
+                ],
+                value="absolute",
+                inline=True
+            ),
+            width="auto"
+        )
+    ], className="mb-3"),
+
+    # fetched dataset, columnar
+    dcc.Store(id="mortality-data-store"),
+    ChartWidthStore(EXCESS_MORTALITY_PAGE),
+
     # graph + comments
     dbc.Row([
         dbc.Col(
@@ -53,60 +80,38 @@ layout = dbc.Container([
 ], fluid=True)
 
 
-# callback to update graph
+# callback to fetch mortality data, runs when the country changes or the chart is measured
 @dash.callback(
-    Output("mortality-graph", "figure"),
-    Input("country-dropdown", "value")
+    Output("mortality-data-store", "data"),
+    Input("country-dropdown", "value"),
+    Input(f"{EXCESS_MORTALITY_PAGE}-chart-width", "data")
 )
-def update_mortality_chart(country):
+def update_mortality_data(country, width):
     """
-    Updates the mortality chart when a country is selected
+    Fetches merged mortality data for the selected country into the store
     """
-
     # handle case when no country is selected
     if not country:
-        return go.Figure().update_layout(
-            title="Please select a country to see the data",
-            template="plotly_dark",
-            height=500
-        )
+        return None
+    return fetch_dataset(EXCESS_MORTALITY_PAGE, country, width)
+
+
+# clientside callback to draw the chart from the store
+dash.clientside_callback(
+    ClientsideFunction(namespace="dashboards", function_name="mortality"),
+    Output("mortality-graph", "figure"),
+    Input("mortality-data-store", "data"),
+    Input("mortality-series", "value"),
+    Input("mortality-normalize", "value"),
+    State("chart-template", "data")
+)
+
 
-    # fetch data for selected country
-    covid_resp = requests.get(f"{API_BASE}/{EXCESS_MORTALITY_PAGE}", params={"country": country})
-
-    if covid_resp.status_code != 200:
-        return go.Figure().update_layout(title="Error fetching data")
-
-    covid_data = covid_resp.json()
-    if not covid_data or isinstance(covid_data, dict) and "error" in covid_data:
-        return go.Figure().update_layout(title="No data available")
-
-    # extract data for plotting
-    dates = [d["date"] for d in covid_data]
-    deaths_all = [d["deaths_allcause"] for d in covid_data]
-    deaths_counterfactual = [d["deaths_without_covid"] for d in covid_data]
-    deaths_covid = [d["deaths_covid"] for d in covid_data]
-
-    # build figure with three lines
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dates, y=deaths_all, mode="lines+markers", name="Observed all-cause deaths"))
-    fig.add_trace(go.Scatter(x=dates, y=deaths_counterfactual, mode="lines", name="Counterfactual (no COVID)",
-                             line=dict(dash="dash")))
-    fig.add_trace(go.Scatter(x=dates, y=deaths_covid, mode="lines", name="Reported COVID deaths", line=dict(color="red")))
-
-    # update chart style
-    fig.update_layout(
-        title=f"Mortality Trends in {country}",
-        xaxis_title="Date",
-        yaxis_title="Deaths",
-        template="plotly_dark",
-        hovermode="x unified",
-        height=500,
-        margin=dict(l=10, r=10, t=40, b=20)
-    )
-
-    return fig
+# load country options lazily on page load
+register_country_options("country-dropdown", table="ECDC_GLOBAL")
 
+# chart width for ?max_points=
+register_chart_width(EXCESS_MORTALITY_PAGE, "mortality-graph")
 
 # register reusable comment callbacks
 register_comment_callbacks(EXCESS_MORTALITY_PAGE, country_dropdown_id="country-dropdown")
@@ -1,24 +1,15 @@
 #dash/src/pages/infection_cases.py
-import requests
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State, ClientsideFunction
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-import pandas as pd
-from shared.config.config import API_BASE, INFECTION_CASES_PAGE
+from shared.config.config import INFECTION_CASES_PAGE
 from src.components.comments import CommentsSection, register_comment_callbacks
-from shared.utils import get_country_list
+from src.components.datastore import fetch_dataset, ChartWidthStore, register_chart_width
+from src.components.countries import register_country_options
 
 # register this page
 dash.register_page(__name__, path=f"/dashboards/{INFECTION_CASES_PAGE}", name="Infection Cases")
 
-
-
-
-
-COUNTRIES = get_country_list(table="ECDC_GLOBAL_WEEKLY", include_world=True)
-
-
 # layout
 layout = dbc.Container([
 
@@ -32,14 +23,46 @@ layout = dbc.Container([
         dbc.Col([
             dcc.Dropdown(
                 id="cases-country-dropdown",
-                options=[{"label": c, "value": c} for c in COUNTRIES],
-                value=COUNTRIES[0] if COUNTRIES else "World",
+                options=[],
+                value="World",
                 placeholder="Select a country",
                 style={"width": "100%"}
             )
         ], width=6),
     ], className="mb-4"),
 
+    # view controls, handled clientside
+    dbc.Row([
+        dbc.Col(
+            dbc.Checklist(
+                id="cases-series",
+                options=[
+                    {"label": "Weekly", "value": "weekly"},
+                    {"label": "Cumulative", "value": "cumulative"},
+                ],
+                value=["weekly", "cumulative"],
+                inline=True
+            ),
+            width="auto"
+        ),
+        dbc.Col(
+            dbc.RadioItems(
+                id="cases-normalize",
+                options=[
+                    {"label": "Cases", "value": "absolute"},
+                    {"label": "Per 100k people", "value": "per100k"},
+                ],
+                value="absolute",
+                inline=True
+            ),
+            width="auto"
+        )
+    ], className="mb-3"),
+
+    # fetched dataset, columnar
+    dcc.Store(id="cases-data-store"),
+    ChartWidthStore(INFECTION_CASES_PAGE),
+
     # graph + comments
     dbc.Row([
         dbc.Col(
@@ -55,77 +78,38 @@ layout = dbc.Container([
 ], fluid=True)
 
 
-# callback to update the cases graph
+# callback to fetch weekly cases data, runs when the country changes or the chart is measured
 @dash.callback(
-    Output("cases-graph", "figure"),
-    [Input("cases-country-dropdown", "value")]
+    Output("cases-data-store", "data"),
+    Input("cases-country-dropdown", "value"),
+    Input(f"{INFECTION_CASES_PAGE}-chart-width", "data")
 )
-def update_cases_chart(country):
+def update_cases_data(country, width):
     """
-    Updates the weekly and cumulative cases chart
-    based on the selected country
+    Fetches weekly cases data for the selected country into the store
     """
     # handle missing selection
     if not country:
-        return go.Figure().update_layout(
-            title="Please select a country to see the data",
-            template="plotly_dark",
-            height=600
-        )
-
-    # fetch data from API
-    resp = requests.get(f"{API_BASE}/{INFECTION_CASES_PAGE}", params={"country": country})
+        return None
+    return fetch_dataset(INFECTION_CASES_PAGE, country, width)
 
-    if resp.status_code != 200:
-        return go.Figure().update_layout(title=f"Error fetching data: {resp.text}")
 
-    try:
-        data = resp.json()
-    except Exception:
-        return go.Figure().update_layout(title=f"Invalid response: {resp.text[:200]}")
-
-    # handle empty or error responses
-    if not data or isinstance(data, dict) and "error" in data:
-        return go.Figure().update_layout(title="No infection data available")
-
-    df = pd.DataFrame(data)
-    if df.empty:
-        return go.Figure().update_layout(title="No data available")
-
-    # format dates and compute metrics
-    df["date"] = pd.to_datetime(df["DATE"]).dt.strftime("%Y-%m-%d")
-    df["new_cases"] = df["CASES_WEEKLY"].clip(lower=0)
-    df["cumulative_cases"] = df["new_cases"].cumsum()
+# clientside callback to draw weekly and cumulative cases from the store
+dash.clientside_callback(
+    ClientsideFunction(namespace="dashboards", function_name="cases"),
+    Output("cases-graph", "figure"),
+    Input("cases-data-store", "data"),
+    Input("cases-series", "value"),
+    Input("cases-normalize", "value"),
+    State("chart-template", "data")
+)
 
-    # build figure
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=df["date"], y=df["new_cases"],
-        name="Weekly New Cases",
-        marker_color="steelblue",
-        opacity=0.6,
-        yaxis="y1"
-    ))
-    fig.add_trace(go.Scatter(
-        x=df["date"], y=df["cumulative_cases"],
-        name="Cumulative Cases",
-        mode="lines",
-        line=dict(color="orange", dash="dot"),
-        yaxis="y2"
-    ))
 
-    # update chart style
-    fig.update_layout(
-        title=f"COVID-19 Weekly & Cumulative Cases in {country}",
-        xaxis=dict(title="Week"),
-        yaxis=dict(title="Weekly cases", side="left"),
-        yaxis2=dict(title="Cumulative cases", overlaying="y", side="right"),
-        template="plotly_dark",
-        hovermode="x unified",
-        height=600
-    )
-    return fig
+# load country options lazily on page load
+register_country_options("cases-country-dropdown", table="ECDC_GLOBAL_WEEKLY", include_world=True)
 
+# chart width for ?max_points=
+register_chart_width(INFECTION_CASES_PAGE, "cases-graph")
 
 # register reusable comment callbacks
 register_comment_callbacks(INFECTION_CASES_PAGE, country_dropdown_id="cases-country-dropdown")
@@ -5,15 +5,13 @@ from dash import dcc, html, Input, Output
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import pandas as pd
-from shared.utils import get_country_list
+from src.components.countries import register_country_options
 from shared.config.config import API_BASE, MORTALITY_FORECAST_PAGE
 from src.components.comments import CommentsSection, register_comment_callbacks
+from src.cache import figure_cache_key, get_cached_figure, cache_figure
 
 dash.register_page(__name__, path=f"/analytics/{MORTALITY_FORECAST_PAGE}", name="Excess Mortality Forecasting")
 
-COUNTRIES = get_country_list(table="ECDC_GLOBAL", include_world=False)
-COUNTRIES.insert(0, "World")
-
 layout = dbc.Container([
     dbc.Row([
         dbc.Col(
@@ -28,8 +26,8 @@ layout = dbc.Container([
         dbc.Col([
             dcc.Dropdown(
                 id="forecast-country-dropdown",
-                options=[{"label": c, "value": c} for c in COUNTRIES],
-                value=COUNTRIES[0] if COUNTRIES else "World",
+                options=[],
+                value="World",
                 style={"width": "100%"}
             )
         ], width=6)
@@ -61,6 +59,12 @@ def update_forecast(country):
     if not country:
         return go.Figure().update_layout(title="Select a country"), []
 
+    # serve popular selections from the figure cache
+    key = figure_cache_key(MORTALITY_FORECAST_PAGE, country)
+    cached = get_cached_figure(key)
+    if cached is not None:
+        return cached
+
     resp = requests.get(f"{API_BASE}/{MORTALITY_FORECAST_PAGE}", params={"country": country})
     if resp.status_code != 200:
         return go.Figure().update_layout(title="Error fetching forecast"), []
@@ -107,8 +111,11 @@ def update_forecast(country):
         ]), className="shadow-sm"), md=6)
     ])
 
-    return fig, kpis
+    return cache_figure(key, (fig, kpis))
+
 
+# load country options lazily on page load
+register_country_options("forecast-country-dropdown", table="ECDC_GLOBAL", include_world=True)
 
 # register reusable comment callbacks
 register_comment_callbacks(MORTALITY_FORECAST_PAGE, country_dropdown_id="forecast-country-dropdown")
@@ -7,6 +7,8 @@ import plotly.express as px
 import pandas as pd
 from shared.config.config import API_BASE, PATTERNS_PAGE
 from src.components.comments import CommentsSection, register_comment_callbacks
+from src.components.countries import register_country_options
+from src.cache import figure_cache_key, get_cached_figure, cache_figure
 
 # Register page
 dash.register_page(__name__, path=f"/analytics/{PATTERNS_PAGE}", name="Patterns")
@@ -38,6 +40,20 @@ layout = dbc.Container([
             dbc.Button("Detect Patterns", id="patterns-run-btn", color="primary"),
             width="auto"
         )
+    ], className="justify-content-center mb-2"),
+
+    # Detection parameters
+    dbc.Row([
+        dbc.Col([
+            html.Label("Smoothing (weeks)"),
+            dcc.Slider(id="patterns-smoothing", min=1, max=8, step=1, value=1,
+                       marks={i: str(i) for i in range(1, 9)})
+        ], width=4),
+        dbc.Col([
+            html.Label("Minimum prominence"),
+            dcc.Slider(id="patterns-prominence", min=0, max=0.9, step=0.1, value=0,
+                       marks={i / 10: f"{i * 10}%" for i in range(0, 10, 2)})
+        ], width=4)
     ], className="justify-content-center mb-4"),
 
     # Graph + comments
@@ -59,29 +75,19 @@ layout = dbc.Container([
 
 
 # Callbacks
-@dash.callback(
-    Output("patterns-country-dropdown", "options"),
-    Input("patterns-country-dropdown", "id")
-)
-def load_countries(_):
-    """Load country options from API"""
-    try:
-        resp = requests.get(f"{API_BASE}/countries?table=ECDC_GLOBAL_WEEKLY")
-        if resp.status_code == 200:
-            countries = resp.json()
-            return [{"label": c, "value": c} for c in countries]
-    except Exception:
-        return []
-    return []
+# load country options lazily on page load
+register_country_options("patterns-country-dropdown", table="ECDC_GLOBAL_WEEKLY", select_first=False)
 
 
 @dash.callback(
     Output("patterns-graph", "figure"),
     Input("patterns-run-btn", "n_clicks"),
     State("patterns-country-dropdown", "value"),
+    State("patterns-smoothing", "value"),
+    State("patterns-prominence", "value"),
     prevent_initial_call=False
 )
-def detect_patterns(n_clicks, country):
+def detect_patterns(n_clicks, country, smoothing=1, min_prominence=0):
     if not country:
         # Default placeholder when no country is selected
         fig = px.scatter(title="Please select a country to view detected COVID-19 waves.")
@@ -92,7 +98,16 @@ def detect_patterns(n_clicks, country):
         )
         return fig
 
-    resp = requests.get(f"{API_BASE}/{PATTERNS_PAGE}", params={"country": country})
+    # serve popular selections from the figure cache
+    key = figure_cache_key(PATTERNS_PAGE, country, smoothing, min_prominence)
+    cached = get_cached_figure(key)
+    if cached is not None:
+        return cached
+
+    resp = requests.get(
+        f"{API_BASE}/{PATTERNS_PAGE}",
+        params={"country": country, "smoothing": smoothing, "min_prominence": min_prominence}
+    )
     if resp.status_code != 200:
         return px.scatter(title=f"Error: {resp.text}")
 
@@ -134,7 +149,7 @@ def detect_patterns(n_clicks, country):
         margin=dict(l=10, r=10, t=40, b=20)
     )
 
-    return fig
+    return cache_figure(key, fig)
 
 
 # Register reusable comment callbacks
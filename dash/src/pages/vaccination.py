@@ -1,22 +1,16 @@
 #dash/src/pages/vaccination.py
 
-import requests
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State, ClientsideFunction
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-from shared.config.config import API_BASE, VACCINATION_PAGE
+from shared.config.config import VACCINATION_PAGE
 from src.components.comments import CommentsSection, register_comment_callbacks
-from shared.utils import get_country_list
+from src.components.datastore import fetch_dataset, ChartWidthStore, register_chart_width
+from src.components.countries import register_country_options
 
 # register this page
 dash.register_page(__name__, path=f"/dashboards/{VACCINATION_PAGE}", name="Vaccination Impact")
 
-
-COUNTRIES = get_country_list(table="ECDC_GLOBAL", include_world=True)
-
-
-
 # layout
 layout = dbc.Container([
 
@@ -30,14 +24,48 @@ layout = dbc.Container([
         dbc.Col([
             dcc.Dropdown(
                 id="vax-country-dropdown",
-                options=[{"label": c, "value": c} for c in COUNTRIES],
-                value=COUNTRIES[0] if COUNTRIES else "World",
+                options=[],
+                value="World",
                 placeholder='Select a country',
                 style={"width": "100%"}
             )
         ], width=6)
     ], className="mb-4"),
 
+    # view controls, handled clientside
+    dbc.Row([
+        dbc.Col(
+            dbc.Checklist(
+                id="vax-series",
+                options=[
+                    {"label": "≥1 Dose", "value": "people"},
+                    {"label": "Fully Vaccinated", "value": "fully"},
+                    {"label": "Total Doses", "value": "doses"},
+                    {"label": "Reference lines", "value": "reference"},
+                ],
+                value=["people", "fully", "doses", "reference"],
+                inline=True
+            ),
+            width="auto"
+        ),
+        dbc.Col(
+            dbc.RadioItems(
+                id="vax-normalize",
+                options=[
+                    {"label": "% of population", "value": "percent"},
+                    {"label": "Absolute", "value": "absolute"},
+                ],
+                value="percent",
+                inline=True
+            ),
+            width="auto"
+        )
+    ], className="mb-3"),
+
+    # fetched dataset, columnar
+    dcc.Store(id="vax-data-store"),
+    ChartWidthStore(VACCINATION_PAGE),
+
     # graph + comments
     dbc.Row([
         dbc.Col(
@@ -53,86 +81,39 @@ layout = dbc.Container([
 ], fluid=True)
 
 
-# callback to update vaccination graph
+# callback to fetch vaccination data, runs when the country changes or the chart is measured
 @dash.callback(
-    Output("vaccination-graph", "figure"),
-    Input("vax-country-dropdown", "value")
+    Output("vax-data-store", "data"),
+    Input("vax-country-dropdown", "value"),
+    Input(f"{VACCINATION_PAGE}-chart-width", "data")
 )
-def update_vaccination_chart(country):
+def update_vaccination_data(country, width):
     """
-    Updates the vaccination chart for the selected country
-    shows partially vaccinated, fully vaccinated, and total doses per person
+    Fetches vaccination data for the selected country into the store
     """
     # handle missing selection
     if not country:
-        return go.Figure().update_layout(
-            title="Please select a country to see the data",
-            template="plotly_dark",
-            height=500
-        )
+        return None
+    return fetch_dataset(VACCINATION_PAGE, country, width)
+
+
+# clientside callback to draw the chart from the store
+# shows partially vaccinated, fully vaccinated, and total doses per person
+dash.clientside_callback(
+    ClientsideFunction(namespace="dashboards", function_name="vaccination"),
+    Output("vaccination-graph", "figure"),
+    Input("vax-data-store", "data"),
+    Input("vax-series", "value"),
+    Input("vax-normalize", "value"),
+    State("chart-template", "data")
+)
+
 
-    # fetch vaccination data
-    resp = requests.get(f"{API_BASE}/{VACCINATION_PAGE}", params={"country": country})
-    if resp.status_code != 200:
-        return go.Figure().update_layout(title=f"Error fetching data: {resp.text}")
-
-    try:
-        data = resp.json()
-    except Exception:
-        return go.Figure().update_layout(title=f"Invalid response: {resp.text[:200]}")
-
-    # handle no data
-    if not data or isinstance(data, dict) and "error" in data:
-        return go.Figure().update_layout(title="No vaccination data available")
-
-    # extract fields from data
-    dates = [d["date"] for d in data]
-    people_vax = [d["PEOPLE_VACCINATED"] for d in data]
-    fully_vax = [d["PEOPLE_FULLY_VACCINATED"] for d in data]
-    total_vax = [d["TOTAL_VACCINATIONS"] for d in data]
-    population = data[0].get("POPULATION")
-
-    # normalize values to percent of population
-    if population:
-        people_vax_pct = [(p / population) * 100 if p else 0 for p in people_vax]
-        fully_vax_pct = [(f / population) * 100 if f else 0 for f in fully_vax]
-        doses_per_person_pct = [(tv / population) * 100 if tv else 0 for tv in total_vax]
-    else:
-        people_vax_pct, fully_vax_pct, doses_per_person_pct = [], [], []
-
-    # build figure
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dates, y=people_vax_pct, mode="lines", name="≥1 Dose (% of population)"))
-    fig.add_trace(go.Scatter(x=dates, y=fully_vax_pct, mode="lines", name="Fully Vaccinated (% of population)"))
-    fig.add_trace(go.Scatter(
-        x=dates, y=doses_per_person_pct, mode="lines",
-        name="Total Doses per 100 People", line=dict(dash="dot"))
-    )
-
-    # reference lines at 100% and 200%
-    fig.add_trace(go.Scatter(
-        x=dates, y=[100]*len(dates),
-        mode="lines", name="= 1 dose per person",
-        line=dict(color="gray", dash="dash")
-    ))
-    fig.add_trace(go.Scatter(
-        x=dates, y=[200]*len(dates),
-        mode="lines", name="= 2 doses per person",
-        line=dict(color="lightgray", dash="dot")
-    ))
-
-    # update chart style
-    fig.update_layout(
-        title=f"Vaccination Progress in {country}",
-        xaxis_title="Date",
-        yaxis_title="% of Population",
-        template="plotly_dark",
-        hovermode="x unified",
-        height=500,
-        yaxis=dict(range=[0, max(220, max(doses_per_person_pct or [0]))])  # keeps y-axis consistent
-    )
-    return fig
+# load country options lazily on page load
+register_country_options("vax-country-dropdown", table="ECDC_GLOBAL", include_world=True)
 
+# chart width for ?max_points=
+register_chart_width(VACCINATION_PAGE, "vaccination-graph")
 
 # register reusable comment callbacks
 register_comment_callbacks(VACCINATION_PAGE, country_dropdown_id="vax-country-dropdown")
@@ -0,0 +1,78 @@
+# shared/local_warehouse.py
+import os
+import re
+import time
+import uuid
+
+# Local stand-in for the Snowflake warehouse, backed by a DuckDB file.
+# Selected with WAREHOUSE_BACKEND=local, it exposes the small part of the
+# snowflake connector the app uses (cursor, execute with %s params,
+# description, fetchall, fetch_arrow_batches), so the API can run and be
+# tested without a Snowflake account.
+
+LOCAL_WAREHOUSE_PATH = os.getenv("LOCAL_WAREHOUSE_PATH", "local_warehouse.duckdb")
+ARROW_BATCH_ROWS = 100_000
+# added to every query, stands in for the network round trip to Snowflake in load tests
+LOCAL_WAREHOUSE_LATENCY_MS = float(os.getenv("LOCAL_WAREHOUSE_LATENCY_MS", 0))
+
+_PARAM = re.compile(r"%s")
+
+
+class LocalCursor:
+    """snowflake-like cursor over a duckdb connection"""
+
+    def __init__(self, conn):
+        self._cur = conn.cursor()
+        self.sfqid = None
+
+    @property
+    def description(self):
+        # snowflake reports unquoted identifiers in upper case, duckdb as written
+        if self._cur.description is None:
+            return None
+        return [(col[0].upper(),) + tuple(col[1:]) for col in self._cur.description]
+
+    def execute(self, query: str, params=None):
+        # snowflake connector uses pyformat (%s), duckdb uses qmark (?)
+        self.sfqid = str(uuid.uuid4())
+        if LOCAL_WAREHOUSE_LATENCY_MS:
+            time.sleep(LOCAL_WAREHOUSE_LATENCY_MS / 1000)
+        self._cur.execute(_PARAM.sub("?", query), list(params) if params else None)
+        return self
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def fetch_arrow_batches(self):
+        # fetch_record_batch was renamed to to_arrow_reader in duckdb 1.4
+        if hasattr(self._cur, "to_arrow_reader"):
+            reader = self._cur.to_arrow_reader(ARROW_BATCH_ROWS)
+        else:
+            reader = self._cur.fetch_record_batch(ARROW_BATCH_ROWS)
+        for batch in reader:
+            yield batch
+
+    def close(self):
+        self._cur.close()
+
+
+class LocalConnection:
+    """snowflake-like connection over a duckdb database file"""
+
+    def __init__(self, path: str, read_only: bool):
+        import duckdb  # only needed for the local backend
+        self._conn = duckdb.connect(path, read_only=read_only)
+
+    def cursor(self) -> LocalCursor:
+        return LocalCursor(self._conn)
+
+    def close(self):
+        self._conn.close()
+
+
+def connect(path: str = None, read_only: bool = True) -> LocalConnection:
+    """
+    Open the local warehouse
+    read only by default, so several API workers can share the file
+    """
+    return LocalConnection(path or LOCAL_WAREHOUSE_PATH, read_only=read_only)
@@ -0,0 +1,147 @@
+# shared/query_log.py
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# Statistics of every warehouse query (see fetch_data_from_snowflake),
+# grouped by normalized SQL, plus a structured log of the slow ones.
+# Kept per process, every gunicorn worker has its own.
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 1000))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG")          # file, stderr if unset
+MAX_QUERIES = 500          # distinct normalized statements kept, least recently run are dropped
+DURATION_SAMPLES = 500     # latest durations per statement used for p95
+RECENT_SLOW = 100          # slow queries kept for /admin/queries
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+logger = logging.getLogger("covid.slow_queries")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+if not logger.handlers:
+    logger.addHandler(logging.FileHandler(SLOW_QUERY_LOG) if SLOW_QUERY_LOG else logging.StreamHandler())
+
+
+def normalize_sql(query: str) -> str:
+    """
+    SQL text with literals replaced by ? and whitespace collapsed
+    queries differing only in inlined values share one entry
+    """
+    query = _STRING.sub("?", query)
+    query = _NUMBER.sub("?", query)
+    return _SPACE.sub(" ", query).strip().rstrip(";").strip()
+
+
+def params_hash(params) -> str:
+    """short hash of the bound parameters, the values themselves are not logged"""
+    if not params:
+        return None
+    return hashlib.sha1(repr(tuple(params)).encode()).hexdigest()[:12]
+
+
+class QueryStats:
+    """running totals of one normalized statement"""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.durations = deque(maxlen=DURATION_SAMPLES)
+        self.last_query_id = None
+        self.last_params_hash = None
+        self.last_run = None
+
+    def as_dict(self) -> dict:
+        durations = np.fromiter(self.durations, float) if self.durations else np.zeros(1)
+        return {
+            "id": hashlib.sha1(self.sql.encode()).hexdigest()[:12],
+            "sql": self.sql,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_s * 1000, 2),
+            "mean_ms": round(self.total_s * 1000 / max(self.calls, 1), 2),
+            "p95_ms": round(float(np.percentile(durations, 95)) * 1000, 2),
+            "max_ms": round(self.max_s * 1000, 2),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "last_query_id": self.last_query_id,
+            "last_params_hash": self.last_params_hash,
+            "last_run": self.last_run,
+        }
+
+
+_lock = threading.Lock()
+_queries = OrderedDict()        # normalized sql -> QueryStats
+_slow = deque(maxlen=RECENT_SLOW)
+
+
+def record_query(query: str, params, duration_s: float, rows: int = None, nbytes: int = None,
+                 query_id: str = None, error: str = None) -> None:
+    """
+    add one executed query to the statistics
+    logs it as a JSON line when it took at least SLOW_QUERY_MS
+    """
+    sql = normalize_sql(query)
+    phash = params_hash(params)
+    now = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    with _lock:
+        stats = _queries.pop(sql, None) or QueryStats(sql)
+        _queries[sql] = stats
+        while len(_queries) > MAX_QUERIES:
+            _queries.popitem(last=False)
+
+        stats.calls += 1
+        if error is not None:
+            stats.errors += 1
+        stats.total_s += duration_s
+        stats.max_s = max(stats.max_s, duration_s)
+        stats.rows += rows or 0
+        stats.bytes += nbytes or 0
+        stats.durations.append(duration_s)
+        stats.last_query_id = query_id
+        stats.last_params_hash = phash
+        stats.last_run = now
+
+    if duration_s * 1000 >= SLOW_QUERY_MS:
+        entry = {
+            "event": "slow_query",
+            "time": now,
+            "sql": sql,
+            "params_hash": phash,
+            "duration_ms": round(duration_s * 1000, 2),
+            "rows": rows,
+            "bytes": nbytes,
+            "query_id": query_id,
+            "error": error,
+        }
+        with _lock:
+            _slow.append(entry)
+        logger.info(json.dumps(entry))
+
+
+def top_queries(n: int = 20, order_by: str = "total") -> list:
+    """the n statements with the highest total, p95, max or mean time, or most calls"""
+    key = {"total": "total_ms", "p95": "p95_ms", "max": "max_ms", "mean": "mean_ms", "calls": "calls"}[order_by]
+    with _lock:
+        rows = [stats.as_dict() for stats in _queries.values()]
+    return sorted(rows, key=lambda r: r[key], reverse=True)[:n]
+
+
+def recent_slow_queries(n: int = 20) -> list:
+    """latest slow queries, newest first"""
+    with _lock:
+        return list(_slow)[::-1][:n]
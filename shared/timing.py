@@ -0,0 +1,65 @@
+# shared/timing.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Phase timings of the current request. The API starts a recorder per
+# request (api/src/metrics.py) and the hot paths wrap their work in
+# phase(name). Without a recorder (Dash, scripts, background jobs)
+# phase() just runs the block.
+
+# measured phases, "transform" is the rest of the handler time
+MEASURED_PHASES = ("connect", "query", "fetch", "serialize")
+PHASES = ("connect", "query", "fetch", "transform", "serialize")
+
+_current = ContextVar("phase_timings", default=None)
+
+
+class PhaseTimings:
+    """seconds spent in every phase of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(MEASURED_PHASES, 0.0)
+        self._active = set()
+
+    def summary(self) -> dict:
+        """durations of all PHASES plus "total", in seconds"""
+        total = time.perf_counter() - self.started
+        phases = dict(self.durations)
+        phases["transform"] = max(total - sum(self.durations.values()), 0.0)
+        phases["total"] = total
+        return phases
+
+
+def start_request() -> PhaseTimings:
+    timings = PhaseTimings()
+    _current.set(timings)
+    return timings
+
+
+def end_request():
+    """stop recording, returns the request's PhaseTimings (None if none was started)"""
+    timings = _current.get()
+    _current.set(None)
+    return timings
+
+
+@contextmanager
+def phase(name: str):
+    """
+    add the time spent in the block to phase `name` of the current request
+    nested blocks of the same phase are counted once
+    """
+    timings = _current.get()
+    if timings is None or name in timings._active:
+        yield
+        return
+
+    timings._active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.durations[name] += time.perf_counter() - start
+        timings._active.discard(name)
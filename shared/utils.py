@@ -1,6 +1,8 @@
 # shared/utils.py
 
 import os
+import time
+import hashlib
 import traceback
 import kagglehub
 import matplotlib.pyplot as plt
@@ -9,17 +11,32 @@ import requests
 import snowflake.connector
 
 from shared.config.config import API_BASE
+from shared.timing import phase
+from shared.query_log import record_query
 
 
 # Environment & Connection
 
 
+def warehouse_backend() -> str:
+    """
+    Warehouse behind the queries, "snowflake" (default)
+    or "local" for the DuckDB stand-in in shared/local_warehouse.py
+    """
+    return os.getenv("WAREHOUSE_BACKEND", "snowflake").lower()
+
+
 def get_snowflake_connection(initial: bool = False):
     """
     Connect to Snowflake using env vars
     if initial=True use only account, user, password
     otherwise include warehouse, database, and schema
+    WAREHOUSE_BACKEND=local connects to the local stand-in instead
     """
+    if warehouse_backend() == "local":
+        from shared.local_warehouse import connect
+        return connect()
+
     if initial:
         args = {
             'user': os.getenv("SNOWFLAKE_USER"),
@@ -44,25 +61,38 @@ def fetch_data_from_snowflake(query: str, return_df: bool = True, params=None):
     """
     Run a query on Snowflake
     return dataframe if return_df=True else raw tuples
+    every call is recorded in the query log (shared/query_log.py)
     """
     conn = None
     cursor = None
+    start = time.perf_counter()
     try:
-        conn = get_snowflake_connection()
-        cursor = conn.cursor()
-
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-
-        if return_df:
-            return pd.DataFrame(cursor.fetchall(), columns=[col[0] for col in cursor.description])
-        else:
-            return cursor.fetchall()
+        with phase("connect"):
+            conn = get_snowflake_connection()
+            cursor = conn.cursor()
+
+        with phase("query"):
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+
+        with phase("fetch"):
+            rows = cursor.fetchall()
+            if return_df:
+                result = pd.DataFrame(rows, columns=[col[0] for col in cursor.description])
+                nbytes = int(result.memory_usage(index=False).sum())
+            else:
+                result, nbytes = rows, None
+
+        record_query(query, params, time.perf_counter() - start, rows=len(rows), nbytes=nbytes,
+                     query_id=getattr(cursor, "sfqid", None))
+        return result
     except Exception as e:
         print(f"Error executing query: {e}")
         traceback.print_exc()
+        record_query(query, params, time.perf_counter() - start,
+                     query_id=getattr(cursor, "sfqid", None), error=str(e))
         raise
     finally:
         if cursor:
@@ -71,13 +101,90 @@ def fetch_data_from_snowflake(query: str, return_df: bool = True, params=None):
             conn.close()
 
 
+def fetch_arrow_batches_from_snowflake(query: str, params=None):
+    """
+    Run a query on Snowflake and yield the result as Arrow batches
+    the connection stays open until the generator is exhausted or closed
+    """
+    conn = None
+    cursor = None
+    # time spent here, without the consumer's work between batches
+    elapsed, rows, nbytes = 0.0, 0, 0
+    start = time.perf_counter()
+    try:
+        with phase("connect"):
+            conn = get_snowflake_connection()
+            cursor = conn.cursor()
+
+        with phase("query"):
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+
+        # only the time spent waiting for batches counts as fetch, not the consumer's work
+        batches = iter(cursor.fetch_arrow_batches())
+        while True:
+            with phase("fetch"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            rows += batch.num_rows
+            nbytes += batch.nbytes
+            elapsed += time.perf_counter() - start
+            yield batch
+            start = time.perf_counter()
+
+        record_query(query, params, elapsed + time.perf_counter() - start, rows=rows, nbytes=nbytes,
+                     query_id=getattr(cursor, "sfqid", None))
+    except Exception as e:
+        print(f"Error executing query: {e}")
+        traceback.print_exc()
+        record_query(query, params, elapsed + time.perf_counter() - start, rows=rows, nbytes=nbytes,
+                     query_id=getattr(cursor, "sfqid", None), error=str(e))
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+def fetch_data_version(tables=("ECDC_GLOBAL", "ECDC_GLOBAL_WEEKLY", "OWID_VACCINATIONS")) -> str:
+    """
+    Build a short version string for the source tables
+    from INFORMATION_SCHEMA, it changes whenever a table is reloaded
+    """
+    placeholders = ", ".join(["%s"] * len(tables))
+    query = f"""
+        SELECT TABLE_NAME, LAST_ALTERED, ROW_COUNT
+        FROM INFORMATION_SCHEMA.TABLES
+        WHERE TABLE_NAME IN ({placeholders})
+        ORDER BY TABLE_NAME
+    """
+    if warehouse_backend() == "local":
+        # duckdb keeps no modification time, the row estimate + file time stand in for it
+        from shared.local_warehouse import LOCAL_WAREHOUSE_PATH
+        query = f"""
+            SELECT table_name, {int(os.path.getmtime(LOCAL_WAREHOUSE_PATH))}, estimated_size
+            FROM duckdb_tables()
+            WHERE UPPER(table_name) IN ({placeholders})
+            ORDER BY table_name
+        """
+    rows = fetch_data_from_snowflake(query, return_df=False, params=tuple(tables))
+    return hashlib.sha1(repr(rows).encode()).hexdigest()[:16]
+
+
 def load_kaggle_mortality_data() -> pd.DataFrame:
     """
     Download and load Kaggle world mortality dataset
     returns dataframe with mortality data
+    MORTALITY_DATA_PATH points to a local world_mortality.csv instead (offline runs, benchmarks)
     """
-    path = kagglehub.dataset_download("konradb/world-mortality-dataset")
-    file_path = os.path.join(path, "world_mortality.csv")
+    file_path = os.getenv("MORTALITY_DATA_PATH")
+    if not file_path:
+        path = kagglehub.dataset_download("konradb/world-mortality-dataset")
+        file_path = os.path.join(path, "world_mortality.csv")
     df = pd.read_csv(file_path)
     return df
 
@@ -151,7 +258,7 @@ def get_country_list(table="ECDC_GLOBAL",include_world=False):
     adds 'World' option on top of the list
     """
     try:
-        resp = requests.get(f"{API_BASE}/countries",params={"table": table})
+        resp = requests.get(f"{API_BASE}/countries",params={"table": table}, timeout=5)
         if resp.status_code == 200:
             countries = resp.json()
             if include_world:
@@ -160,4 +267,17 @@ def get_country_list(table="ECDC_GLOBAL",include_world=False):
                 return countries
     except:
         return []
-    return []
\ No newline at end of file
+    return []
+
+def fetch_country_lists(tables: list, timeout: float = 5) -> dict:
+    """
+    Fetch the country lists of several tables from the API in one request
+    returns {table: [countries]}, or an empty dict if the API is not ready
+    """
+    try:
+        resp = requests.get(f"{API_BASE}/countries", params={"tables": ",".join(tables)}, timeout=timeout)
+        if resp.status_code == 200 and isinstance(resp.json(), dict):
+            return resp.json()
+    except (requests.RequestException, ValueError):
+        return {}
+    return {}